@@ -0,0 +1,64 @@
+# benchmarks.alignment_benchmark.py
+#
+# Banded paragraph alignment on synthetic translations: the target version
+# merges every 10th pair of source paragraphs and splits every 15th one, with
+# noise on top. Reports span accuracy and time for growing versions and
+# bands (time grows with n * band, not n^2). Nothing connects to Postgres,
+# but importing the package reads the connection settings from constants, so
+# placeholders are set for any that are missing (like startup_benchmark.APP_ENV).
+#
+# Run from the repository root:  python -m benchmarks.alignment_benchmark
+
+import os
+import time
+
+import numpy as np
+
+for name, value in {"USER": "benchmark", "PASSWORD": "benchmark", "HOST": "localhost",
+                    "PORT": "5432", "DATABASE_NAME": "benchmark"}.items():
+    os.environ.setdefault(name, value)
+
+from dissection_table.operations.alignment import align_matrices
+
+
+def synthetic_pair(n_source: int, dim: int = 768, noise: float = 0.5, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    source = rng.standard_normal((n_source, dim)).astype(np.float32)
+    target, truth = [], []
+    i = 0
+    while i < n_source:
+        j = len(target)
+        if i % 10 == 0 and i + 1 < n_source:
+            target.append(source[i] + source[i + 1])
+            truth.append((i, i + 1, j, j))
+            i += 2
+        elif i % 15 == 0:
+            target.append(source[i])
+            target.append(source[i] + noise * rng.standard_normal(dim))
+            truth.append((i, i, j, j + 1))
+            i += 1
+        else:
+            target.append(source[i])
+            truth.append((i, i, j, j))
+            i += 1
+    target = np.array(target, dtype=np.float32) + noise * rng.standard_normal((len(target), dim)).astype(np.float32)
+    return source, target, truth
+
+
+def run(n_source: int, band: int = None):
+    source, target, truth = synthetic_pair(n_source)
+    start = time.perf_counter()
+    spans = align_matrices(source, target, band=band)
+    elapsed = time.perf_counter() - start
+    found = {(s['source_start'], s['source_end'], s['target_start'], s['target_end']) for s in spans}
+    accuracy = len(found & set(truth)) / len(truth)
+    print(f"{n_source:>7} x {target.shape[0]:<7} band={str(band or 'auto'):>5}  "
+          f"{elapsed * 1000:8.1f} ms  span accuracy {accuracy:.3f}")
+
+
+if __name__ == "__main__":
+    for n_source in (1500, 6000, 24000):
+        run(n_source, band=64)
+    for band in (16, 64, 256):
+        run(6000, band=band)
+    run(1500)
@@ -0,0 +1,78 @@
+# benchmarks.bulk_load_benchmark.py
+#
+# INSERT with one parameter set per row (what DBInterface.create_all and the
+# old insert_paragraph_similarities did) against the chunked binary COPY of
+# bulk_load.copy_rows, on synthetic paragraph and similarity rows. Each run
+# happens in a transaction that is rolled back, so the database is untouched.
+# Needs the Postgres from .env.
+#
+# Run from the repository root:  python -m benchmarks.bulk_load_benchmark --paragraphs 13000
+
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+import numpy as np
+from sqlalchemy import insert
+
+from constants import CONN_STRING
+from dissection_table.database.engine import init_db
+from dissection_table.database.db_interface import DBInterface
+from dissection_table.database.models import Paragraph, ParagraphSimilarity
+from dissection_table.database.bulk_load import copy_rows
+
+
+def paragraph_rows(n: int):
+    rng = np.random.default_rng(0)
+    for ind in range(n):
+        yield {"version_name": "bench_version", "n_paragraph": ind, "text": "palabra " * 40,
+               "n_words": 40, "embedding": rng.standard_normal(768).astype(np.float32).tolist(),
+               "umap": rng.standard_normal(3).astype(np.float32).tolist()}
+
+
+def similarity_rows(n_paragraphs: int, n_targets: int = 9, k: int = 3):
+    for ind in range(n_paragraphs):
+        for target in range(n_targets):
+            for rank in range(k):
+                yield {"source_version_name": "bench_version", "source_n_paragraph": ind,
+                       "target_version_name": f"bench_target_{target}", "target_n_paragraph": ind + rank,
+                       "rank": rank}
+
+
+async def timed(load, model, rows) -> str:
+    async with DBInterface(model).AsyncSessionLocal() as session:
+        transaction = await session.begin()
+        tracemalloc.start()
+        start = time.perf_counter()
+        await load(session, model, rows)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        await transaction.rollback()
+    return f"{elapsed:7.2f} s, peak python memory {peak / 2**20:7.1f} MiB"
+
+
+async def insert_load(session, model, rows):
+    await session.execute(insert(model), list(rows))
+
+
+async def copy_load(session, model, rows):
+    await copy_rows(session, model, rows)
+
+
+async def main(n_paragraphs: int):
+    await init_db(CONN_STRING)
+    DBInterface.initialize_engine_and_session(CONN_STRING)
+    n_similarities = n_paragraphs * 9 * 3
+    print(f"paragraphs, INSERT ({n_paragraphs}):        {await timed(insert_load, Paragraph, paragraph_rows(n_paragraphs))}")
+    print(f"paragraphs, COPY   ({n_paragraphs}):        {await timed(copy_load, Paragraph, paragraph_rows(n_paragraphs))}")
+    print(f"similarities, INSERT ({n_similarities}):  {await timed(insert_load, ParagraphSimilarity, similarity_rows(n_paragraphs))}")
+    print(f"similarities, COPY   ({n_similarities}):  {await timed(copy_load, ParagraphSimilarity, similarity_rows(n_paragraphs))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paragraphs", type=int, default=13000)
+    args = parser.parse_args()
+    asyncio.run(main(args.paragraphs))
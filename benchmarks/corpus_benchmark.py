@@ -0,0 +1,57 @@
+# benchmarks.corpus_benchmark.py
+#
+# Building a Corpus handle for every ingested version, as the notebooks do:
+# the old SELECT * FROM version against the header Corpus.create(load=()) reads.
+# Payload is the size of the values fetched (text length in bytes, array
+# nbytes), against the Postgres from .env.
+#
+# Run from the repository root:  python -m benchmarks.corpus_benchmark
+
+import time
+import asyncio
+
+import numpy as np
+
+from constants import CONN_STRING
+from dissection_table.database.engine import init_db, get_db_session
+from dissection_table.operations.sources import get_versions_names, get_complete_version
+from dissection_table.operations.version_corpus import Corpus
+
+
+def payload_bytes(row: dict) -> int:
+    size = 0
+    for value in row.values():
+        if isinstance(value, str):
+            size += len(value.encode("utf-8"))
+        elif isinstance(value, np.ndarray):
+            size += value.nbytes
+        elif value is not None:
+            size += 8
+    return size
+
+
+async def main():
+    await init_db(CONN_STRING)
+    async for session in get_db_session():
+        versions = [row['version_name'] for row in await get_versions_names(session)]
+
+        start = time.perf_counter()
+        complete = [await get_complete_version(session, version) for version in versions]
+        complete_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        corpora = [await Corpus.create(session, version, load=()) for version in versions]
+        header_time = time.perf_counter() - start
+        header = [{'author': c.author, 'year': c.year, 'editorial': c.editorial, 'ISBN': c.ISBN,
+                   'n_words': c.n_words, 'n_paragraphs': c.n_paragraphs, 'version_name': c.version}
+                  for c in corpora]
+
+    complete_size = sum(payload_bytes(row) for row in complete)
+    header_size = sum(payload_bytes(row) for row in header)
+    print(f"{len(versions)} versions")
+    print(f"SELECT *       {complete_size / 1024:10.1f} KiB  {complete_time * 1000:8.1f} ms")
+    print(f"Corpus header  {header_size / 1024:10.1f} KiB  {header_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+# benchmarks.corpus_registry_benchmark.py
+#
+# Repeated analysis calls on every version: a fresh Corpus per call (every
+# method goes to Postgres) against the shared corpora of the registry
+# (first call loads, the rest are served from memory).
+#
+# Run from the repository root:  python -m benchmarks.corpus_registry_benchmark [--rounds 5]
+
+import time
+import asyncio
+import argparse
+
+from constants import CONN_STRING
+from dissection_table.database.engine import init_db, get_db_session
+from dissection_table.operations.sources import get_versions_names
+from dissection_table.operations.version_corpus import Corpus
+from dissection_table.operations.corpus_registry import corpus_registry
+
+
+async def analysis(corpus: Corpus):
+    await corpus.word_to_int()
+    await corpus.int_to_word()
+    await corpus.all_paragraphs()
+    await corpus.all_embeddings()
+    await corpus.all_umap()
+
+
+async def main(rounds: int):
+    await init_db(CONN_STRING)
+    async for session in get_db_session():
+        versions = [row['version_name'] for row in await get_versions_names(session)]
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for version in versions:
+                await analysis(await Corpus.create(session, version))
+        fresh = time.perf_counter() - start
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for version in versions:
+            await analysis(await corpus_registry.get(version))
+        timings.append(time.perf_counter() - start)
+
+    print(f"{len(versions)} versions, {rounds} rounds")
+    print(f"fresh Corpus per round:   {fresh * 1000:10.1f} ms")
+    print(f"registry, first round:    {timings[0] * 1000:10.1f} ms")
+    print(f"registry, later rounds:   {sum(timings[1:]) * 1000:10.1f} ms")
+    print(corpus_registry.report())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds))
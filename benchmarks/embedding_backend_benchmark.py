@@ -0,0 +1,59 @@
+# benchmarks.embedding_backend_benchmark.py
+#
+# Paragraphs per second of the embedding backends on real paragraphs:
+#   ollama                -> AsyncEmbeddingClient against OLLAMA_HOST
+#   sentence-transformers -> in-process torch on CPU (needs EMBEDDING_MODEL_PATH)
+#   onnx                  -> same model through its ONNX export
+#
+# Run from the repository root:
+#   EMBEDDING_MODEL_PATH=/models/granite-embedding-278m-multilingual \
+#       python -m benchmarks.embedding_backend_benchmark --version spanish_1 --n 500
+
+import time
+import asyncio
+import argparse
+
+from constants import EMBEDDING_MODEL_PATH
+from dissection_table.database.sources_formatting import extract_version
+from dissection_table.database.embedding_backends import OllamaBackend, SentenceTransformerBackend
+
+
+async def measure(backend, paragraphs: list) -> float:
+    await backend.embed_documents(paragraphs[:8])  # warm up: model load, connection
+    start = time.perf_counter()
+    embeddings = await backend.embed_documents(paragraphs)
+    elapsed = time.perf_counter() - start
+    assert len(embeddings) == len(paragraphs) and len(embeddings[0]) == backend.dim
+    return len(paragraphs) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", default="spanish_1")
+    parser.add_argument("--n", type=int, default=500)
+    parser.add_argument("--skip-ollama", action="store_true")
+    args = parser.parse_args()
+
+    _, paragraphs = extract_version(args.version)
+    paragraphs = paragraphs[:args.n]
+    print(f"{len(paragraphs)} paragraphs of {args.version}")
+
+    backends = []
+    if not args.skip_ollama:
+        backends.append(OllamaBackend(progress=lambda *_: None))
+    if EMBEDDING_MODEL_PATH:
+        backends.append(SentenceTransformerBackend(EMBEDDING_MODEL_PATH))
+        backends.append(SentenceTransformerBackend(EMBEDDING_MODEL_PATH, onnx=True))
+    else:
+        print("EMBEDDING_MODEL_PATH not set: skipping the in-process backends")
+
+    for backend in backends:
+        try:
+            rate = asyncio.run(measure(backend, paragraphs))
+            print(f"{backend.name:60s} {rate:8.1f} paragraphs/s")
+        except Exception as e:
+            print(f"{backend.name:60s} failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# benchmarks.embedding_client_benchmark.py
+#
+# Throughput and failure handling of AsyncEmbeddingClient against the local
+# fake embedding server, compared with one request carrying every text (what
+# concat_embeddings used to do through OllamaEmbeddings.embed_documents).
+#
+# Run from the repository root:  python -m benchmarks.embedding_client_benchmark
+
+import time
+import asyncio
+
+from benchmarks.fake_embedding_server import FakeEmbeddingServer
+from dissection_table.database.embedding_client import AsyncEmbeddingClient
+
+N_TEXTS = 2000
+
+
+def quiet(done, total, elapsed):
+    pass
+
+
+async def run(server: FakeEmbeddingServer, texts: list, **client_args) -> str:
+    client = AsyncEmbeddingClient(model="fake", host=server.url, backoff=0.05, progress=quiet, **client_args)
+    start = time.perf_counter()
+    embeddings = await client.embed_documents(texts)
+    elapsed = time.perf_counter() - start
+    assert len(embeddings) == len(texts)
+    return f"{len(texts) / elapsed:8.1f} texts/s  ({client.requests} requests, {client.retries} retries)"
+
+
+def main():
+    texts = [f"paragraph {ind} de pedro paramo" for ind in range(N_TEXTS)]
+
+    server = FakeEmbeddingServer(max_parallel=4).start()
+    print(f"single request, {N_TEXTS} texts:        {asyncio.run(run(server, texts, batch_size=N_TEXTS, max_concurrency=1))}")
+    for batch_size, max_concurrency in [(32, 1), (32, 4), (64, 4), (32, 8)]:
+        result = asyncio.run(run(server, texts, batch_size=batch_size, max_concurrency=max_concurrency))
+        print(f"batch {batch_size:3d}, {max_concurrency} in flight:          {result}")
+    server.shutdown()
+
+    flaky = FakeEmbeddingServer(max_parallel=4, failure_rate=0.2).start()
+    result = asyncio.run(run(flaky, texts, batch_size=32, max_concurrency=4, max_retries=8))
+    print(f"batch  32, 4 in flight, 20% 503s:  {result}")
+    flaky.shutdown()
+
+
+if __name__ == "__main__":
+    main()
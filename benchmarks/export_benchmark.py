@@ -0,0 +1,63 @@
+# benchmarks.export_benchmark.py
+#
+# Payload size and client-side decode time of a version's embedding matrix:
+# JSON (what the per-paragraph endpoint sends, as one document) against the
+# .npy and Arrow IPC exports. Synthetic float32 data, no database needed;
+# Arrow is skipped when pyarrow isn't installed.
+#
+# Run from the repository root:  python -m benchmarks.export_benchmark [--rows 1450 --versions 9]
+
+import io
+import json
+import time
+import argparse
+
+import numpy as np
+
+from dissection_table.operations.export import to_npy, to_arrow
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(rows: int, n_versions: int):
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((rows * n_versions, 768)).astype(np.float32)
+    names = np.repeat([f"version_{ind}" for ind in range(n_versions)], rows)
+    ids = np.tile(np.arange(rows, dtype=np.int32), n_versions)
+
+    as_json = json.dumps([{"version_name": name, "n_paragraph": int(n), "embedding": vector}
+                          for name, n, vector in zip(names.tolist(), ids.tolist(), matrix.tolist())]).encode()
+    json_decode = best_of(lambda: np.array([row["embedding"] for row in json.loads(as_json)], dtype=np.float32))
+    print(f"{rows * n_versions} x 768 float32")
+    print(f"json   {len(as_json) / 2**20:8.1f} MiB  decode {json_decode * 1000:8.1f} ms")
+
+    as_npy = to_npy(names, ids, matrix, "embedding")
+    npy_decode = best_of(lambda: np.load(io.BytesIO(as_npy))["embedding"])
+    print(f"npy    {len(as_npy) / 2**20:8.1f} MiB  decode {npy_decode * 1000:8.1f} ms  "
+          f"({len(as_json) / len(as_npy):.1f}x smaller, {json_decode / npy_decode:.0f}x faster)")
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("arrow  skipped (pyarrow not installed)")
+        return
+    as_arrow = to_arrow(names, ids, matrix, "embedding")
+    arrow_decode = best_of(lambda: pa.ipc.open_file(pa.py_buffer(as_arrow)).read_all()
+                           .column("embedding").combine_chunks().flatten().to_numpy().reshape(-1, 768))
+    print(f"arrow  {len(as_arrow) / 2**20:8.1f} MiB  decode {arrow_decode * 1000:8.1f} ms  "
+          f"({len(as_json) / len(as_arrow):.1f}x smaller, {json_decode / arrow_decode:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1450)
+    parser.add_argument("--versions", type=int, default=1)
+    args = parser.parse_args()
+    main(args.rows, args.versions)
@@ -0,0 +1,43 @@
+# benchmarks.extraction_benchmark.py
+#
+# Wall-clock of the extraction stage of feed_database (get_version + cleaning
+# for every version) on process pools of increasing size, with the EPUB disk
+# cache disabled so every worker really parses its book.
+#
+# Run from the repository root:  python -m benchmarks.extraction_benchmark
+
+import os
+import time
+import asyncio
+
+from dissection_table.database import sources_formatting
+from dissection_table.database.source_registry import SourceRegistry
+
+
+async def extract_all(max_workers: int) -> float:
+    start = time.perf_counter()
+    n_paragraphs = 0
+    async for _, clean_paragraphs in sources_formatting.extract_versions(
+            list(sources_formatting.sources.keys()), max_workers=max_workers):
+        n_paragraphs += len(clean_paragraphs)
+    return time.perf_counter() - start, n_paragraphs
+
+
+def main():
+    # Workers inherit this registry, so they parse instead of reading the cache.
+    sources_formatting.sources = SourceRegistry(cache_dir=None)
+
+    start = time.perf_counter()
+    for version in sources_formatting.sources:
+        sources_formatting.extract_version(version)
+    print(f"serial, in process:       {time.perf_counter() - start:6.2f} s")
+
+    n_cores = os.cpu_count() or 1
+    pool_sizes = sorted({1, 2, 4, n_cores} & set(range(1, n_cores + 1)))
+    for max_workers in pool_sizes:
+        elapsed, n_paragraphs = asyncio.run(extract_all(max_workers))
+        print(f"process pool, {max_workers:2d} workers: {elapsed:6.2f} s ({n_paragraphs} paragraphs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks.fake_embedding_server.py
+#
+# Local stand-in for Ollama's /api/embed, so the embedding client can be
+# benchmarked (throughput, retries) without a real model. Vectors are
+# deterministic per text, latency is `latency + per_item * len(input)` and a
+# `failure_rate` fraction of requests answers 503.
+#
+# Standalone:  python -m benchmarks.fake_embedding_server --port 11435 --failure-rate 0.1
+
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+def fake_embedding(text: str, dim: int) -> list:
+    seed = int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class FakeEmbeddingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, dim: int = 768, latency: float = 0.05,
+                 per_item: float = 0.002, failure_rate: float = 0.0, max_parallel: int = 4):
+        super().__init__(("127.0.0.1", port), EmbedHandler)
+        self.dim = dim
+        self.latency = latency
+        self.per_item = per_item
+        self.failure_rate = failure_rate
+        # Like a real model server, only so many batches are computed at once.
+        self.slots = threading.Semaphore(max_parallel)
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "FakeEmbeddingServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class EmbedHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        server.requests += 1
+
+        if random.random() < server.failure_rate:
+            server.failures += 1
+            self._reply(503, {"error": "simulated overload"})
+            return
+        with server.slots:
+            time.sleep(server.latency + server.per_item * len(texts))
+        embeddings = [fake_embedding(text, server.dim) for text in texts]
+        self._reply(200, {"model": body.get("model"), "embeddings": embeddings})
+
+    def _reply(self, status: int, payload: dict):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--per-item", type=float, default=0.002)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--max-parallel", type=int, default=4)
+    args = parser.parse_args()
+    server = FakeEmbeddingServer(args.port, latency=args.latency, per_item=args.per_item,
+                                 failure_rate=args.failure_rate, max_parallel=args.max_parallel)
+    print(f"fake embedding server on {server.url}")
+    server.serve_forever()
@@ -0,0 +1,37 @@
+# benchmarks.nearest_benchmark.py
+#
+# Cross-translation nearest-neighbour lookups on the full 768-dim paragraph
+# embeddings: recall@k and latency of the HNSW index for a sweep of
+# ef_search values, against exact (sequential scan) search. Needs the
+# Postgres from .env with the corpus already ingested.
+#
+# Run from the repository root:  python -m benchmarks.nearest_benchmark [--version spanish_1 --target english_1]
+
+import asyncio
+import argparse
+
+from constants import CONN_STRING
+from dissection_table.database.engine import init_db, get_db_session
+from dissection_table.operations.nearest import nearest_recall
+
+
+async def main(version: str, target: str, k: int, sample_size: int, ef_values: list):
+    await init_db(CONN_STRING)
+    async for session in get_db_session():
+        print(f"{version} -> {target}, k={k}, {sample_size} queries")
+        print(f"{'ef_search':>10} {'recall':>8} {'hnsw ms':>9} {'exact ms':>9}")
+        for ef_search in ef_values:
+            report = await nearest_recall(session, version, target, k=k,
+                                          ef_search=ef_search, sample_size=sample_size)
+            print(f"{ef_search:>10} {report['recall']:>8.3f} {report['ann_ms']:>9.2f} {report['exact_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", default="spanish_1")
+    parser.add_argument("--target", default="english_1")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--sample-size", type=int, default=100)
+    parser.add_argument("--ef", type=int, nargs="+", default=[10, 20, 40, 80, 160, 320])
+    args = parser.parse_args()
+    asyncio.run(main(args.version, args.target, args.k, args.sample_size, args.ef))
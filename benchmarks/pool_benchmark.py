@@ -0,0 +1,77 @@
+# benchmarks.pool_benchmark.py
+#
+# Requests per second on the paragraph endpoints under concurrent load,
+# through the FastAPI app in-process (httpx ASGI transport, no network
+# between client and app), against the Postgres from .env:
+#   before -> default pool settings, every SELECT in an explicit transaction
+#   after  -> the tuned shared engine (DB_POOL_*, DB_STATEMENT_CACHE_SIZE)
+#             and the autocommit read fast path
+#
+# Run from the repository root:  python -m benchmarks.pool_benchmark [--requests 2000 --concurrency 32]
+
+import time
+import random
+import asyncio
+import argparse
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from constants import CONN_STRING
+from dissection_table.database import ask_db
+from dissection_table.database import engine as db_engine
+from dissection_table.database.vector_codec import install_vector_codec
+
+
+async def load(app, paths: list, n_requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    queue = asyncio.Queue()
+    for ind in range(n_requests):
+        queue.put_nowait(paths[ind % len(paths)])
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                response = await client.get(queue.get_nowait())
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return n_requests / (time.perf_counter() - start)
+
+
+async def main(n_requests: int, concurrency: int, version: str):
+    from main import app
+    await db_engine.init_db(CONN_STRING)
+    async with db_engine.AsyncDBSession() as session:
+        n_paragraphs = len(await ask_db.open_request(
+            session, "SELECT n_paragraph FROM paragraph WHERE version_name = :v_n",
+            params={"v_n": version}))
+    rng = random.Random(0)
+    endpoints = {
+        "paragraph": [f"/paragraph/{version}/{rng.randrange(n_paragraphs)}" for _ in range(200)],
+        "embedding": [f"/paragraph/{version}/{rng.randrange(n_paragraphs)}/embedding" for _ in range(200)],
+    }
+    scenarios = {
+        "before": (install_vector_codec(create_async_engine(CONN_STRING, echo=False)), False),
+        "after": (db_engine.create_engine(CONN_STRING), True),
+    }
+
+    print(f"{n_requests} requests, {concurrency} concurrent clients, version {version}")
+    for name, (engine, fast_path) in scenarios.items():
+        db_engine.AsyncDBSession.configure(bind=engine)
+        ask_db.READ_FAST_PATH = fast_path
+        for endpoint, paths in endpoints.items():
+            await load(app, paths, min(100, n_requests), concurrency)  # warm the pool
+            rps = await load(app, paths, n_requests, concurrency)
+            print(f"{name:<7} {endpoint:<10} {rps:9.1f} req/s")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--version", default="spanish_1")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.version))
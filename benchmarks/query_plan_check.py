@@ -0,0 +1,35 @@
+# benchmarks.query_plan_check.py
+#
+# Runs the migrations (through init_db) and EXPLAINs the hot lookups of
+# database.query_plans against the Postgres from .env, failing if any of
+# them is answered with a sequential scan instead of an index.
+#
+# Run from the repository root:  python -m benchmarks.query_plan_check [--analyze]
+
+import sys
+import asyncio
+import argparse
+
+from constants import CONN_STRING
+from dissection_table.database.engine import init_db, get_db_session
+from dissection_table.database.query_plans import check_hot_queries
+
+
+async def main(analyze: bool) -> bool:
+    await init_db(CONN_STRING)
+    async for session in get_db_session():
+        report = await check_hot_queries(session, analyze=analyze)
+    ok = True
+    for name, result in report.items():
+        status = "index" if result["uses_index"] and not result["seq_scans"] else "SEQ SCAN"
+        ok = ok and status == "index"
+        timing = f"  {result['execution_ms']:.3f} ms" if analyze else ""
+        print(f"{name:<24} {status:<9} cost {result['total_cost']:>10.2f}{timing}  {' -> '.join(result['nodes'])}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--analyze", action="store_true")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.analyze)) else 1)
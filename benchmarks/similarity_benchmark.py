@@ -0,0 +1,62 @@
+# benchmarks.similarity_benchmark.py
+#
+# The old paragraph_similarity loop (one cdist call per source row and target
+# version, then a full argsort for 3 indices) against the blocked
+# matrix-product / argpartition engine in operations.similarity, on synthetic
+# matrices shaped like the corpus (nine versions of ~1450 paragraphs).
+#
+# Run from the repository root:  python -m benchmarks.similarity_benchmark [--dim 3]
+
+import time
+import argparse
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+from dissection_table.operations.similarity import similarity_table
+
+
+def cdist_loop(matrices: dict, k: int = 3) -> dict:
+    results = {}
+    for source_name, source_matrix in matrices.items():
+        for i, source_row in enumerate(source_matrix):
+            row_key = f'{source_name}#{i}'
+            results[row_key] = {}
+            for target_name, target_matrix in matrices.items():
+                if source_name == target_name:
+                    continue
+                similarities = 1 - cdist(source_row.reshape(1, -1), target_matrix, 'cosine')[0]
+                num_to_get = min(k, target_matrix.shape[0])
+                results[row_key][target_name] = np.argsort(similarities)[-num_to_get:][::-1].tolist()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dim", type=int, default=3)
+    parser.add_argument("--versions", type=int, default=9)
+    parser.add_argument("--paragraphs", type=int, default=1450)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    matrices = {f"version_{ind}": rng.standard_normal((args.paragraphs + ind, args.dim)).astype(np.float32)
+                for ind in range(args.versions)}
+    print(f"{args.versions} versions x ~{args.paragraphs} paragraphs x {args.dim} dims, k=3, cosine")
+
+    start = time.perf_counter()
+    old = cdist_loop(matrices)
+    old_time = time.perf_counter() - start
+    print(f"per-row cdist loop:        {old_time:8.2f} s")
+
+    start = time.perf_counter()
+    new = similarity_table(matrices)
+    new_time = time.perf_counter() - start
+    print(f"blocked top-k engine:      {new_time:8.2f} s  ({old_time / new_time:.0f}x)")
+
+    same = sum(old[key][target] == new[key][target] for key in old for target in old[key])
+    total = sum(len(targets) for targets in old.values())
+    print(f"identical neighbour lists: {same}/{total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks.startup_benchmark.py
+#
+# Compares what a fresh worker pays for the EPUB sources:
+#   import  -> `import dissection_table.database.sources_formatting` and
+#              `import main` (the whole app, routers included), in a new process
+#   eager   -> parse every book (what importing sources_formatting used to do)
+#   lazy    -> build the SourceRegistry (what importing it does now)
+#   cold    -> first chapters() for every version with an empty disk cache
+#   warm    -> same, in a new process, with the disk cache populated
+#   extract -> get_version for every version on top of warm chapters: the
+#              paragraphs, raw_text and raw_words built from them
+#
+# Only chapters are cached on disk, not the extracted paragraphs. Startup
+# never extracts: on an up-to-date database feed_database compares
+# fingerprints (file hashes, see get_fingerprint) and stops there. Extraction
+# only runs for a version being re-ingested, in the worker pool and right
+# before embedding it, which costs far more than the "extract" line; and its
+# rules (get_raw_text, EXTRACTION_FORMAT) change more often than the EPUB
+# parsing, so a second cache would mostly be invalidated.
+#
+# Run from the repository root:  python -m benchmarks.startup_benchmark
+
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+IMPORT_CHILD = """
+import json, time
+t = time.perf_counter()
+import dissection_table.database.sources_formatting
+sources_formatting = time.perf_counter() - t
+t = time.perf_counter()
+import main
+print(json.dumps({'sources_formatting': sources_formatting, 'main': time.perf_counter() - t}))
+"""
+
+CHILD = """
+import json, sys, time
+t = time.perf_counter()
+from dissection_table.database.source_registry import SourceRegistry, parse_chapters
+registry = SourceRegistry(cache_dir=sys.argv[2])
+construct = time.perf_counter() - t
+t = time.perf_counter()
+if sys.argv[1] == 'eager':
+    for version in registry:
+        parse_chapters(registry.path(version))
+else:
+    for version in registry:
+        registry.chapters(version)
+load = time.perf_counter() - t
+extract = None
+if sys.argv[1] == 'lazy':
+    from dissection_table.database import sources_formatting
+    sources_formatting.sources = registry
+    t = time.perf_counter()
+    for version in registry:
+        sources_formatting.get_version(version)
+    extract = time.perf_counter() - t
+print(json.dumps({'construct': construct, 'load': load, 'extract': extract}))
+"""
+
+# main builds its connection string at import; nothing connects until startup.
+APP_ENV = {"USER": "benchmark", "PASSWORD": "benchmark", "HOST": "localhost",
+           "PORT": "5432", "DATABASE_NAME": "benchmark"}
+
+
+def run(child: str, *args: str) -> dict:
+    env = dict(APP_ENV, **os.environ)
+    output = subprocess.check_output([sys.executable, "-c", child, *args], env=env)
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    imports = run(IMPORT_CHILD)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        eager = run(CHILD, "eager", cache_dir)
+        cold = run(CHILD, "lazy", cache_dir)
+        warm = run(CHILD, "lazy", cache_dir)
+
+    print(f"import sources_formatting:       {imports['sources_formatting'] * 1000:8.1f} ms")
+    print(f"import main (rest of the app):   {imports['main'] * 1000:8.1f} ms")
+    print(f"eager parse of all books:        {eager['load'] * 1000:8.1f} ms")
+    print(f"lazy registry construction:      {cold['construct'] * 1000:8.1f} ms")
+    print(f"all versions, cold disk cache:   {cold['load'] * 1000:8.1f} ms")
+    print(f"all versions, warm disk cache:   {warm['load'] * 1000:8.1f} ms")
+    print(f"extract all versions (warm):     {warm['extract'] * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks.token_array_benchmark.py
+#
+# Memory and word counting of every version as stored so far (the '#'-joined
+# raw_words string, split into a list of str by every consumer) against the
+# int32 token array plus paragraph offsets. Reads the EPUBs, no database needed.
+#
+# Run from the repository root:  python -m benchmarks.token_array_benchmark
+
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from dissection_table.database import sources_formatting
+from dissection_table.database.token_arrays import encode_tokens
+
+
+def list_bytes(words: list) -> int:
+    return sys.getsizeof(words) + sum(sys.getsizeof(word) for word in words)
+
+
+def main():
+    total_str, total_arrays = 0, 0
+    for version in sources_formatting.sources.keys():
+        data = sources_formatting.get_version(version)
+        rows = sources_formatting.word_frequency_rows(version, data['raw_words'])
+        vocabulary = [row[1] for row in rows]
+
+        start = time.perf_counter()
+        words = [word for word in data['raw_words'].split('#') if word]
+        counts = Counter(words)
+        str_ms = (time.perf_counter() - start) * 1000
+        str_bytes = sys.getsizeof(data['raw_words']) + list_bytes(words)
+
+        tokens, offsets = encode_tokens(data['raw_text'], vocabulary)
+        start = time.perf_counter()
+        bincount = np.bincount(tokens)
+        array_ms = (time.perf_counter() - start) * 1000
+        array_bytes = tokens.nbytes + offsets.nbytes
+
+        assert len(offsets) == data['n_paragraphs'] + 1
+        assert bincount.tolist() == [counts[word] for word in vocabulary]
+        total_str += str_bytes
+        total_arrays += array_bytes
+        print(f"{version:20s} {len(tokens):7d} tokens  str {str_bytes / 2**20:6.2f} MiB  "
+              f"arrays {array_bytes / 2**20:5.2f} MiB  count {str_ms:6.2f} ms -> {array_ms:5.2f} ms")
+    print(f"all versions: {total_str / 2**20:.1f} MiB of strings -> {total_arrays / 2**20:.1f} MiB of arrays "
+          f"({total_str / total_arrays:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks.vector_read_benchmark.py
+#
+# Reading a version's embedding matrix: the old path (vector as text, one
+# re.findall + float() per component) against the binary pgvector codec
+# filling a preallocated float32 matrix.
+#   offline -> decoding only, on synthetic rows (no database needed)
+#   --db    -> get_all_embeddings against the Postgres from .env
+#
+# Run from the repository root:  python -m benchmarks.vector_read_benchmark [--db --version spanish_1]
+
+import re
+import time
+import asyncio
+import argparse
+
+import numpy as np
+
+from dissection_table.database.vector_codec import encode_vector, decode_vector
+
+NUMBER = r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?"
+
+
+def regex_matrix(rows: list) -> np.ndarray:
+    return np.array([[float(num) for num in re.findall(NUMBER, str(row))] for row in rows], dtype=np.float32)
+
+
+def codec_matrix(rows: list) -> np.ndarray:
+    matrix = np.empty((len(rows), 768), dtype=np.float32)
+    for ind, row in enumerate(rows):
+        matrix[ind] = decode_vector(row)
+    return matrix
+
+
+def best_of(fn, *args, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def offline(n_rows: int = 1450):
+    vectors = np.random.default_rng(0).standard_normal((n_rows, 768)).astype(np.float32)
+    text_rows = ['[' + ','.join(str(x) for x in vector.tolist()) + ']' for vector in vectors]
+    binary_rows = [encode_vector(vector) for vector in vectors]
+    assert np.allclose(regex_matrix(text_rows), codec_matrix(binary_rows))
+    regex = best_of(regex_matrix, text_rows)
+    codec = best_of(codec_matrix, binary_rows)
+    print(f"decode {n_rows} x 768, text + regex:   {regex * 1000:8.1f} ms")
+    print(f"decode {n_rows} x 768, binary codec:   {codec * 1000:8.1f} ms  ({regex / codec:.0f}x)")
+
+
+async def against_db(version: str):
+    from constants import CONN_STRING
+    from dissection_table.database.engine import init_db, get_db_session
+    from dissection_table.database.ask_db import open_request, get_all_embeddings
+
+    await init_db(CONN_STRING)
+    async for session in get_db_session():
+        start = time.perf_counter()
+        data = await open_request(session, """SELECT embedding::text FROM paragraph
+                                              WHERE version_name = :v_n ORDER BY n_paragraph""",
+                                  params={"v_n": version})
+        regex = regex_matrix([row[0] for row in data])
+        regex_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        codec = await get_all_embeddings(session, version)
+        codec_time = time.perf_counter() - start
+        assert np.allclose(regex, codec, atol=1e-5)
+    print(f"{version}, text + regex:   {regex_time * 1000:8.1f} ms")
+    print(f"{version}, binary codec:   {codec_time * 1000:8.1f} ms  ({regex_time / codec_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", action="store_true")
+    parser.add_argument("--version", default="spanish_1")
+    args = parser.parse_args()
+    offline()
+    if args.db:
+        asyncio.run(against_db(args.version))
@@ -0,0 +1,56 @@
+# benchmarks.vocabulary_benchmark.py
+#
+# Encoding and decoding a whole novel: the dicts int_to_word / word_to_int
+# used to be rebuilt from word_freq, then one Python lookup per word, against
+# one Vocabulary per version (encode / decode in a single call). Reads the
+# EPUBs, no database needed.
+#
+# Run from the repository root:  python -m benchmarks.vocabulary_benchmark
+
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from dissection_table.database import sources_formatting
+from dissection_table.operations.vocabulary import Vocabulary
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def per_word(word_freq, words):
+    word_to_int = dict(zip(word_freq.keys(), range(len(word_freq))))
+    int_to_word = dict(zip(range(len(word_freq)), word_freq.keys()))
+    ids = [word_to_int[word] for word in words]
+    return [int_to_word[ind] for ind in ids]
+
+
+def main():
+    for version in sources_formatting.sources.keys():
+        data = sources_formatting.get_version(version)
+        rows = sources_formatting.word_frequency_rows(version, data['raw_words'])
+        word_freq = OrderedDict((row[1], row[2]) for row in rows)
+        words = [word for word in data['raw_words'].split('#') if word]
+
+        vocabulary = Vocabulary.from_word_freq(word_freq)
+        ids = vocabulary.encode(words)
+        assert np.array_equal(vocabulary.decode(ids), np.array(words, dtype=object))
+        assert vocabulary.decode(ids).tolist() == per_word(word_freq, words)
+
+        old = best_of(lambda: per_word(word_freq, words))
+        new = best_of(lambda: vocabulary.decode(vocabulary.encode(words)))
+        build = best_of(lambda: Vocabulary.from_word_freq(word_freq))
+        print(f"{version:20s} {len(words):6d} words, {len(vocabulary):5d} distinct  "
+              f"dicts + per word {old * 1000:6.2f} ms  vocabulary {new * 1000:6.2f} ms  "
+              f"(built once in {build * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,25 @@ HOST = os.getenv('HOST') # This will come from Docker Compose (host.docker.inter
 PORT = os.getenv("PORT")
 DATABASE_NAME = os.getenv("DATABASE_NAME")
 
+# --- embeddings ---
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "ollama") # ollama | sentence-transformers | onnx
+EMBEDDING_MODEL_PATH = os.getenv("EMBEDDING_MODEL_PATH") # local model dir for the in-process backends
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "granite-embedding:278m")
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+
+# --- connection pool (one engine shared by engine.py and DBInterface) ---
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800")) # seconds, -1 to never recycle
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500")) # asyncpg prepared statements per connection
+DB_READ_FAST_PATH = os.getenv("DB_READ_FAST_PATH", "true").lower() in ("1", "true", "yes") # SELECTs in autocommit
+
+# --- in-process caches ---
+CORPUS_CACHE_BYTES = int(float(os.getenv("CORPUS_CACHE_MB", "512")) * 2**20) # memory budget of the Corpus registry
 
 CONN_STRING_TEMPLATE = "postgresql+asyncpg://{user}:{password}@{host}:{port}/{database_name}"
 CONN_STRING = CONN_STRING_TEMPLATE.replace('{user}', USER)
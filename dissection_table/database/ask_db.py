@@ -7,9 +7,13 @@ from urllib.parse import urlparse
 from typing import Tuple, Set, List, Dict, Any, Union
 import ast
 import numpy as np
-import re # Import the re module for regular expressions
+from .vector_codec import as_vector
+from constants import DB_READ_FAST_PATH
 
 
+# SELECTs through open_request skip the explicit transaction (see read_request).
+READ_FAST_PATH = DB_READ_FAST_PATH
+
 # Assuming DBInterface and Version are defined elsewhere or imported correctly
 # from .db_interface import DBInterface
 # from .models import Version # Ensure this import is correct
@@ -20,23 +24,49 @@ async def open_request(session: AsyncSession,
                        params: Union[Tuple[Any, ...], Dict[str, Any], None] = None,
                        fetch_as_dict: bool = False) -> Union[List[Dict[str, Any]], List[Tuple[Any, ...]], None]:
 
+    if READ_FAST_PATH and is_read_only(sql_question) and not session.in_transaction():
+        return await read_request(session, sql_question, params, fetch_as_dict)
     try:
         async with session.begin():
             result = await session.execute(text(sql_question), params)
-
-            if result.returns_rows:
-                if fetch_as_dict:
-                    column_names = result.keys()
-                    results = [dict(zip(column_names, row)) for row in result.fetchall()]
-                    return results
-                else:
-                    return result.fetchall()
-            else:
-                return None
+            return _fetch(result, fetch_as_dict)
     except Exception as e:
         print(f"Error in open_request: {e}")
         raise
 
+def _fetch(result, fetch_as_dict: bool):
+    if result.returns_rows:
+        if fetch_as_dict:
+            column_names = result.keys()
+            results = [dict(zip(column_names, row)) for row in result.fetchall()]
+            return results
+        else:
+            return result.fetchall()
+    else:
+        return None
+
+def is_read_only(sql_question: str) -> bool:
+    return sql_question.lstrip().upper().startswith("SELECT")
+
+async def read_request(session: AsyncSession,
+                       sql_question: str,
+                       params: Union[Tuple[Any, ...], Dict[str, Any], None] = None,
+                       fetch_as_dict: bool = False) -> Union[List[Dict[str, Any]], List[Tuple[Any, ...]], None]:
+    """
+    Runs a single SELECT in autocommit mode: no BEGIN / COMMIT round trips
+    around it, which is most of the cost of a one-row lookup. The session's
+    connection goes back to the pool (and out of autocommit) afterwards.
+    """
+    try:
+        connection = await session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+        result = await connection.execute(text(sql_question), params)
+        return _fetch(result, fetch_as_dict)
+    except Exception as e:
+        print(f"Error in read_request: {e}")
+        raise
+    finally:
+        await session.commit()
+
 async def get_n_paragraph(session: AsyncSession, version: str, n_paragraph: int):
     n_paragraph = int(n_paragraph)
     data = await open_request(session,
@@ -55,93 +85,129 @@ async def get_n_paragraph_embedding(session: AsyncSession, version: str, n_parag
                               """, params = {"n_p":n_paragraph,"v_n":version})
     if not data:
         return f"this paragraph: {n_paragraph} doesn't exist"
-    raw_embedding_value = data[0][0]
+    return as_vector(data[0][0]).tolist()
 
-    try:
-        if isinstance(raw_embedding_value, (list, np.ndarray)):
-            embedding_list = raw_embedding_value
-        else:
-            numbers_str = re.findall(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", str(raw_embedding_value))
-            embedding_list = [float(num) for num in numbers_str]
-        return embedding_list
-    except (ValueError, TypeError, SyntaxError) as e:
-        return f"Error parsing embedding for paragraph {n_paragraph} in version {version}: {e}"
 
+MAX_BATCH_LIMIT = 1000
 
-async def get_all_embeddings(session: AsyncSession, version: str) -> Union[np.ndarray, str]:
+async def get_paragraph_batch(session: AsyncSession,
+                              versions: List[str],
+                              n_paragraphs: Union[List[int], None] = None,
+                              start: Union[int, None] = None,
+                              end: Union[int, None] = None,
+                              after: Union[Tuple[str, int], None] = None,
+                              limit: int = 200,
+                              include_embedding: bool = False,
+                              include_umap: bool = False) -> Dict[str, Any]:
     """
-    Retrieves all embeddings for a given version, returning them
-    as a NumPy array (matrix), sorted by n_paragraph. Ensures embeddings are
-    parsed as Python lists (vectors) before converting to NumPy.
+    Many paragraphs, of one or several versions, in a single query.
+
+    Paragraphs are picked by an explicit list (`n_paragraphs`, one = ANY), a
+    range (`start`..`end`, inclusive) or both, and come back ordered by
+    (version_name, n_paragraph), the order of the (version_name, n_paragraph)
+    index. Pages are cut with keyset pagination: pass the `next` cursor of a
+    page as `after` to get the following one.
+
+    Args:
+        session (AsyncSession): The database session.
+        versions (List[str]): Version names.
+        n_paragraphs (List[int]): Paragraph numbers to return.
+        start (int): First paragraph number of the range.
+        end (int): Last paragraph number of the range.
+        after (Tuple[str, int]): (version_name, n_paragraph) of the last row already read.
+        limit (int): Rows per page (at most MAX_BATCH_LIMIT).
+        include_embedding (bool): Add each paragraph's 768-dim embedding.
+        include_umap (bool): Add each paragraph's 3-dim UMAP coordinates.
+
+    Returns:
+        Dict[str, Any]: {'paragraphs': [{version_name, n_paragraph, text[, embedding][, umap]}, ...],
+                         'next': (version_name, n_paragraph) cursor or None on the last page}
     """
-    query = """
-        SELECT n_paragraph, embedding FROM paragraph
-        WHERE version_name = :v_n
-        ORDER BY n_paragraph;
+    limit = max(1, min(int(limit), MAX_BATCH_LIMIT))
+    columns = ["version_name", "n_paragraph", "text"]
+    if include_embedding:
+        columns.append("embedding")
+    if include_umap:
+        columns.append("umap")
+
+    conditions = ["version_name = ANY(:versions)"]
+    params: Dict[str, Any] = {"versions": list(versions), "limit": limit + 1}
+    if n_paragraphs is not None:
+        conditions.append("n_paragraph = ANY(:n_paragraphs)")
+        params["n_paragraphs"] = [int(n) for n in n_paragraphs]
+    if start is not None:
+        conditions.append("n_paragraph >= :start")
+        params["start"] = int(start)
+    if end is not None:
+        conditions.append("n_paragraph <= :end")
+        params["end"] = int(end)
+    if after is not None:
+        conditions.append("(version_name, n_paragraph) > (:after_version, :after_n)")
+        params["after_version"], params["after_n"] = after[0], int(after[1])
+
+    query = f"""
+        SELECT {', '.join(columns)} FROM paragraph
+        WHERE {' AND '.join(conditions)}
+        ORDER BY version_name, n_paragraph
+        LIMIT :limit;
     """
-    data = await open_request(session, query, params={"v_n": version})
+    data = await open_request(session, query, params=params, fetch_as_dict=True)
 
-    if not data:
-        return f"This version: {version} doesn't exist or has no embeddings."
+    next_cursor = None
+    if len(data) > limit:
+        data = data[:limit]
+        next_cursor = (data[-1]["version_name"], data[-1]["n_paragraph"])
+    for row in data:
+        for column in ("embedding", "umap"):
+            if column in row:
+                row[column] = as_vector(row[column]).tolist()
+    return {"paragraphs": data, "next": next_cursor}
 
-    embeddings_list = []
-    for item in data:
-        n_paragraph = item[0]
-        raw_embedding_value = item[1]
 
-        try:
-            if isinstance(raw_embedding_value, (list, np.ndarray)):
-                embedding_list_item = raw_embedding_value
-            else:
-                numbers_str = re.findall(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", str(raw_embedding_value))
-                embedding_list_item = [float(num) for num in numbers_str]
-            embeddings_list.append(embedding_list_item)
-        except (ValueError, TypeError, SyntaxError) as e:
-            print(f"Warning: Could not parse embedding for paragraph {n_paragraph} in version {version}. Error: {e}. Skipping this embedding.")
-            continue
-
-    if not embeddings_list:
-        return f"No valid embeddings found for version: {version} after parsing."
-
-    return np.array(embeddings_list, dtype=np.float32)
-
-
-async def get_all_umap_embeddings(session: AsyncSession, version: str) -> Union[np.ndarray, str]:
+async def fetch_vector_matrix(session: AsyncSession, version: str, column: str) -> Union[np.ndarray, None]:
     """
-    Retrieves all UMAP embeddings for a given version, returning them
-    as a NumPy array (matrix), sorted by n_paragraph. Ensures UMAP embeddings are
-    parsed as Python lists (vectors) before converting to NumPy.
+    Fetches one vector column of every paragraph of a version, ordered by
+    n_paragraph, into a preallocated float32 matrix. With the binary codec
+    registered each row is already a NumPy buffer, so this is a copy per row
+    and no text parsing.
     """
-    query = """
-        SELECT n_paragraph, umap FROM paragraph
+    query = f"""
+        SELECT {column} FROM paragraph
         WHERE version_name = :v_n
         ORDER BY n_paragraph;
     """
     data = await open_request(session, query, params={"v_n": version})
-
     if not data:
-        return f"This version: {version} doesn't exist or has no UMAP embeddings."
+        return None
 
-    umap_embeddings_list = []
-    for item in data:
-        n_paragraph = item[0]
-        raw_umap_embedding_value = item[1]
+    first = as_vector(data[0][0])
+    matrix = np.empty((len(data), first.shape[0]), dtype=np.float32)
+    matrix[0] = first
+    for ind in range(1, len(data)):
+        matrix[ind] = as_vector(data[ind][0])
+    return matrix
 
-        try:
-            if isinstance(raw_umap_embedding_value, (list, np.ndarray)):
-                umap_embedding_list_item = raw_umap_embedding_value
-            else:
-                numbers_str = re.findall(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", str(raw_umap_embedding_value))
-                umap_embedding_list_item = [float(num) for num in numbers_str]
-            umap_embeddings_list.append(umap_embedding_list_item)
-        except (ValueError, TypeError, SyntaxError) as e:
-            print(f"Warning: Could not parse UMAP embedding for paragraph {n_paragraph} in version {version}. Error: {e}. Skipping this embedding.")
-            continue
 
-    if not umap_embeddings_list:
-        return f"No valid UMAP embeddings found for version: {version} after parsing."
+async def get_all_embeddings(session: AsyncSession, version: str) -> Union[np.ndarray, str]:
+    """
+    Retrieves all embeddings for a given version, returning them
+    as a NumPy array (matrix), sorted by n_paragraph.
+    """
+    matrix = await fetch_vector_matrix(session, version, "embedding")
+    if matrix is None:
+        return f"This version: {version} doesn't exist or has no embeddings."
+    return matrix
 
-    return np.array(umap_embeddings_list, dtype=np.float32)
+
+async def get_all_umap_embeddings(session: AsyncSession, version: str) -> Union[np.ndarray, str]:
+    """
+    Retrieves all UMAP embeddings for a given version, returning them
+    as a NumPy array (matrix), sorted by n_paragraph.
+    """
+    matrix = await fetch_vector_matrix(session, version, "umap")
+    if matrix is None:
+        return f"This version: {version} doesn't exist or has no UMAP embeddings."
+    return matrix
 
 
 async def get_n_paragraph_umap(session: AsyncSession, version: str, n_paragraph: int) -> Union[List[float], str]:
@@ -156,14 +222,4 @@ async def get_n_paragraph_umap(session: AsyncSession, version: str, n_paragraph:
     if not data:
         return f"This paragraph: {n_paragraph} in version: {version} doesn't exist."
 
-    raw_umap_embedding_value = data[0][0]
-
-    try:
-        if isinstance(raw_umap_embedding_value, (list, np.ndarray)):
-            umap_embedding_list = raw_umap_embedding_value
-        else:
-            numbers_str = re.findall(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", str(raw_umap_embedding_value))
-            umap_embedding_list = [float(num) for num in numbers_str]
-        return umap_embedding_list
-    except (ValueError, SyntaxError, TypeError) as e:
-        return f"Error parsing UMAP embedding for paragraph {n_paragraph} in version {version}: {e}"
+    return as_vector(data[0][0]).tolist()
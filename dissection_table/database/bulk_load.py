@@ -0,0 +1,79 @@
+# dissection_table.database.bulk_load.py
+
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Base
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def column_names(model: Type[Base], keys: Sequence[str]) -> List[str]:
+    """
+    Maps ORM attribute names (what feed_database builds its dicts with, e.g.
+    `words_set`, `text_umap`) to the table's column names (`word_set`, `umap`).
+    Plain column names are passed through.
+    """
+    attributes = {attr.key: attr.columns[0].name for attr in model.__mapper__.column_attrs}
+    return [attributes.get(key, key) for key in keys]
+
+
+def chunked(rows: Iterable[Any], chunk_size: int) -> Iterable[List[Any]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def get_asyncpg_connection(session: AsyncSession):
+    """The asyncpg connection behind a session, inside its current transaction."""
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    return raw_connection.driver_connection
+
+
+async def copy_rows(session: AsyncSession,
+                    model: Type[Base],
+                    rows: Iterable[Union[Dict[str, Any], Tuple[Any, ...]]],
+                    columns: Optional[Sequence[str]] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    table_name: Optional[str] = None) -> int:
+    """
+    Bulk loads rows into a model's table with asyncpg's binary COPY.
+
+    `rows` can be any iterable (a generator keeps memory bounded): dicts keyed
+    by attribute or column names, or tuples in `columns` order. They are sent
+    in chunks of `chunk_size`, one COPY per chunk, inside the session's current
+    transaction; committing is up to the caller. Vector columns are encoded in
+    pgvector's binary format by the codec every engine connection registers
+    when it opens (get_engine -> install_vector_codec).
+
+    Returns:
+        int: The number of rows copied.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+    rows = chain([first], rows)
+
+    if isinstance(first, dict):
+        keys = list(columns) if columns is not None else list(first.keys())
+        rows = (tuple(row[key] for key in keys) for row in rows)
+    elif columns is None:
+        raise ValueError("copy_rows needs `columns` when rows are tuples.")
+    else:
+        keys = list(columns)
+    target_columns = column_names(model, keys)
+    table_name = table_name or model.__tablename__
+
+    conn = await get_asyncpg_connection(session)
+    n_rows = 0
+    for chunk in chunked(rows, chunk_size):
+        await conn.copy_records_to_table(table_name, records=chunk, columns=target_columns)
+        n_rows += len(chunk)
+    return n_rows
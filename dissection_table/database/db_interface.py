@@ -4,8 +4,10 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.future import select
 from sqlalchemy import insert
-from typing import Type, Dict, Any, List, Optional
+from typing import Type, Dict, Any, Iterable, List, Optional
 from contextlib import asynccontextmanager
+from .bulk_load import copy_rows, DEFAULT_CHUNK_SIZE
+from .engine import get_engine, AsyncDBSession
 
 Base = declarative_base()
 
@@ -19,10 +21,9 @@ class DBInterface:
             raise ValueError("DATABASE_URL is wrong or something.")
             
         if cls._engine is None:
-            cls._engine = create_async_engine(database_url, echo=False)
-            cls.AsyncSessionLocal = sessionmaker(
-                cls._engine, expire_on_commit=False, class_=AsyncSession
-            )
+            # Same engine (and pool) as init_db / get_db_session, not a second one.
+            cls._engine = get_engine(database_url)
+            cls.AsyncSessionLocal = AsyncDBSession
             print("DBInterface: SQLAlchemy engine and AsyncSessionLocal initialized.")
         else:
             print("DBInterface: Engine already initialized, skipping.")
@@ -75,6 +76,17 @@ class DBInterface:
             print(f"Successfully performed bulk insert for {len(data_list)} items in {self.model.__name__}.")
             return []
 
+    async def copy_all(self, rows: Iterable[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Bulk loads rows with asyncpg's binary COPY instead of an INSERT with
+        one parameter set per row. `rows` can be a generator; it is consumed
+        in chunks of `chunk_size`, all in one transaction.
+        """
+        async with self.get_session() as session:
+            n_rows = await copy_rows(session, self.model, rows, chunk_size=chunk_size)
+            print(f"Successfully copied {n_rows} items into {self.model.__name__}.")
+            return n_rows
+
     async def read_all(self) -> List[Base]:
         async with self.AsyncSessionLocal() as session:
             result = await session.execute(select(self.model))
@@ -0,0 +1,153 @@
+# dissection_table.database.embedding_backends.py
+
+import os
+import asyncio
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from constants import EMBEDDING_BACKEND, EMBEDDING_MODEL, EMBEDDING_MODEL_PATH
+from dissection_table.database.models import Paragraph
+from dissection_table.database.embedding_client import AsyncEmbeddingClient
+
+# Paragraph.embedding / Version.text_embedding are Vector(768): every backend must match.
+EMBEDDING_DIM = Paragraph.__table__.c.embedding.type.dim
+
+
+class EmbeddingBackend(ABC):
+    """
+    What concat_embeddings needs from an embedding model.
+
+    `name` identifies the model in the embedding cache and in the version
+    fingerprints, so two backends only share a name if they produce the same
+    vectors.
+    """
+    name: str = None
+    dim: int = EMBEDDING_DIM
+
+    @abstractmethod
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """One embedding of `dim` floats per text, in order."""
+
+    def check_dim(self, embeddings: List[List[float]]) -> List[List[float]]:
+        """Raises if the embeddings don't have the `dim` the database stores."""
+        for embedding in embeddings:
+            if len(embedding) != self.dim:
+                raise ValueError(f"{self.name} gives {len(embedding)}-dim embeddings, the database stores {self.dim}.")
+        return embeddings
+
+
+class OllamaBackend(EmbeddingBackend):
+    """Embeddings from an Ollama daemon through AsyncEmbeddingClient."""
+
+    def __init__(self, model: str = EMBEDDING_MODEL, **client_args):
+        # The plain model name keeps fingerprints of existing databases valid.
+        self.name = model
+        self.client = AsyncEmbeddingClient(model=model, **client_args)
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.check_dim(await self.client.embed_documents(texts))
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """
+    In-process CPU embeddings from a sentence-transformers model directory
+    (e.g. a local copy of ibm-granite/granite-embedding-278m-multilingual),
+    optionally through its ONNX export.
+
+    Texts are sorted by token length and packed into batches of at most
+    `max_batch_tokens` padded tokens, so short paragraphs aren't padded to
+    the length of long ones. Inference runs in a worker thread with
+    `n_threads` intra-op threads (all cores by default).
+    """
+
+    def __init__(self,
+                 model_path: str = EMBEDDING_MODEL_PATH,
+                 onnx: bool = False,
+                 max_batch_tokens: int = 16384,
+                 max_batch_size: int = 128,
+                 n_threads: Optional[int] = None):
+        if not model_path:
+            raise ValueError("SentenceTransformerBackend needs a model path (EMBEDDING_MODEL_PATH).")
+        self.model_path = str(model_path)
+        self.onnx = onnx
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.n_threads = n_threads or os.cpu_count() or 1
+        backend = "onnx" if onnx else "torch"
+        self.name = f"sentence-transformers:{Path(self.model_path).name}:{backend}"
+        self._model = None
+
+    def load(self):
+        """Loads the model on first use, so building the backend stays cheap."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            if self.onnx:
+                import onnxruntime
+                session_options = onnxruntime.SessionOptions()
+                session_options.intra_op_num_threads = self.n_threads
+                model = SentenceTransformer(self.model_path, device="cpu", backend="onnx",
+                                            model_kwargs={"provider": "CPUExecutionProvider",
+                                                          "session_options": session_options})
+            else:
+                import torch
+                torch.set_num_threads(self.n_threads)
+                model = SentenceTransformer(self.model_path, device="cpu")
+            dim = model.get_sentence_embedding_dimension()
+            if dim != self.dim:
+                raise ValueError(f"{self.model_path} gives {dim}-dim embeddings, the database stores {self.dim}.")
+            self._model = model
+        return self._model
+
+    def token_batches(self, texts: List[str]) -> List[List[int]]:
+        """Indices of `texts` grouped into length-sorted batches under the token budget."""
+        model = self.load()
+        lengths = [len(ids) for ids in model.tokenizer(texts,
+                                                       truncation=True,
+                                                       max_length=model.max_seq_length)["input_ids"]]
+        order = np.argsort(lengths, kind="stable")[::-1]
+        batches, batch, batch_max = [], [], 0
+        for ind in order:
+            length = lengths[ind]
+            longest = max(batch_max, length)
+            if batch and (longest * (len(batch) + 1) > self.max_batch_tokens
+                          or len(batch) >= self.max_batch_size):
+                batches.append(batch)
+                batch, longest = [], length
+            batch.append(int(ind))
+            batch_max = longest
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _embed_sync(self, texts: List[str]) -> np.ndarray:
+        model = self.load()
+        embeddings = np.empty((len(texts), self.dim), dtype=np.float32)
+        for batch in self.token_batches(texts):
+            embeddings[batch] = model.encode([texts[ind] for ind in batch],
+                                             batch_size=len(batch),
+                                             convert_to_numpy=True,
+                                             normalize_embeddings=True)
+        return embeddings
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        embeddings = await asyncio.to_thread(self._embed_sync, texts)
+        return embeddings.tolist()
+
+
+def get_embedding_backend(kind: str = EMBEDDING_BACKEND) -> EmbeddingBackend:
+    """
+    Builds the configured backend: "ollama" (default), "sentence-transformers"
+    or "onnx" (the sentence-transformers model through its ONNX export).
+    """
+    if kind == "ollama":
+        return OllamaBackend()
+    if kind == "sentence-transformers":
+        return SentenceTransformerBackend()
+    if kind == "onnx":
+        return SentenceTransformerBackend(onnx=True)
+    raise ValueError(f"Unknown embedding backend: {kind}")
@@ -0,0 +1,159 @@
+# dissection_table.database.embedding_cache.py
+
+import os
+import re
+import asyncio
+import json
+import hashlib
+import unicodedata
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from dissection_table.database.source_registry import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # not on POSIX: single writer assumed
+    fcntl = None
+
+EMBEDDING_CACHE_DIR = CACHE_DIR / "embeddings"
+
+
+def normalize_text(text: str) -> str:
+    """NFC + collapsed whitespace, so trivially different copies share one entry."""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def text_key(text: str) -> str:
+    return hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache for one model.
+
+    Vectors live in `<model>.f32`, a flat float32 file with one row per cached
+    text, and `<model>.index.json` maps the hash of each normalized text to its
+    row. New vectors are kept in memory until `flush`, which appends them under
+    a file lock so concurrent ingests don't clobber each other.
+    """
+
+    def __init__(self, model: str, cache_dir: Path = EMBEDDING_CACHE_DIR):
+        self.model = model
+        self.cache_dir = Path(cache_dir)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', model).strip('_')
+        self.vectors_path = self.cache_dir / f"{slug}.f32"
+        self.index_path = self.cache_dir / f"{slug}.index.json"
+        self.lock_path = self.cache_dir / f"{slug}.lock"
+        self.dim = None
+        self.rows: Dict[str, int] = {}
+        self.pending: Dict[str, np.ndarray] = {}
+        self.hits = 0
+        self.misses = 0
+        self._vectors = None
+        self._load_index()
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        self.dim = index["dim"]
+        self.rows = index["rows"]
+        self._vectors = None
+
+    def _matrix(self) -> Optional[np.ndarray]:
+        if self._vectors is None and self.rows and self.vectors_path.exists():
+            n_rows = self.vectors_path.stat().st_size // (4 * self.dim)
+            self._vectors = np.memmap(self.vectors_path, dtype='<f4', mode='r', shape=(n_rows, self.dim))
+        return self._vectors
+
+    def __len__(self) -> int:
+        return len(self.rows) + len(self.pending)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = text_key(text)
+        if key in self.pending:
+            return self.pending[key]
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        matrix = self._matrix()
+        if matrix is None or row >= matrix.shape[0]:
+            return None
+        return np.array(matrix[row])
+
+    def put(self, text: str, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vector.shape[0]
+        elif vector.shape[0] != self.dim:
+            raise ValueError(f"Embedding of size {vector.shape[0]} doesn't fit a cache of size {self.dim} ({self.model}).")
+        self.pending[text_key(text)] = vector
+
+    def _lookup(self, texts: List[str]):
+        vectors = [self.get(text) for text in texts]
+        missing = [ind for ind, vector in enumerate(vectors) if vector is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        unique_texts = list({text_key(texts[ind]): texts[ind] for ind in missing}.values())
+        return vectors, missing, unique_texts
+
+    def _fill(self, texts: List[str], vectors: list, missing: List[int], unique_texts: List[str], new_vectors) -> List[List[float]]:
+        for text, vector in zip(unique_texts, new_vectors):
+            self.put(text, vector)
+        for ind in missing:
+            vectors[ind] = self.get(texts[ind])
+        return [vector.tolist() for vector in vectors]
+
+    def embed(self, texts: List[str], embed_documents: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """
+        Returns the embeddings of `texts`, only calling `embed_documents` for
+        the texts that aren't cached yet (each distinct text once). New
+        vectors are flushed to disk before returning.
+        """
+        vectors, missing, unique_texts = self._lookup(texts)
+        new_vectors = embed_documents(unique_texts) if unique_texts else []
+        embeddings = self._fill(texts, vectors, missing, unique_texts, new_vectors)
+        self.flush()
+        return embeddings
+
+    async def aembed(self, texts: List[str], aembed_documents: Callable[[List[str]], Awaitable[List[List[float]]]]) -> List[List[float]]:
+        """Same as `embed`, for an async `aembed_documents` (e.g. AsyncEmbeddingClient.embed_documents)."""
+        vectors, missing, unique_texts = self._lookup(texts)
+        new_vectors = await aembed_documents(unique_texts) if unique_texts else []
+        embeddings = self._fill(texts, vectors, missing, unique_texts, new_vectors)
+        await asyncio.to_thread(self.flush)
+        return embeddings
+
+    def flush(self):
+        """Appends the pending vectors to the vector file and rewrites the index."""
+        if not self.pending:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # Someone else may have flushed since we loaded: merge their rows first.
+            self._load_index()
+            new_keys = [key for key in self.pending if key not in self.rows]
+            n_rows = self.vectors_path.stat().st_size // (4 * self.dim) if self.vectors_path.exists() else 0
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(n_rows * 4 * self.dim)  # drop a torn row left by a crash
+                for offset, key in enumerate(new_keys):
+                    f.write(self.pending[key].astype('<f4').tobytes())
+                    self.rows[key] = n_rows + offset
+            tmp_path = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model, "dim": self.dim, "rows": self.rows}, f)
+            os.replace(tmp_path, self.index_path)
+        self.pending = {}
+        self._vectors = None
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0.0
+        return (f"embedding cache [{self.model}]: {self.hits} hits, {self.misses} misses "
+                f"({rate:.1f}% hit rate), {len(self)} vectors stored")
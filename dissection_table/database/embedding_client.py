@@ -0,0 +1,120 @@
+# dissection_table.database.embedding_client.py
+
+import time
+import random
+import asyncio
+from typing import Callable, List, Optional
+
+import httpx
+
+from constants import (
+    EMBEDDING_MODEL,
+    OLLAMA_HOST,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CONCURRENCY,
+)
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class EmbeddingRequestError(RuntimeError):
+    """A batch still failed after every retry."""
+
+
+class AsyncEmbeddingClient:
+    """
+    Async client for Ollama's /api/embed endpoint.
+
+    Texts are sent in batches of `batch_size`, with at most `max_concurrency`
+    requests in flight. Transport errors and retryable HTTP statuses are
+    retried with exponential backoff plus jitter; a batch that still fails
+    after `max_retries` raises EmbeddingRequestError. Output order always
+    matches input order. Progress is printed every ~10%, or passed to
+    `progress(done, total, elapsed_seconds)` after every batch if given.
+    """
+
+    def __init__(self,
+                 model: str = EMBEDDING_MODEL,
+                 host: str = OLLAMA_HOST,
+                 batch_size: int = EMBEDDING_BATCH_SIZE,
+                 max_concurrency: int = EMBEDDING_CONCURRENCY,
+                 max_retries: int = 5,
+                 backoff: float = 0.5,
+                 max_backoff: float = 30.0,
+                 timeout: float = 300.0,
+                 progress: Optional[Callable[[int, int, float], None]] = None):
+        if batch_size < 1 or max_concurrency < 1:
+            raise ValueError("batch_size and max_concurrency must be at least 1.")
+        self.model = model
+        self.host = host
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.progress = progress
+        self.retries = 0
+        self.requests = 0
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embeds `texts`, returning one vector per text in the same order."""
+        if not texts:
+            return []
+        batches = [texts[start:start + self.batch_size]
+                   for start in range(0, len(texts), self.batch_size)]
+        results = [None] * len(batches)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limits = httpx.Limits(max_connections=self.max_concurrency)
+        start = time.perf_counter()
+        done = 0
+        reported_step = 0
+        step = max(1, len(texts) // 10)
+
+        async with httpx.AsyncClient(base_url=self.host, timeout=self.timeout, limits=limits) as http:
+            async def run(ind: int, batch: List[str]):
+                async with semaphore:
+                    results[ind] = await self._embed_batch(http, batch)
+                return len(batch)
+
+            tasks = [asyncio.create_task(run(ind, batch)) for ind, batch in enumerate(batches)]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    done += await next_done
+                    elapsed = time.perf_counter() - start
+                    if self.progress is not None:
+                        self.progress(done, len(texts), elapsed)
+                    elif done // step > reported_step or done == len(texts):
+                        reported_step = done // step
+                        print(f"embedded {done}/{len(texts)} texts ({done / max(elapsed, 1e-9):.1f}/s)")
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+        return [vector for batch in results for vector in batch]
+
+    async def _embed_batch(self, http: httpx.AsyncClient, batch: List[str]) -> List[List[float]]:
+        payload = {"model": self.model, "input": batch}
+        for attempt in range(self.max_retries + 1):
+            self.requests += 1
+            try:
+                response = await http.post("/api/embed", json=payload)
+                if response.status_code not in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                    embeddings = response.json()["embeddings"]
+                    if len(embeddings) != len(batch):
+                        raise EmbeddingRequestError(
+                            f"Asked for {len(batch)} embeddings and got {len(embeddings)}.")
+                    return embeddings
+                error = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt == self.max_retries:
+                raise EmbeddingRequestError(
+                    f"Embedding batch of {len(batch)} failed after {attempt + 1} attempts ({error}).")
+            self.retries += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
@@ -1,9 +1,13 @@
 # database/database/engine.py
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker
 from .models import Base
-from constants import CONN_STRING # Assuming CONN_STRING is defined here
+from .vector_codec import install_vector_codec
+from .migrations import run_migrations
+from constants import (CONN_STRING, # Assuming CONN_STRING is defined here
+                       DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+                       DB_POOL_PRE_PING, DB_STATEMENT_CACHE_SIZE)
 import asyncio
 import asyncpg
 from urllib.parse import urlparse
@@ -13,6 +17,34 @@ from typing import Optional # Import Optional for the new argument type
 async_engine = None
 AsyncDBSession = sessionmaker(expire_on_commit=False, class_=AsyncSession)
 
+def create_engine(connection_string: str) -> AsyncEngine:
+    """
+    An async engine with the pool settings from constants (DB_POOL_*) and
+    asyncpg's prepared statement cache sized by DB_STATEMENT_CACHE_SIZE,
+    with the binary vector codec installed.
+    """
+    return install_vector_codec(create_async_engine(
+        connection_string,
+        echo=False,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+    ))
+
+def get_engine(connection_string: Optional[str] = None) -> AsyncEngine:
+    """
+    The process-wide engine, created on first call. init_db and DBInterface
+    both go through here, so the whole app shares one connection pool.
+    """
+    global async_engine
+    if async_engine is None:
+        async_engine = create_engine(connection_string or CONN_STRING)
+        AsyncDBSession.configure(bind=async_engine)
+    return async_engine
+
 async def init_db(connection_string: Optional[str] = None):
     """
     Initializes the database engine, checks for database existence,
@@ -68,14 +100,29 @@ async def init_db(connection_string: Optional[str] = None):
         if temp_conn:
             await temp_conn.close() # Ensure the temporary connection is closed
 
-    async_engine = create_async_engine(db_connection_string, echo=False)
+    # Every engine connection registers the binary `vector` codec as it opens
+    # (install_vector_codec), which fails while the type doesn't exist: the
+    # extension is created first, on a plain connection to the target database.
+    ext_conn = await asyncpg.connect(
+        user=db_user,
+        password=db_password,
+        host=db_host,
+        port=db_port,
+        database=db_name
+    )
+    try:
+        await ext_conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    finally:
+        await ext_conn.close()
+
+    get_engine(db_connection_string)
     
     async with async_engine.begin() as conn:
         print("Ensuring database tables exist...")
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
         print("Database tables checked/created.")
         
-    AsyncDBSession.configure(bind=async_engine)
     print("Database initialization complete.")
 
 # --- NEW: Asynchronous dependency to get a database session ---
@@ -0,0 +1,69 @@
+# dissection_table.database.inverted_index.py
+
+from typing import Iterator, Sequence, Tuple
+
+import numpy as np
+
+# Postings are the positions of a word in its version's token stream
+# (version.tokens), ascending, stored as the first position followed by the
+# gaps between consecutive ones, each as a little-endian base-128 varint:
+# most gaps fit in one or two bytes instead of four.
+VARINT_MAX_BYTES = 5
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """Unsigned 32-bit values as base-128 varints (7 bits per byte, high bit = more bytes follow)."""
+    values = np.asarray(values, dtype=np.uint64)
+    n_bytes = np.ones(len(values), dtype=np.int64)
+    for k in range(1, VARINT_MAX_BYTES):
+        n_bytes += values >= (1 << (7 * k))
+    starts = np.cumsum(n_bytes) - n_bytes
+    out = np.empty(int(n_bytes.sum()), dtype=np.uint8)
+    for k in range(VARINT_MAX_BYTES):
+        mask = n_bytes > k
+        if not mask.any():
+            break
+        low_bits = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (n_bytes[mask] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[mask] + k] = (low_bits | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def decode_varints(data: bytes) -> np.ndarray:
+    """Inverse of encode_varints."""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts + 1
+    values = np.zeros(len(ends), dtype=np.uint64)
+    for k in range(int(lengths.max()) if len(lengths) else 0):
+        mask = lengths > k
+        values[mask] |= (raw[starts[mask] + k] & 0x7F).astype(np.uint64) << np.uint64(7 * k)
+    return values.astype(np.int64)
+
+
+def encode_postings(positions: np.ndarray) -> bytes:
+    """Ascending token positions, delta then varint encoded."""
+    return encode_varints(np.diff(positions, prepend=0))
+
+
+def decode_postings(data: bytes) -> np.ndarray:
+    """The ascending token positions of stored postings."""
+    return np.cumsum(decode_varints(data))
+
+
+def posting_rows(version_name: str, tokens: np.ndarray, vocabulary: Sequence[str]) -> Iterator[Tuple[str, str, int, bytes]]:
+    """
+    The word_posting rows of a version: (word, version_name, n_postings,
+    postings) for every word of `vocabulary` (indexed by the ids in tokens).
+    """
+    # A stable sort groups positions by word id, each group already ascending.
+    order = np.argsort(tokens, kind='stable')
+    counts = np.bincount(tokens, minlength=len(vocabulary))
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    for word_id, word in enumerate(vocabulary):
+        if counts[word_id]:
+            yield (word, version_name, int(counts[word_id]),
+                   encode_postings(order[bounds[word_id]:bounds[word_id + 1]]))
@@ -0,0 +1,160 @@
+# dissection_table.database.migrations.py
+
+from typing import Callable, List, Tuple
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Connection
+
+from .models import Base, SchemaMigration, WordPosting, SEARCH_VECTOR_SQL
+from .token_arrays import encode_tokens, pack, unpack, OFFSET_DTYPE
+from .inverted_index import posting_rows
+
+# Any constant works: it only keeps two processes starting at once from
+# applying the same migration twice.
+MIGRATION_LOCK_KEY = 7_210_955
+
+Migration = Tuple[int, str, Callable[[Connection], None]]
+
+
+def create_indexes(*names: str) -> Callable[[Connection], None]:
+    """
+    A migration step that builds indexes declared on the models (by name), so
+    the models stay the single definition: create_all builds them on new
+    tables, this builds them on tables that already existed.
+    """
+    def migrate(sync_conn: Connection):
+        indexes = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+        for name in names:
+            indexes[name].create(sync_conn, checkfirst=True)
+    return migrate
+
+
+def execute(*statements: str) -> Callable[[Connection], None]:
+    """A migration step that runs plain SQL statements in order."""
+    def migrate(sync_conn: Connection):
+        for statement in statements:
+            sync_conn.execute(text(statement))
+    return migrate
+
+
+def steps(*migrations: Callable[[Connection], None]) -> Callable[[Connection], None]:
+    def migrate(sync_conn: Connection):
+        for migration in migrations:
+            migration(sync_conn)
+    return migrate
+
+
+# Rows an older ingest could have duplicated; unique indexes can't be built over them.
+DEDUPLICATE_PARAGRAPHS = """
+    DELETE FROM paragraph a USING paragraph b
+    WHERE a.version_name = b.version_name AND a.n_paragraph = b.n_paragraph AND a.id > b.id
+"""
+DEDUPLICATE_SIMILARITIES = """
+    DELETE FROM paragraph_similarity a USING paragraph_similarity b
+    WHERE a.source_version_name = b.source_version_name
+      AND a.source_n_paragraph = b.source_n_paragraph
+      AND a.target_version_name = b.target_version_name
+      AND a.rank = b.rank
+      AND a.id > b.id
+"""
+
+# Word counts of versions ingested before word_frequency existed, ranked like
+# sources_formatting.word_frequency_rows: by count, ties by first occurrence.
+BACKFILL_WORD_FREQUENCIES = """
+    INSERT INTO word_frequency (version_name, word, count, rank)
+    SELECT version_name, word, count,
+           row_number() OVER (PARTITION BY version_name ORDER BY count DESC, first_position) - 1
+    FROM (
+        SELECT v.version_name, w.word, count(*) AS count, min(w.position) AS first_position
+        FROM version v, unnest(string_to_array(v.raw_words, '#')) WITH ORDINALITY AS w(word, position)
+        WHERE w.word <> ''
+          AND NOT EXISTS (SELECT 1 FROM word_frequency f WHERE f.version_name = v.version_name)
+        GROUP BY v.version_name, w.word
+    ) counts
+"""
+
+ADD_TOKEN_COLUMNS = (
+    "ALTER TABLE version ADD COLUMN IF NOT EXISTS tokens bytea",
+    "ALTER TABLE version ADD COLUMN IF NOT EXISTS paragraph_offsets bytea",
+)
+
+
+def backfill_tokens(sync_conn: Connection):
+    """Encodes the text of versions ingested before version.tokens existed (one at a time)."""
+    names = sync_conn.execute(text("SELECT version_name FROM version WHERE tokens IS NULL")).scalars().all()
+    for version_name in names:
+        params = {'v_n': version_name}
+        raw_text = sync_conn.execute(text("SELECT raw_text FROM version WHERE version_name = :v_n"), params).scalar()
+        vocabulary = sync_conn.execute(text("SELECT word FROM word_frequency WHERE version_name = :v_n ORDER BY rank"),
+                                       params).scalars().all()
+        tokens, offsets = encode_tokens(raw_text, vocabulary)
+        sync_conn.execute(text("UPDATE version SET tokens = :tokens, paragraph_offsets = :offsets WHERE version_name = :v_n"),
+                          dict(params, tokens=pack(tokens), offsets=pack(offsets, OFFSET_DTYPE)))
+
+
+def backfill_postings(sync_conn: Connection):
+    """Builds the word_posting rows of versions stored before the inverted index existed."""
+    names = sync_conn.execute(text("""
+        SELECT version_name FROM version v
+        WHERE NOT EXISTS (SELECT 1 FROM word_posting p WHERE p.version_name = v.version_name)
+    """)).scalars().all()
+    for version_name in names:
+        params = {'v_n': version_name}
+        tokens = unpack(sync_conn.execute(text("SELECT tokens FROM version WHERE version_name = :v_n"), params).scalar())
+        vocabulary = sync_conn.execute(text("SELECT word FROM word_frequency WHERE version_name = :v_n ORDER BY rank"),
+                                       params).scalars().all()
+        rows = [dict(zip(('word', 'version_name', 'n_postings', 'postings'), row))
+                for row in posting_rows(version_name, tokens, vocabulary)]
+        if rows:
+            sync_conn.execute(insert(WordPosting), rows)
+
+
+ADD_SEARCH_VECTOR = f"""
+    ALTER TABLE paragraph ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED
+"""
+
+
+# Append only: a version number, once released, always means the same change.
+MIGRATIONS: List[Migration] = [
+    (1, "hnsw indexes on paragraph.embedding and version.text_embedding",
+     create_indexes('paragraph_embedding_hnsw_idx', 'version_text_embedding_hnsw_idx')),
+    (2, "composite lookup indexes on paragraph, paragraph_similarity and paragraph_alignment",
+     steps(execute(DEDUPLICATE_PARAGRAPHS, DEDUPLICATE_SIMILARITIES),
+           create_indexes('paragraph_version_n_paragraph_key',
+                          'paragraph_similarity_source_key',
+                          'paragraph_similarity_target_idx',
+                          'paragraph_alignment_pair_key'))),
+    (3, "word_frequency rows for versions already ingested",
+     steps(create_indexes('word_frequency_rank_key'),
+           execute(BACKFILL_WORD_FREQUENCIES))),
+    (4, "version.tokens and version.paragraph_offsets",
+     steps(execute(*ADD_TOKEN_COLUMNS), backfill_tokens)),
+    (5, "word_posting rows for versions already ingested", backfill_postings),
+    (6, "paragraph.search_vector and its GIN index",
+     steps(execute(ADD_SEARCH_VECTOR), create_indexes('paragraph_search_vector_idx'))),
+]
+
+
+def run_migrations(sync_conn: Connection) -> List[int]:
+    """
+    Applies the migrations that aren't recorded in schema_migration yet, in
+    version order, inside the caller's transaction (init_db runs it right
+    after create_all, through `conn.run_sync`).
+
+    Returns:
+        List[int]: The versions applied now.
+    """
+    sync_conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': MIGRATION_LOCK_KEY})
+    SchemaMigration.__table__.create(sync_conn, checkfirst=True)
+    applied = set(sync_conn.execute(select(SchemaMigration.version)).scalars())
+
+    new_versions = []
+    for version, name, migrate in sorted(MIGRATIONS, key=lambda migration: migration[0]):
+        if version in applied:
+            continue
+        print(f"Applying migration {version}: {name}")
+        migrate(sync_conn)
+        sync_conn.execute(insert(SchemaMigration).values(version=version, name=name))
+        new_versions.append(version)
+    return new_versions
@@ -1,14 +1,40 @@
 # database.database.models.py
 from typing import Any
-from sqlalchemy import Column, ForeignKey, Integer, String, Float, BigInteger, Table,PrimaryKeyConstraint,insert
+from sqlalchemy import Column, ForeignKey, Integer, String, Float, BigInteger, Table,PrimaryKeyConstraint,insert, DateTime, func, Index, LargeBinary, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 #from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import Boolean
-from pgvector.sqlalchemy import Vector
+from .vector_codec import NumpyVector as Vector
 Base = declarative_base()
 
+# pgvector HNSW build parameters for the full-dimensional embedding indexes
+# (cosine distance, like the similarity engine). Query-time recall is tuned
+# with hnsw.ef_search, see operations.nearest.
+HNSW_PARAMS = {'m': 16, 'ef_construction': 64}
+
+# Postgres text search configuration of each language, by version name
+# prefix (spanish_1 -> spanish). Anything else is indexed with 'simple'.
+TEXT_SEARCH_CONFIGS = {
+    'spanish': 'spanish',
+    'portuguese': 'portuguese',
+    'english': 'english',
+    'italian': 'italian',
+    'french': 'french',
+    'german': 'german',
+    'turkish': 'turkish',
+}
+
+def search_config_sql(version_column: str = 'version_name') -> str:
+    """SQL expression giving the regconfig of a version name (immutable, so usable in a generated column)."""
+    cases = ' '.join(f"WHEN '{language}' THEN '{config}'::regconfig"
+                     for language, config in TEXT_SEARCH_CONFIGS.items())
+    return f"CASE split_part({version_column}, '_', 1) {cases} ELSE 'simple'::regconfig END"
+
+SEARCH_VECTOR_SQL = f"to_tsvector({search_config_sql()}, text)"
+
 
 def to_dict(obj: Base) -> dict[str, Any]:
     return {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
@@ -27,8 +53,18 @@ class Version(Base):
     n_paragraphs = Column('n_paragraphs', Integer, nullable =False)
     words_set = Column('word_set', String, nullable = False)
     raw_words = Column('raw_words', String, nullable = False)
+    # The cleaned words as int32 ids into the version's word_frequency ranking,
+    # and where each paragraph starts in them (see token_arrays).
+    tokens = Column('tokens', LargeBinary, nullable = True)
+    paragraph_offsets = Column('paragraph_offsets', LargeBinary, nullable = True)
     text_embedding = Column('text_embedding', Vector(768), nullable = False)    
     text_umap = Column('umap', Vector(3), nullable = False)    
+    __table_args__ = (
+        Index('version_text_embedding_hnsw_idx', 'text_embedding',
+              postgresql_using = 'hnsw',
+              postgresql_with = HNSW_PARAMS,
+              postgresql_ops = {'text_embedding': 'vector_cosine_ops'}),
+    )
 class Paragraph(Base):
     __tablename__ = "paragraph"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -38,6 +74,16 @@ class Paragraph(Base):
     embedding = Column("embedding",Vector(768), nullable = False)
     n_words = Column('n_words', Integer, nullable = False)
     umap = Column('umap', Vector(3), nullable = False)    
+    search_vector = Column('search_vector', TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted = True))
+    __table_args__ = (
+        # Every per-paragraph lookup and every ordered version read.
+        Index('paragraph_version_n_paragraph_key', 'version_name', 'n_paragraph', unique = True),
+        Index('paragraph_search_vector_idx', 'search_vector', postgresql_using = 'gin'),
+        Index('paragraph_embedding_hnsw_idx', 'embedding',
+              postgresql_using = 'hnsw',
+              postgresql_with = HNSW_PARAMS,
+              postgresql_ops = {'embedding': 'vector_cosine_ops'}),
+    )
 class ParagraphSimilarity(Base):
     __tablename__ = "paragraph_similarity"
     # The `id` column is the sole primary key, matching the
@@ -48,6 +94,103 @@ class ParagraphSimilarity(Base):
     target_version_name = Column("target_version_name", String, nullable=False)
     target_n_paragraph = Column("target_n_paragraph", Integer, nullable=False)
     rank = Column("rank", Integer, nullable=False)
+    __table_args__ = (
+        # Neighbours of a paragraph in a target version, already in rank order.
+        Index('paragraph_similarity_source_key', 'source_version_name', 'source_n_paragraph',
+              'target_version_name', 'rank', unique = True),
+        # Reverse lookups ("who points to this paragraph") and per-version deletes.
+        Index('paragraph_similarity_target_idx', 'target_version_name', 'target_n_paragraph'),
+    )
+class SimilarityShard(Base):
+    __tablename__ = "similarity_shard"
+    # One row per (source, target) pair whose paragraph_similarity rows are
+    # complete, written in the same transaction as the rows themselves, so
+    # an interrupted create_similarity_data resumes from the missing pairs.
+    source_version_name = Column("source_version_name", String, primary_key=True)
+    target_version_name = Column("target_version_name", String, primary_key=True)
+    k = Column("k", Integer, nullable=False)
+    metric = Column("metric", String, nullable=False)
+    n_rows = Column("n_rows", Integer, nullable=False)
+    completed_at = Column("completed_at", DateTime(timezone=True), server_default=func.now(), nullable=False)
+class ParagraphAlignment(Base):
+    __tablename__ = "paragraph_alignment"
+    # One aligned span per row: source paragraphs source_start..source_end
+    # (inclusive) correspond to target paragraphs target_start..target_end.
+    # 1:1, 1:n and n:1 spans all fit; score is their mean cosine similarity.
+    id = Column(Integer, primary_key=True, autoincrement = True)
+    source_version_name = Column("source_version_name", String, nullable=False)
+    target_version_name = Column("target_version_name", String, nullable=False)
+    n_span = Column("n_span", Integer, nullable=False)
+    source_start = Column("source_start", Integer, nullable=False)
+    source_end = Column("source_end", Integer, nullable=False)
+    target_start = Column("target_start", Integer, nullable=False)
+    target_end = Column("target_end", Integer, nullable=False)
+    score = Column("score", Float, nullable=False)
+    __table_args__ = (
+        Index('paragraph_alignment_pair_key', 'source_version_name', 'target_version_name', 'n_span', unique = True),
+    )
+class WordFrequency(Base):
+    __tablename__ = "word_frequency"
+    # Counts of the cleaned words of a version (Version.raw_words), computed
+    # at ingestion. rank 0 is the most frequent word; ties keep the order of
+    # first occurrence. Byte-ordered words ("C" collation) so prefix queries
+    # are a range scan on the primary key.
+    version_name = Column("version_name", String, primary_key=True)
+    word = Column("word", String(collation="C"), primary_key=True)
+    count = Column("count", Integer, nullable=False)
+    rank = Column("rank", Integer, nullable=False)
+    __table_args__ = (
+        Index('word_frequency_rank_key', 'version_name', 'rank', unique = True),
+    )
+class WordPosting(Base):
+    __tablename__ = "word_posting"
+    # Positional inverted index: where a word occurs in a version's tokens,
+    # delta + varint encoded (see inverted_index). Keyed by word first, so
+    # one index probe finds it in every version.
+    word = Column("word", String(collation="C"), primary_key=True)
+    version_name = Column("version_name", String, primary_key=True)
+    n_postings = Column("n_postings", Integer, nullable=False)
+    postings = Column("postings", LargeBinary, nullable=False)
+class NgramFrequency(Base):
+    __tablename__ = "ngram_frequency"
+    # Counts of the n-grams (n = 1..5, words joined by spaces) of a version
+    # that occur at least NGRAM_MIN_COUNT times, see operations.ngrams. Rank
+    # is per (version, n), 0 being the most frequent.
+    version_name = Column("version_name", String, primary_key=True)
+    n = Column("n", Integer, primary_key=True)
+    ngram = Column("ngram", String(collation="C"), primary_key=True)
+    count = Column("count", Integer, nullable=False)
+    rank = Column("rank", Integer, nullable=False)
+    __table_args__ = (
+        Index('ngram_frequency_rank_key', 'version_name', 'n', 'rank', unique = True),
+        # Cross-version comparison: one n-gram in every version.
+        Index('ngram_frequency_ngram_idx', 'n', 'ngram'),
+    )
+class NgramShard(Base):
+    __tablename__ = "ngram_shard"
+    # One row per version whose ngram_frequency rows are complete, written in
+    # the same transaction as the rows themselves: a version where no n-gram
+    # reaches min_count has no rows but is still marked as counted.
+    version_name = Column("version_name", String, primary_key=True)
+    max_n = Column("max_n", Integer, nullable=False)
+    min_count = Column("min_count", Integer, nullable=False)
+    n_rows = Column("n_rows", Integer, nullable=False)
+    completed_at = Column("completed_at", DateTime(timezone=True), server_default=func.now(), nullable=False)
+class VersionFingerprint(Base):
+    __tablename__ = "version_fingerprint"
+    # What a version was ingested from: if any of these change the version
+    # is extracted, embedded and inserted again by feed_database.
+    version_name = Column("version_name", String, primary_key=True)
+    source_hash = Column("source_hash", String, nullable=False)
+    extraction_hash = Column("extraction_hash", String, nullable=False)
+    embedding_model = Column("embedding_model", String, nullable=False)
+    ingested_at = Column("ingested_at", DateTime(timezone=True), server_default=func.now(), nullable=False)
+class SchemaMigration(Base):
+    __tablename__ = "schema_migration"
+    # Migrations applied by database.migrations.run_migrations.
+    version = Column("version", Integer, primary_key=True, autoincrement=False)
+    name = Column("name", String, nullable=False)
+    applied_at = Column("applied_at", DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 # class ParagraphSimilarity(Base):
 #     __tablename__ = "paragraph_similarity"
@@ -0,0 +1,109 @@
+# dissection_table.database.query_plans.py
+
+import json
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+# The lookups the API and the notebooks run all the time, with the indexes
+# (see models.py) they are expected to use.
+HOT_QUERIES = {
+    "paragraph_by_number": """
+        SELECT text FROM paragraph
+        WHERE n_paragraph = :n_p AND version_name = :v_n
+    """,
+    "version_matrix": """
+        SELECT embedding FROM paragraph
+        WHERE version_name = :v_n
+        ORDER BY n_paragraph
+    """,
+    "similarity_neighbours": """
+        SELECT target_n_paragraph FROM paragraph_similarity
+        WHERE source_version_name = :v_n AND source_n_paragraph = :n_p
+          AND target_version_name = :t_v
+        ORDER BY rank
+    """,
+    "similarity_reverse": """
+        SELECT source_version_name, source_n_paragraph FROM paragraph_similarity
+        WHERE target_version_name = :t_v AND target_n_paragraph = :n_p
+    """,
+    "alignment_spans": """
+        SELECT * FROM paragraph_alignment
+        WHERE source_version_name = :v_n AND target_version_name = :t_v
+        ORDER BY n_span
+    """,
+    "top_words": """
+        SELECT word, count, rank FROM word_frequency
+        WHERE version_name = :v_n AND rank >= 0
+        ORDER BY rank
+        LIMIT 100
+    """,
+    "words_by_prefix": """
+        SELECT word, count, rank FROM word_frequency
+        WHERE version_name = :v_n AND word >= 'pa' AND word < 'pb'
+    """,
+    "paragraph_search": """
+        SELECT version_name, n_paragraph FROM paragraph
+        WHERE search_vector @@ to_tsquery('spanish', 'comala')
+    """,
+    "top_ngrams": """
+        SELECT ngram, count, rank FROM ngram_frequency
+        WHERE version_name = :v_n AND n = 2 AND rank >= 0
+        ORDER BY rank
+        LIMIT 50
+    """,
+}
+
+
+def plan_nodes(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every node of an EXPLAIN (FORMAT JSON) plan, depth first."""
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+async def explain(session: AsyncSession, query: str, params: Dict[str, Any], analyze: bool = False) -> Dict[str, Any]:
+    options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+    result = await session.execute(text(f"EXPLAIN ({options}) {query}"), params)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]
+
+
+async def check_hot_queries(session: AsyncSession, analyze: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    EXPLAINs every query in HOT_QUERIES with parameters taken from the stored
+    corpus and reports, per query, whether it's answered through an index.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: {query name: {'uses_index', 'seq_scans',
+                                   'nodes', 'total_cost' (and 'execution_ms'
+                                   with analyze)}}.
+    """
+    versions = [row[0] for row in (await session.execute(
+        text("SELECT version_name FROM version ORDER BY version_name LIMIT 2"))).fetchall()]
+    if not versions:
+        await session.commit()
+        raise ValueError("No versions ingested: nothing to EXPLAIN against.")
+    params = {"v_n": versions[0], "t_v": versions[-1], "n_p": 1}
+
+    report = {}
+    for name, query in HOT_QUERIES.items():
+        plan = await explain(session, query, params, analyze=analyze)
+        nodes = plan_nodes(plan["Plan"])
+        report[name] = {
+            "uses_index": any(node["Node Type"] in INDEX_NODES for node in nodes),
+            "seq_scans": [node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"],
+            "nodes": [f"{node['Node Type']}" + (f" using {node['Index Name']}" if "Index Name" in node else "")
+                      for node in nodes],
+            "total_cost": plan["Plan"]["Total Cost"],
+        }
+        if analyze:
+            report[name]["execution_ms"] = plan["Execution Time"]
+    await session.commit()
+    return report
@@ -0,0 +1,154 @@
+# dissection_table.database.source_registry.py
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from collections.abc import Mapping
+from typing import Dict, List, Optional
+
+SOURCES_DIR = Path(__file__).resolve().parent / "sources"
+CACHE_DIR = SOURCES_DIR / ".cache"
+
+SOURCE_FILES = {
+    "portuguese_1": "Pedro Páramo (Juan Rulfo [Rulfo, Juan])_portugues_(Z-Library).epub",
+    "spanish_1": "Pedro Paramo (Juan Rulfo)_espanol_(Z-Library).epub",
+    "spanish_2": "Pedro Páramo (Juan Rulfo)_first_espanol_(Z-Library).epub",
+    "english_1": "Pedro Paramo (Juan Rulfo)_peden_(Z-Library).epub",
+    "english_2": "Pedro Paramo (Juan Rulfo)_weatherford_ (Z-Library).epub",
+    "italian_1": "Pedro Páramo (Juan Rulfo)_italian_(Z-Library).epub",
+    "french_1": "Pedro Páramo (Juan Rulfo)_french_(Z-Library).epub",
+    "german_1": "Pedro Pâramo (Rulfo Juan)_german_(Z-Library).epub",
+    "turkish_1": "Pedro Paramo (Rulfo Juan)_turkish_ (Z-Library).epub",
+    "turkish_2": "Pedro Paramo (Juan Rulfo)_turkish_1_(Z-Library).epub",
+}
+
+# Bump when the chapter parsing below changes, so old cache files are ignored.
+CHAPTERS_FORMAT = 1
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Computes the sha256 hex digest of a file's content.
+
+    Args:
+        path (Path): The file to hash.
+        chunk_size (int): Bytes read per iteration.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_chapters(path: Path) -> List[List[str]]:
+    """
+    Parses an EPUB into its chapter list: one list of <p> texts per
+    ITEM_DOCUMENT, in spine order. Everything the extractors in
+    sources_formatting need is derived from this.
+    """
+    import ebooklib
+    from ebooklib import epub
+    from bs4 import BeautifulSoup
+
+    book = epub.read_epub(str(path))
+    chapters = []
+    for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
+        body = BeautifulSoup(item.get_body_content(), 'html.parser')
+        chapters.append([para.get_text() for para in body.find_all('p')])
+    return chapters
+
+
+class SourceRegistry(Mapping):
+    """
+    Lazy registry of the EPUB sources, keyed by version name.
+
+    Nothing is opened at construction time. A book's chapter list is parsed
+    the first time it is asked for and cached on disk under the sha256 of the
+    file, so later processes only pay for a JSON read. Indexing the registry
+    (`sources["turkish_1"]`) still returns the ebooklib book, as before.
+    """
+
+    def __init__(self,
+                 source_files: Optional[Dict[str, str]] = None,
+                 sources_dir: Path = SOURCES_DIR,
+                 cache_dir: Optional[Path] = CACHE_DIR):
+        self.source_files = dict(SOURCE_FILES if source_files is None else source_files)
+        self.sources_dir = Path(sources_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._books = {}
+        self._hashes = {}
+        self._chapters = {}
+
+    def __getitem__(self, version: str):
+        if version not in self.source_files:
+            raise KeyError(version)
+        if version not in self._books:
+            from ebooklib import epub
+            self._books[version] = epub.read_epub(str(self.path(version)))
+        return self._books[version]
+
+    def __iter__(self):
+        return iter(self.source_files)
+
+    def __len__(self) -> int:
+        return len(self.source_files)
+
+    def path(self, version: str) -> Path:
+        """Absolute path of the EPUB file for a version."""
+        return self.sources_dir / self.source_files[version]
+
+    def content_hash(self, version: str) -> str:
+        """sha256 of the version's EPUB file, memoized per (size, mtime)."""
+        path = self.path(version)
+        stat = path.stat()
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = self._hashes.get(version)
+        if cached is None or cached[0] != key:
+            cached = (key, file_hash(path))
+            self._hashes[version] = cached
+        return cached[1]
+
+    def _cache_path(self, digest: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{digest}.chapters.v{CHAPTERS_FORMAT}.json"
+
+    def chapters(self, version: str) -> List[List[str]]:
+        """
+        Returns the parsed chapter list of a version, from memory, the disk
+        cache, or (on a cold cache) by parsing the EPUB and writing the cache.
+        """
+        digest = self.content_hash(version)
+        cached = self._chapters.get(version)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+
+        cache_path = self._cache_path(digest)
+        chapters = None
+        if cache_path is not None and cache_path.exists():
+            try:
+                with open(cache_path, encoding="utf-8") as f:
+                    chapters = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: unreadable source cache {cache_path.name}: {e}. Re-parsing {version}.")
+
+        if chapters is None:
+            chapters = parse_chapters(self.path(version))
+            if cache_path is not None:
+                self._write_cache(cache_path, chapters)
+
+        self._chapters[version] = (digest, chapters)
+        return chapters
+
+    def _write_cache(self, cache_path: Path, chapters: List[List[str]]):
+        # Write to a temporary file first so concurrent readers never see a partial file.
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(chapters, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
@@ -1,33 +1,41 @@
-import ebooklib
-from ebooklib import epub
-from bs4 import BeautifulSoup
 from dissection_table.database.db_interface import DBInterface
-from dissection_table.database.models import Version, Paragraph, ParagraphSimilarity
-import umap.umap_ as umap
+from dissection_table.database.models import Version, Paragraph, ParagraphSimilarity, ParagraphAlignment, SimilarityShard, VersionFingerprint, WordFrequency, WordPosting, NgramFrequency, NgramShard, to_dict
+from dissection_table.database.source_registry import SourceRegistry, SOURCES_DIR, CHAPTERS_FORMAT
+from dissection_table.database.ask_db import open_request
+from dissection_table.database.embedding_cache import EmbeddingCache
+from dissection_table.database.bulk_load import copy_rows
+from dissection_table.database.token_arrays import clean_line, encode_tokens, pack, OFFSET_DTYPE
+from dissection_table.database.inverted_index import posting_rows
+from dissection_table.database.embedding_backends import EmbeddingBackend, get_embedding_backend
 import numpy as np
-import joblib
+import asyncio
+import os
+import hashlib
+import json
 import time
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from dissection_table.database.engine import init_db,get_db_session
 from dissection_table.operations.version_corpus import Corpus
-from scipy.spatial.distance import cdist
+from dissection_table.operations.corpus_registry import corpus_registry
+from dissection_table.operations.similarity import similarity_table, prepare_matrix, init_shard_worker, similarity_shard
+from dissection_table.operations.ngrams import ngram_rows, MAX_N, NGRAM_MIN_COUNT
 from sqlalchemy.ext.asyncio import AsyncSession
-sources = dict()
-sources["portuguese_1"] = epub.read_epub("dissection_table/database/sources/Pedro Páramo (Juan Rulfo [Rulfo, Juan])_portugues_(Z-Library).epub")
-sources["spanish_1"] = epub.read_epub("dissection_table/database/sources/Pedro Paramo (Juan Rulfo)_espanol_(Z-Library).epub")
-sources["spanish_2"] = epub.read_epub("dissection_table/database/sources/Pedro Páramo (Juan Rulfo)_first_espanol_(Z-Library).epub")
-sources["english_1"] = epub.read_epub("dissection_table/database/sources/Pedro Paramo (Juan Rulfo)_peden_(Z-Library).epub")
-sources["english_2"] = epub.read_epub("dissection_table/database/sources/Pedro Paramo (Juan Rulfo)_weatherford_ (Z-Library).epub")
-sources["italian_1"] = epub.read_epub("dissection_table/database/sources/Pedro Páramo (Juan Rulfo)_italian_(Z-Library).epub")
-sources["french_1"] = epub.read_epub("dissection_table/database/sources/Pedro Páramo (Juan Rulfo)_french_(Z-Library).epub")
-sources["german_1"] = epub.read_epub("dissection_table/database/sources/Pedro Pâramo (Rulfo Juan)_german_(Z-Library).epub")
-sources["turkish_1"] = epub.read_epub("dissection_table/database/sources/Pedro Paramo (Rulfo Juan)_turkish_ (Z-Library).epub")
+
+# Nothing is parsed here: books are opened the first time a version is asked for.
+sources = SourceRegistry()
+
+# Bump when get_raw_text / get_version / clean_for_embedding change what they
+# produce, so every version is re-ingested on the next feed_database.
+EXTRACTION_FORMAT = 1
+
+UMAP_REDUCER_PATH = SOURCES_DIR / 'umap_reducer_8_languagues.pkl'
+TEXT_UMAP_REDUCER_PATH = SOURCES_DIR / 'text_umap_reducer.pkl'
 
 def get_german_1_metadata(version:str = None):
-    source = sources[version]
-    source_items = list(source.get_items_of_type(ebooklib.ITEM_DOCUMENT))
-    raw = BeautifulSoup(source_items[2].get_body_content(), 'html.parser')
-    paragraphs = [para.get_text() for para in raw.find_all('p')]
+    chapters = sources.chapters(version)
+    paragraphs = chapters[2]
     text = '\n'.join([x for x in paragraphs[44:-48]])
     meta_one =  "### META_ONE \n"+'\n'.join([x for x in paragraphs[:44]])
     meta_two =  "### META_TWO \n"+'\n'.join([x for x in paragraphs[-48:-21]])
@@ -36,13 +44,10 @@ def get_german_1_metadata(version:str = None):
     return text, metadata
     
 def get_metadata(version:str = None):
-    source = sources[version]
-    source_items = list(source.get_items_of_type(ebooklib.ITEM_DOCUMENT))
+    chapters = sources.chapters(version)
     metadata = []
 
-    for ind,item in enumerate(source_items):
-        data_text = BeautifulSoup(item.get_body_content(), 'html.parser')
-        paragraphs = [para.get_text() for para in data_text.find_all('p')]
+    for ind,paragraphs in enumerate(chapters):
         paragraphs = [x.replace('\xa0', '') for x in paragraphs]
         if len(paragraphs) == 0:
             continue
@@ -53,70 +58,74 @@ def get_metadata(version:str = None):
         
     return '\n'.join([x for x in metadata])
 
+def get_version_data(version:str = None):
+    if version in ("spanish_1", "turkish_1"):
+        return "NO_METADATA"
+    if version == "german_1":
+        _, metadata = get_german_1_metadata(version = version)
+        return metadata
+    return get_metadata(version = version)
+
 spanish_1_hard_coded_data = {}
-spanish_1_hard_coded_data["version_data"] = "NO_METADATA"
 spanish_1_hard_coded_data["author"] = "Juan Rulfo"
 spanish_1_hard_coded_data["year"] = 1955
 spanish_1_hard_coded_data["editorial"] = "www.elejandria.com"
 spanish_1_hard_coded_data["ISBN"] = None
 
 spanish_2_hard_coded_data = {}
-spanish_2_hard_coded_data["version_data"] = get_metadata(version = "spanish_2")
 spanish_2_hard_coded_data["author"] = "Juan Rulfo"
 spanish_2_hard_coded_data["year"] = 2011
 spanish_2_hard_coded_data["editorial"] = "feather"
 spanish_2_hard_coded_data["ISBN"] = None
 
 portugues_1_hard_coded_data = {}
-portugues_1_hard_coded_data["version_data"] = get_metadata(version = "portuguese_1")
 portugues_1_hard_coded_data["author"] = "Eric Nepomuceno"
 portugues_1_hard_coded_data["year"] = 2009
 portugues_1_hard_coded_data["editorial"] = "Edições BestBolso"
 portugues_1_hard_coded_data["ISBN"] = 9788577991167
 
 english_1_hard_coded_data = {}
-english_1_hard_coded_data["version_data"] = get_metadata(version = "english_1")
 english_1_hard_coded_data["author"] = "Margaret Sayers Peden"
 english_1_hard_coded_data["year"] = 1994
 english_1_hard_coded_data["editorial"] = "Grove Press"
 english_1_hard_coded_data["ISBN"] = 9780802133908
 
 english_2_hard_coded_data = {}
-english_2_hard_coded_data["version_data"] = get_metadata(version = "english_2")
 english_2_hard_coded_data["author"] = "Douglas J. Weatherford"
 english_2_hard_coded_data["year"] = 2023
 english_2_hard_coded_data["editorial"] = "Grove Press"
 english_2_hard_coded_data["ISBN"] = 9780802160935
 
 italian_1_hard_coded_data = {}
-italian_1_hard_coded_data["version_data"] = get_metadata(version = "italian_1")
 italian_1_hard_coded_data["author"] = "Paolo Collo"
 italian_1_hard_coded_data["year"] = 2014
 italian_1_hard_coded_data["editorial"] = "Giulio Einaudi editore s.p.a."
 italian_1_hard_coded_data["ISBN"] = 9788858440247
 
 french_1_hard_coded_data = {}
-french_1_hard_coded_data["version_data"] = get_metadata(version = "french_1")
 french_1_hard_coded_data["author"] = "Gabriel Iaculli"
 french_1_hard_coded_data["year"] = 2005
 french_1_hard_coded_data["editorial"] = "Éditions Gallimard"
 french_1_hard_coded_data["ISBN"] = 9782070379538
 
 german_1_hard_coded_data = {}
-_, else_data = get_german_1_metadata(version = "german_1")
-german_1_hard_coded_data["version_data"] = else_data
 german_1_hard_coded_data["author"] = "Dagmar Ploetz"
 german_1_hard_coded_data["year"] = 2008
 german_1_hard_coded_data["editorial"] = "Carl Hanser Verlag Munich"
 german_1_hard_coded_data["ISBN"] = 9783446230668
 
 turkish_1_hard_coded_data = {}
-turkish_1_hard_coded_data["version_data"] = 'NO_METADATA'
 turkish_1_hard_coded_data["author"] = "Tomris Uyar"
 turkish_1_hard_coded_data["year"] = 1983
 turkish_1_hard_coded_data["editorial"] = "Can Yayinlari"
 turkish_1_hard_coded_data["ISBN"] = None
 
+turkish_2_hard_coded_data = {}
+turkish_2_hard_coded_data["author"] = "Tomris Uyar"
+turkish_2_hard_coded_data["year"] = 1983
+turkish_2_hard_coded_data["editorial"] = "Can Yayinlari"
+turkish_2_hard_coded_data["ISBN"] = None
+
 
 versions_data = dict()
 versions_data["spanish_1"] = spanish_1_hard_coded_data
@@ -128,61 +137,44 @@ versions_data["italian_1"] = italian_1_hard_coded_data
 versions_data["french_1"] = french_1_hard_coded_data
 versions_data["german_1"] = german_1_hard_coded_data
 versions_data["turkish_1"] = turkish_1_hard_coded_data
+versions_data["turkish_2"] = turkish_2_hard_coded_data
 
     
 
 
 
 def get_raw_text(source: dict= {}):
+    if source not in sources:
+        print(f'VERSION :: {source} :: not found, returning original: "spanish_1"')
+        return "NO VERSION SORRY"
+    chapters = sources.chapters(source)
     if source == "portuguese_1":
-        source = sources["portuguese_1"]
-        whole_text = list(source.get_items_of_type(ebooklib.ITEM_DOCUMENT))[6]
-        whole_text = BeautifulSoup(whole_text.get_body_content(), 'html.parser')
-        paragraphs = [para.get_text() for para in whole_text.find_all('p')][:-2]
+        paragraphs = chapters[6][:-2]
         paragraphs = [x.replace('\xa0', '') for x in paragraphs]
         return '\n'.join([x for x in paragraphs])
     elif source == "spanish_1":
-        source = sources["spanish_1"]
-        whole_text = list(source.get_items_of_type(ebooklib.ITEM_DOCUMENT))[0]
-        whole_text = BeautifulSoup(whole_text.get_body_content(), 'html.parser')
-        paragraphs = [para.get_text() for para in whole_text.find_all('p')][:-3]
+        paragraphs = chapters[0][:-3]
         paragraphs = [x.replace('\xa0', '') for x in paragraphs]
         return '\n'.join([x for x in paragraphs])
     elif source == "spanish_2":
-        source = sources["spanish_2"]
-        whole_text = list(source.get_items_of_type(ebooklib.ITEM_DOCUMENT))[0]
-        whole_text = BeautifulSoup(whole_text.get_body_content(), 'html.parser')
-        paragraphs = [para.get_text() for para in whole_text.find_all('p')]
+        paragraphs = chapters[0]
         paragraphs = [x.replace('\xa0', '') for x in paragraphs]
         return '\n'.join([x for x in paragraphs])
     elif source == "english_1":
-        source = sources["english_1"]
-        whole_text = list(source.get_items_of_type(ebooklib.ITEM_DOCUMENT))[1]
-        whole_text = BeautifulSoup(whole_text.get_body_content(), 'html.parser')
-        paragraphs = [para.get_text() for para in whole_text.find_all('p')]
+        paragraphs = chapters[1]
         paragraphs = [x.replace('\xa0', '') for x in paragraphs]
         return '\n'.join([x for x in paragraphs[:-1]])
     elif source == "english_2":
-        source = sources["english_2"]
-        whole_text = list(source.get_items_of_type(ebooklib.ITEM_DOCUMENT))[6]
-        whole_text = BeautifulSoup(whole_text.get_body_content(), 'html.parser')
-        paragraphs = [para.get_text() for para in whole_text.find_all('p')]
+        paragraphs = chapters[6]
         paragraphs = [x.replace('\xa0', '') for x in paragraphs]
         return '\n'.join([x for x in paragraphs])
     elif source == "italian_1":
-        source = sources["italian_1"]
-        whole_text = list(source.get_items_of_type(ebooklib.ITEM_DOCUMENT))[6]
-        whole_text = BeautifulSoup(whole_text.get_body_content(), 'html.parser')
-        paragraphs = [para.get_text() for para in whole_text.find_all('p')]
+        paragraphs = chapters[6]
         paragraphs = [x.replace('\xa0', '') for x in paragraphs]
         return '\n'.join([x for x in paragraphs])
     elif source == "french_1":
-        source = sources["french_1"]
-        general = list(source.get_items_of_type(ebooklib.ITEM_DOCUMENT))
-        a = BeautifulSoup(general[3].get_body_content(), 'html.parser')
-        b = BeautifulSoup(general[4].get_body_content(), 'html.parser')
-        b = [para.get_text() for para in b.find_all('p')]
-        a = [para.get_text() for para in a.find_all('p')]
+        a = chapters[3]
+        b = chapters[4]
         complete = a[4:] + b
         complete = [x.replace('\xa0', '') for x in complete]
         return '\n'.join([x for x in complete])
@@ -190,38 +182,23 @@ def get_raw_text(source: dict= {}):
         text,_ = get_german_1_metadata(version = "german_1")
         return text
     elif source == "turkish_1":
-        source = sources["turkish_1"]
-        source = list(source.get_items_of_type(ebooklib.ITEM_DOCUMENT))
-        whole_text = BeautifulSoup(source[2].get_body_content(), 'html.parser')
-        paragraphs = [para.get_text() for para in whole_text.find_all('p')][:-2]
+        paragraphs = chapters[2][:-2]
+        return '\n'.join([x for x in paragraphs])
+    elif source == "turkish_2":
+        paragraphs = chapters[1][:-2]
         return '\n'.join([x for x in paragraphs])
     else:
         print(f'VERSION :: {source} :: not found, returning original: "spanish_1"')
         return "NO VERSION SORRY"
 
-import unicodedata
-def clean_line(string: str = None) -> str:
-    apostrophes = {"'", "’", "`"}
-    
-    cleaned_chars = []
-    for char in string:
-        if unicodedata.category(char).startswith('L') or char in apostrophes:
-            cleaned_chars.append(char)
-    
-    cleaned_string = "".join(cleaned_chars)
-    
-    cleaned_string = cleaned_string.lower()
-    
-    return cleaned_string
-
-
 def get_version(source:str = None):
     try:
-        hard_coded_data = versions_data[source]
+        hard_coded_data = dict(versions_data[source])
     except:
         print(f"Sorcue: {source} doesn't exists")
         return
     
+    hard_coded_data["version_data"] = get_version_data(source)
     hard_coded_data["raw_text"] = get_raw_text(source)
     hard_coded_data["version_name"] = source
     
@@ -241,12 +218,72 @@ def get_version(source:str = None):
     hard_coded_data['words_set'] = '#'.join([x for x in word_set])
     hard_coded_data['raw_words'] = raw_words
     return hard_coded_data
+
+WORD_FREQUENCY_COLUMNS = ("version_name", "word", "count", "rank")
+WORD_POSTING_COLUMNS = ("word", "version_name", "n_postings", "postings")
+NGRAM_COLUMNS = ("version_name", "n", "ngram", "count", "rank")
+
+def word_frequency_rows(version_name: str, raw_words: str) -> list:
+    """
+    The word_frequency rows of a version: (version_name, word, count, rank)
+    for every cleaned word in raw_words, rank 0 being the most frequent.
+    Ties keep the order in which the words first appear in the text.
+    """
+    counts = Counter(word for word in raw_words.split('#') if word)
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    return [(version_name, word, count, rank) for rank, (word, count) in enumerate(ranked)]
+
+def clean_for_embedding(paragraphs: list) -> list:
+    clean_paragraphs = [
+                        [clean_line(x).replace('  ',' ') for x in paragraphs[ind].split(' ')]
+                        for ind in range(len(paragraphs))
+                        ]
+    clean_paragraphs = [' '.join([x for x in clean_paragraphs[ind]])
+                        for ind in range(len(clean_paragraphs))]
+    clean_paragraphs = [x[1:].replace('  ',' ') if x.startswith(' ') else x.replace('  ',' ') for x in clean_paragraphs]
+    return clean_paragraphs
+
+def extract_version(source: str = None):
+    """
+    CPU-bound extraction of one version: EPUB chapters -> version row data
+    plus the cleaned paragraphs that get embedded. Top-level so it can run
+    in a worker process.
+
+    Returns:
+        tuple: (version_data, clean_for_embedding)
+    """
+    data_version = get_version(source)
+    return data_version, clean_for_embedding(data_version['paragraphs'])
+
+async def extract_versions(versions: list, max_workers: int = None):
+    """
+    Runs extract_version for every version on a process pool and yields the
+    (version_data, clean_for_embedding) tuples in completion order, so the
+    event loop stays free and consumers can start on the first finished book.
+
+    Args:
+        versions (list): Version names to extract.
+        max_workers (int): Pool size, defaults to the number of cores.
+    """
+    if not versions:
+        return
+    loop = asyncio.get_running_loop()
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [loop.run_in_executor(pool, extract_version, version) for version in versions]
+        for next_done in asyncio.as_completed(futures):
+            version_data, clean_paragraphs = await next_done
+            print(f"extracted: {version_data['version_name']} ({len(clean_paragraphs)} paragraphs)")
+            yield version_data, clean_paragraphs
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
     
 async def get_umap_model(n_components:int = 3,
                         n_neighbors: int = 15,
                         min_dist:float = 0.1,
                         random_state:int = 42,
                         ):
+    import umap.umap_ as umap
     n_components = 3
     n_neighbors = 15
     min_dist = 0.1
@@ -258,96 +295,101 @@ async def get_umap_model(n_components:int = 3,
             random_state=random_state
         )
     return reducer
-from sqlalchemy import insert
+from sqlalchemy import insert, delete, or_
 
-async def insert_paragraph_similarities(session: AsyncSession, similarity_data: dict):
-    """
-    Inserts similarity data from a nested dictionary into the database
-    using a bulk insert approach with a DBInterface object.
-    Explicitly generates an ID for each entry to avoid IntegrityError.
+SIMILARITY_COLUMNS = ("source_version_name", "source_n_paragraph",
+                      "target_version_name", "target_n_paragraph", "rank")
 
-    Args:
-        session (AsyncSession): The SQLAlchemy async session.
-        similarity_data (dict): The nested dictionary with similarity results.
+def iter_similarity_rows(similarity_data: dict):
+    """
+    Flattens {'version#i': {target: [n_paragraph, ...]}} into
+    (source_version_name, source_n_paragraph, target_version_name,
+    target_n_paragraph, rank) tuples, one at a time.
     """
-    new_similarity_entries = []
-    
     # Iterate through the top-level keys like 'portuguese_1#0'
     for source_key, target_data in similarity_data.items():
-        # Split the source key to get the version name and paragraph number
         source_version_name, source_n_paragraph_str = source_key.split('#')
         source_n_paragraph = int(source_n_paragraph_str)
-        
-        # Iterate through the inner dictionary of target versions
+        # The list is ordered by rank
         for target_version_name, target_n_paragraphs in target_data.items():
-            # The list contains the ranks, so we enumerate to get the rank
             for rank, target_n_paragraph in enumerate(target_n_paragraphs):
-                # Create a dictionary representing the data for one row
-                similarity_entry = {
-                    "source_version_name": source_version_name,
-                    "source_n_paragraph": source_n_paragraph,
-                    "target_version_name": target_version_name,
-                    "target_n_paragraph": target_n_paragraph,
-                    "rank": rank
-                }
-                new_similarity_entries.append(similarity_entry)
-                
-    
-    # Use async with for transaction management and perform the bulk insert
+                yield (source_version_name, source_n_paragraph,
+                       target_version_name, int(target_n_paragraph), rank)
+
+async def insert_paragraph_similarities(session: AsyncSession, similarity_data: dict):
+    """
+    Inserts similarity data from a nested dictionary into the database,
+    streaming the rows through a chunked binary COPY.
+
+    Args:
+        session (AsyncSession): The SQLAlchemy async session.
+        similarity_data (dict): The nested dictionary with similarity results.
+    """
     async with session.begin():
-        await session.execute(
-            insert(ParagraphSimilarity),
-            new_similarity_entries
-        )
-async def paragraph_similarity():
-    results = {}
+        n_rows = await copy_rows(session, ParagraphSimilarity,
+                                 iter_similarity_rows(similarity_data),
+                                 columns=SIMILARITY_COLUMNS)
+    print(f"Copied {n_rows} rows into paragraph_similarity.")
+async def paragraph_similarity(k: int = 3, metric: str = "cosine"):
+    """
+    Top-k most similar paragraphs of every other version for each paragraph,
+    on the UMAP coordinates, as {'version#i': {target_version: [n_paragraph, ...]}}.
+    """
     matrices = {}
     async with DBInterface(ParagraphSimilarity).get_session() as session:
-        for source in sources.keys():
-            matrix = await Corpus.create(session, source)
+        for source in await get_ingested_versions(session):
+            matrix = await Corpus.create(session, source, load=())
             matrices[source] = await matrix.all_umap()
-        
-    for source_name, source_matrix in matrices.items():
-        for i, source_row in enumerate(source_matrix):
-            row_key = f'{source_name}#{i}'
-            results[row_key] = {}
-            
-            for target_name, target_matrix in matrices.items():
-                if source_name == target_name:
-                    continue
-                distances = cdist(source_row.reshape(1, -1), target_matrix, 'cosine')[0]
-                similarities = 1 - distances
-                num_target_rows = target_matrix.shape[0]
-                num_to_get = min(3, num_target_rows)
-                top_3_indices = np.argsort(similarities)[-num_to_get:][::-1]
-                
-                results[row_key][target_name] = top_3_indices.tolist()
-
-    return results
-async def concat_embeddings(sources):
+
+    return similarity_table(matrices, k=k, metric=metric)
+async def _iterate_sources(sources):
+    if hasattr(sources, '__aiter__'):
+        async for item in sources:
+            yield item
+    else:
+        for item in sources:
+            yield item
+
+async def concat_embeddings(sources, umap_reducer=None, text_umap_reducer=None,
+                            backend: EmbeddingBackend = None):
+    """
+    Embeds every paragraph of every version, then reduces them with UMAP.
+    `sources` can be a list of (version_data, clean_for_embedding) tuples or
+    an async iterator of them (see extract_versions); each version is
+    embedded as soon as it arrives.
+
+    When already-fitted reducers are passed (incremental ingestion) the new
+    embeddings are projected into their space instead of fitting new ones.
+    `backend` defaults to the one configured by EMBEDDING_BACKEND.
+    """
     index = []
     all_paragraphs_text = []
+    embeddings = []
+    received_sources = []
     
-    for version_data, paragraphs_list_of_strings in sources:
+    print('ollama_start_embeddings')
+    star_ollama_embeddings = time.time()
+    backend = backend if backend is not None else get_embedding_backend()
+    embedding_cache = EmbeddingCache(backend.name)
+    async for version_data, paragraphs_list_of_strings in _iterate_sources(sources):
         version_name = version_data['version_name']
-
-        
+        received_sources.append((version_data, paragraphs_list_of_strings))
         
         for ind, paragraph_text_string in enumerate(paragraphs_list_of_strings):
             index.append(f"{version_name}#{ind}")
             all_paragraphs_text.append(paragraph_text_string)
-    
-    print('ollama_start_embeddings')
-    star_ollama_embeddings = time.time()
-    from langchain_ollama import OllamaEmbeddings  
-    ollama_emb = OllamaEmbeddings(model="granite-embedding:278m")
-    embeddings = ollama_emb.embed_documents(all_paragraphs_text)
+        embeddings += await embedding_cache.aembed(paragraphs_list_of_strings, backend.embed_documents)
+    sources = received_sources
     print('ollama_end_embeddings')
     print(f'TIME ELAPSED FOR ALL EMBEDDINGS: {(time.time()-star_ollama_embeddings)/60}')
     print('umap_start_reducer')
     star_umap_embeddings = time.time()
-    umap_reducer = await get_umap_model()
-    umap_embeddings = umap_reducer.fit_transform(embeddings)
+    fit_reducers = umap_reducer is None
+    if fit_reducers:
+        umap_reducer = await get_umap_model()
+        umap_embeddings = await asyncio.to_thread(umap_reducer.fit_transform, embeddings)
+    else:
+        umap_embeddings = await asyncio.to_thread(umap_reducer.transform, embeddings)
     print('umap_end_reducer')
     print(f'TIME ELAPSED FOR ALL EMBEDDINGS: {(time.time()-star_umap_embeddings)/60}')
 
@@ -359,13 +401,16 @@ async def concat_embeddings(sources):
         raw_texts_list.append(version_data['raw_text'])
     
     print('Generating embeddings for raw texts...')
-    text_embeddings = ollama_emb.embed_documents(raw_texts_list)
+    text_embeddings = await embedding_cache.aembed(raw_texts_list, backend.embed_documents)
+    print(embedding_cache.report())
     print(f'TIME ELAPSED FOR ALL PARAGRAPH_EMB: {(time.time()-start_all_embeddings)/60}')
     start_all_umap = time.time()
     print('Applying UMAP reduction to raw text embeddings...')
-    all_umap_reducer = await get_umap_model(n_neighbors = 2)
-    
-    text_umap_embeddings = all_umap_reducer.fit_transform(text_embeddings)
+    if fit_reducers or text_umap_reducer is None:
+        text_umap_reducer = await get_umap_model(n_neighbors = 2)
+        text_umap_embeddings = await asyncio.to_thread(text_umap_reducer.fit_transform, text_embeddings)
+    else:
+        text_umap_embeddings = await asyncio.to_thread(text_umap_reducer.transform, text_embeddings)
     print(f'TIME ELAPSED FOR ALL UMAP: {(time.time()-start_all_umap)/60}')
     print('Assigning text embeddings and UMAP to version data...')
     for i, (version_data, _) in enumerate(sources):
@@ -373,36 +418,138 @@ async def concat_embeddings(sources):
         version_data['text_umap'] = text_umap_embeddings[i].tolist()
 
     versions = [x[0] for x in sources]
-    joblib.dump(umap_reducer,'dissection_table/database/sources/umap_reducer_8_languagues.pkl')
+    if fit_reducers:
+        import joblib
+        joblib.dump(umap_reducer, UMAP_REDUCER_PATH)
+        joblib.dump(text_umap_reducer, TEXT_UMAP_REDUCER_PATH)
     return index, embeddings, umap_embeddings, all_paragraphs_text, versions
 
 
     
-async def feed_database():
-    packed_sources = []
-    for current_version in sources.keys():
-        
-        version_interface = DBInterface(Version)
-        paragraph_interface = DBInterface(Paragraph)
-        
-        data_version = get_version(current_version)
-        
-        
-        # the repetition happens here
-        text = data_version["raw_text"]
-        paragraphs = data_version['paragraphs']
-        clean_for_embedding = [
-                                [clean_line(x).replace('  ',' ') for x in paragraphs[ind].split(' ')]
-                                for ind in range(len(paragraphs))
-                                ]
-        clean_for_embedding = [' '.join([x for x in clean_for_embedding[ind]])
-                                for ind in range(len(clean_for_embedding))]
-        clean_for_embedding = [x[1:].replace('  ',' ') if x.startswith(' ') else x.replace('  ',' ') for x in clean_for_embedding]
-
-        packed_sources.append((data_version, clean_for_embedding))
-        
-    index, embeddings, umap_embeddings, paragraphs, versions = await concat_embeddings(packed_sources)
-    version_paragraphs = []
+def get_fingerprint(source: str = None, embedding_model: str = None) -> dict:
+    """
+    What a version is ingested from: the EPUB content hash, a hash of the
+    extraction parameters (hard-coded data and format versions) and the
+    embedding model (backend name). feed_database re-ingests a version when
+    any of them change.
+    """
+    extraction_params = json.dumps({"extraction_format": EXTRACTION_FORMAT,
+                                    "chapters_format": CHAPTERS_FORMAT,
+                                    "hard_coded_data": versions_data[source]},
+                                   sort_keys=True, default=str)
+    return {
+        "version_name": source,
+        "source_hash": sources.content_hash(source),
+        "extraction_hash": hashlib.sha256(extraction_params.encode('utf-8')).hexdigest(),
+        "embedding_model": embedding_model if embedding_model is not None else get_embedding_backend().name,
+    }
+
+async def get_stored_fingerprints(session: AsyncSession) -> dict:
+    data = await open_request(session,
+                              """
+                              SELECT version_name, source_hash, extraction_hash, embedding_model
+                              FROM version_fingerprint
+                              """,
+                              fetch_as_dict=True)
+    return {x['version_name']: x for x in data}
+
+async def get_ingested_versions(session: AsyncSession) -> list:
+    data = await open_request(session, "SELECT version_name FROM version")
+    return [x[0] for x in data]
+
+def load_umap_reducers():
+    """Returns the (paragraph, text) UMAP reducers saved by the last full ingest, or (None, None)."""
+    if not UMAP_REDUCER_PATH.exists() or not TEXT_UMAP_REDUCER_PATH.exists():
+        return None, None
+    import joblib
+    return joblib.load(UMAP_REDUCER_PATH), joblib.load(TEXT_UMAP_REDUCER_PATH)
+
+async def replace_version(session: AsyncSession, version: dict, paragraphs: list, fingerprint: dict,
+                          word_frequencies: list = None):
+    """
+    Swaps one version's rows in a single transaction: drops whatever was
+    ingested under its name before (paragraphs, word frequencies and
+    postings, similarities, similarity shards and alignments pointing to or
+    from it, the fingerprint) and inserts the new rows.
+
+    word_frequencies defaults to word_frequency_rows of the version's raw_words.
+    The version row gets its text as word ids (tokens, paragraph_offsets; see
+    token_arrays.encode_tokens) over that vocabulary, and the words their
+    positions in the inverted index (word_posting). Its n-gram counts (and
+    ngram_shard row) are dropped and left to create_ngram_data.
+    """
+    version_name = version['version_name']
+    if word_frequencies is None:
+        word_frequencies = word_frequency_rows(version_name, version['raw_words'])
+    vocabulary = [row[1] for row in word_frequencies]
+    tokens, offsets = encode_tokens(version['raw_text'], vocabulary)
+    version = dict(version, tokens=pack(tokens), paragraph_offsets=pack(offsets, OFFSET_DTYPE))
+    async with session.begin():
+        await session.execute(delete(ParagraphSimilarity).where(
+            or_(ParagraphSimilarity.source_version_name == version_name,
+                ParagraphSimilarity.target_version_name == version_name)))
+        await session.execute(delete(SimilarityShard).where(
+            or_(SimilarityShard.source_version_name == version_name,
+                SimilarityShard.target_version_name == version_name)))
+        await session.execute(delete(ParagraphAlignment).where(
+            or_(ParagraphAlignment.source_version_name == version_name,
+                ParagraphAlignment.target_version_name == version_name)))
+        await session.execute(delete(Paragraph).where(Paragraph.version_name == version_name))
+        await session.execute(delete(WordFrequency).where(WordFrequency.version_name == version_name))
+        await session.execute(delete(WordPosting).where(WordPosting.version_name == version_name))
+        await session.execute(delete(NgramFrequency).where(NgramFrequency.version_name == version_name))
+        await session.execute(delete(NgramShard).where(NgramShard.version_name == version_name))
+        await session.execute(delete(Version).where(Version.version_name == version_name))
+        await session.execute(delete(VersionFingerprint).where(VersionFingerprint.version_name == version_name))
+        await copy_rows(session, Version, [version])
+        await copy_rows(session, Paragraph, paragraphs)
+        await copy_rows(session, WordFrequency, word_frequencies, columns=WORD_FREQUENCY_COLUMNS)
+        await copy_rows(session, WordPosting, posting_rows(version_name, tokens, vocabulary),
+                        columns=WORD_POSTING_COLUMNS)
+        await session.execute(insert(VersionFingerprint), [fingerprint])
+    # Shared Corpus objects of this version describe the rows just replaced.
+    corpus_registry.invalidate(version_name)
+
+async def feed_database(max_workers: int = None, force: bool = False):
+    """
+    Ingests the versions that are new or changed since the last run.
+
+    A version is skipped when its stored fingerprint (see get_fingerprint)
+    matches the current one, so on an up-to-date database no EPUB is opened
+    and nothing is embedded. New paragraphs are projected with the saved UMAP
+    reducers so they share a space with the versions already stored; without
+    saved reducers every version is re-ingested and the reducers refitted.
+
+    Args:
+        max_workers (int): Process pool size for the extraction stage.
+        force (bool): Re-ingest every version regardless of fingerprints.
+    """
+    backend = get_embedding_backend()
+    fingerprints = {version: get_fingerprint(version, backend.name) for version in sources.keys()}
+    async with DBInterface(Version).AsyncSessionLocal() as session:
+        stored = await get_stored_fingerprints(session)
+        ingested = await get_ingested_versions(session)
+
+    pending = [version for version, fingerprint in fingerprints.items()
+               if force or stored.get(version) != fingerprint]
+    if not pending:
+        print('feed_database: every version is up to date, nothing to ingest.')
+        await create_ngram_data(max_workers=max_workers)
+        return "UP TO DATE"
+
+    kept = [version for version in ingested if version not in pending]
+    umap_reducer, text_umap_reducer = load_umap_reducers() if kept else (None, None)
+    if kept and umap_reducer is None:
+        print('feed_database: no saved UMAP reducers, re-ingesting every version into a new UMAP space.')
+        pending = list(fingerprints.keys())
+    print(f'feed_database: ingesting {pending}')
+
+    extracted = extract_versions(pending, max_workers=max_workers)
+    index, embeddings, umap_embeddings, paragraphs, versions = await concat_embeddings(extracted,
+                                                                                       umap_reducer=umap_reducer,
+                                                                                       text_umap_reducer=text_umap_reducer,
+                                                                                       backend=backend)
+    version_paragraphs = {version['version_name']: [] for version in versions}
     for ind, index_data in enumerate(index):
         
         data = dict()
@@ -412,34 +559,189 @@ async def feed_database():
         data["n_words"] = len([x for x in paragraphs[ind].split(' ') if len(x)>0])
         data["embedding"] = embeddings[ind]
         data['umap'] = umap_embeddings[ind]
-        version_paragraphs.append(data)
+        version_paragraphs[data['version_name']].append(data)
+
     for version in versions:
-        
-        try:
-            version.pop('paragraphs')
-        except:
-            print('%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%')
-            print(version['version_name'])
-            print('%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%')
-
-    await version_interface.create_all(versions)
-    await paragraph_interface.create_all(version_paragraphs)
+        version.pop('paragraphs', None)
+        version_name = version['version_name']
+        async with DBInterface(Version).AsyncSessionLocal() as session:
+            await replace_version(session,
+                                  version=version,
+                                  paragraphs=version_paragraphs[version_name],
+                                  fingerprint=fingerprints[version_name])
+        print(f'feed_database: {version_name} stored ({len(version_paragraphs[version_name])} paragraphs)')
+    if ingested:
+        print('feed_database: paragraph_similarity rows of the ingested versions were dropped, run create_similarity_data again.')
+    await create_ngram_data(max_workers=max_workers)
     
     return "DONEEEEEEEEEEEEEEEEEEE"
     
-async def create_similarity_data():
-    similarity_data  = await paragraph_similarity()
-    async with DBInterface(ParagraphSimilarity).get_session() as session:
-        await insert_paragraph_similarities(session=session, similarity_data=similarity_data)
-
-
-
-
-
-
+async def get_completed_shards(session: AsyncSession, k: int, metric: str) -> set:
+    data = await open_request(session,
+                              """
+                              SELECT source_version_name, target_version_name FROM similarity_shard
+                              WHERE k = :k AND metric = :metric
+                              """,
+                              params={"k": k, "metric": metric})
+    return {(x[0], x[1]) for x in data}
+
+def iter_shard_rows(source_version_name: str, target_version_name: str, indices):
+    """(source_version_name, source_n_paragraph, target_version_name, target_n_paragraph, rank) tuples of one shard."""
+    for source_n_paragraph, row in enumerate(indices.tolist()):
+        for rank, target_n_paragraph in enumerate(row):
+            yield (source_version_name, source_n_paragraph,
+                   target_version_name, target_n_paragraph, rank)
+
+async def store_similarity_shard(session: AsyncSession, source_version_name: str, target_version_name: str,
+                                 indices, k: int, metric: str) -> int:
+    """
+    Replaces one pair's paragraph_similarity rows and marks the shard as
+    done, in a single transaction: a crash leaves either the whole shard or
+    nothing of it.
+    """
+    async with session.begin():
+        await session.execute(delete(ParagraphSimilarity).where(
+            ParagraphSimilarity.source_version_name == source_version_name,
+            ParagraphSimilarity.target_version_name == target_version_name))
+        await session.execute(delete(SimilarityShard).where(
+            SimilarityShard.source_version_name == source_version_name,
+            SimilarityShard.target_version_name == target_version_name))
+        n_rows = await copy_rows(session, ParagraphSimilarity,
+                                 iter_shard_rows(source_version_name, target_version_name, indices),
+                                 columns=SIMILARITY_COLUMNS)
+        await session.execute(insert(SimilarityShard), [{
+            'source_version_name': source_version_name,
+            'target_version_name': target_version_name,
+            'k': k, 'metric': metric, 'n_rows': n_rows}])
+    return n_rows
+
+async def create_similarity_data(k: int = 3, metric: str = "cosine",
+                                 max_workers: int = None, restart: bool = False):
+    """
+    Rebuilds paragraph_similarity as one shard per ordered (source, target)
+    pair of ingested versions, computed on a process pool.
 
+    Each shard is written to the database as soon as its worker finishes,
+    together with its similarity_shard row, so a rerun after an interruption
+    only computes the pairs that are missing (or were computed with another
+    k / metric).
 
+    Args:
+        k (int): Neighbours per paragraph and target version.
+        metric (str): "cosine", "dot" or "euclidean" (see operations.similarity).
+        max_workers (int): Pool size, defaults to the number of cores.
+        restart (bool): Drop every finished shard and start over.
+    """
+    async with DBInterface(ParagraphSimilarity).get_session() as session:
+        if restart:
+            async with session.begin():
+                await session.execute(delete(SimilarityShard))
+                await session.execute(delete(ParagraphSimilarity))
+        versions = await get_ingested_versions(session)
+        completed = await get_completed_shards(session, k, metric)
+        pending = [(source, target) for source in versions for target in versions
+                   if source != target and (source, target) not in completed]
+        if not pending:
+            print(f"similarity: all {len(completed)} shards already done")
+            return 0
+
+        matrices = {}
+        for version in {name for pair in pending for name in pair}:
+            corpus = await Corpus.create(session, version, load=())
+            matrices[version] = prepare_matrix(await corpus.all_umap(), metric)
+        print(f"similarity: {len(pending)} shards to compute, {len(completed)} already done")
+
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(max_workers=max_workers,
+                                   initializer=init_shard_worker, initargs=(matrices,))
+        n_rows, n_done = 0, 0
+        try:
+            futures = [loop.run_in_executor(pool, similarity_shard, source, target, k, metric)
+                       for source, target in pending]
+            for next_done in asyncio.as_completed(futures):
+                source, target, indices = await next_done
+                n_rows += await store_similarity_shard(session, source, target, indices, k, metric)
+                n_done += 1
+                print(f"similarity shard {n_done}/{len(pending)}: {source} -> {target}")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    print(f"Copied {n_rows} rows into paragraph_similarity.")
+    return n_rows
+
+async def get_versions_without_ngrams(session: AsyncSession, max_n: int, min_count: int) -> list:
+    data = await open_request(session,
+                              """
+                              SELECT version_name FROM version v
+                              WHERE NOT EXISTS (SELECT 1 FROM ngram_shard s
+                                                WHERE s.version_name = v.version_name
+                                                  AND s.max_n = :max_n AND s.min_count = :min_count)
+                              """,
+                              params={"max_n": max_n, "min_count": min_count})
+    return [x[0] for x in data]
+
+async def store_ngrams(session: AsyncSession, version_name: str, rows: list, max_n: int, min_count: int) -> int:
+    """
+    Replaces one version's ngram_frequency rows and marks it as counted, in
+    a single transaction: a crash leaves either the whole version or nothing
+    of it.
+    """
+    async with session.begin():
+        await session.execute(delete(NgramFrequency).where(NgramFrequency.version_name == version_name))
+        await session.execute(delete(NgramShard).where(NgramShard.version_name == version_name))
+        n_rows = await copy_rows(session, NgramFrequency, rows, columns=NGRAM_COLUMNS)
+        await session.execute(insert(NgramShard), [{
+            'version_name': version_name, 'max_n': max_n, 'min_count': min_count, 'n_rows': n_rows}])
+    return n_rows
+
+async def create_ngram_data(max_n: int = MAX_N, min_count: int = NGRAM_MIN_COUNT,
+                            max_workers: int = None, restart: bool = False):
+    """
+    Counts the n-grams (n = 1..max_n) of every version not counted yet with
+    these max_n / min_count (no ngram_shard row), one version per worker
+    process, from its token ids (version.tokens) with
+    operations.ngrams.ngram_rows.
 
+    A version's tokens are only read when a worker is free for it, and its
+    rows are written (with its ngram_shard row) as soon as the worker
+    finishes, so at most one version per worker is held in memory.
 
+    Args:
+        max_n (int): Longest n-gram counted.
+        min_count (int): N-grams seen fewer times aren't stored.
+        max_workers (int): Pool size, defaults to the number of cores.
+        restart (bool): Drop every version's n-grams and count them all again.
+    """
+    async with DBInterface(NgramFrequency).get_session() as session:
+        if restart:
+            async with session.begin():
+                await session.execute(delete(NgramShard))
+                await session.execute(delete(NgramFrequency))
+        pending = await get_versions_without_ngrams(session, max_n, min_count)
+        if not pending:
+            print("ngrams: every version already counted")
+            return 0
+
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+        # One version in flight per worker; the session serves one query at a time.
+        slots = asyncio.Semaphore(max_workers or os.cpu_count() or 1)
+        session_lock = asyncio.Lock()
+
+        async def count(version):
+            async with slots:
+                async with session_lock:
+                    corpus = await Corpus.create(session, version, load=('tokens', 'paragraph_offsets'))
+                    words = (await corpus.vocabulary()).words.tolist()
+                rows = await loop.run_in_executor(pool, ngram_rows, version, corpus.tokens,
+                                                  corpus.paragraph_offsets, words, max_n, min_count)
+                async with session_lock:
+                    n_rows = await store_ngrams(session, version, rows, max_n, min_count)
+            print(f"ngrams: {version} stored ({n_rows} rows)")
+            return n_rows
 
-    
\ No newline at end of file
+        try:
+            n_rows = sum(await asyncio.gather(*(count(version) for version in pending)))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    print(f"Copied {n_rows} rows into ngram_frequency.")
+    return n_rows
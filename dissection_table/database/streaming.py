@@ -0,0 +1,115 @@
+# dissection_table.database.streaming.py
+
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .engine import AsyncDBSession
+from .vector_codec import as_vector
+
+DEFAULT_TEXT_CHUNK = 64 * 1024
+DEFAULT_BATCH_SIZE = 500
+
+# Streams outlive the request handler that starts them, so each one opens
+# its own session instead of using the request's (get_db_session). Checks
+# made before the response starts (version_exists) use the request's.
+
+
+async def stream_rows(query: str,
+                      params: Optional[Dict[str, Any]] = None,
+                      batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Rows of `query` as dicts, read through a server-side cursor `batch_size`
+    rows at a time, so memory doesn't grow with the size of the result.
+    """
+    async with AsyncDBSession() as session:
+        result = await session.stream(text(query), params,
+                                      execution_options={"yield_per": batch_size})
+        async for row in result.mappings():
+            yield dict(row)
+
+
+async def version_exists(session: AsyncSession, version: str) -> bool:
+    """Whether a version is stored, without reading any of its text."""
+    result = await session.execute(text("SELECT 1 FROM version WHERE version_name = :v_n"), {"v_n": version})
+    return result.scalar() is not None
+
+
+async def stream_raw_text(version: str,
+                          chunk_size: int = DEFAULT_TEXT_CHUNK,
+                          batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[str]:
+    """
+    A version's raw_text in pieces of about `chunk_size` characters (whole
+    lines), so the whole novel is never held in the worker at once.
+
+    The lines come from one query through a server-side cursor (stream_rows):
+    raw_text is detoasted once for the split. A substr() per chunk would
+    decompress the stored value from its start on every call.
+    """
+    query = """
+        SELECT line FROM version, regexp_split_to_table(raw_text, chr(10)) WITH ORDINALITY AS lines(line, n)
+        WHERE version_name = :v_n
+        ORDER BY n
+    """
+    pieces, size, separator = [], 0, ''
+    async for row in stream_rows(query, {"v_n": version}, batch_size=batch_size):
+        pieces.append(separator + row['line'])
+        separator = '\n'
+        size += len(pieces[-1])
+        if size >= chunk_size:
+            yield ''.join(pieces)
+            pieces, size = [], 0
+    if pieces:
+        yield ''.join(pieces)
+
+
+def _jsonable(row: Dict[str, Any]) -> Dict[str, Any]:
+    for column in ("embedding", "umap"):
+        if row.get(column) is not None:
+            row[column] = as_vector(row[column]).tolist()
+    return row
+
+
+async def ndjson(rows: AsyncIterator[Dict[str, Any]], lines_per_chunk: int = 100) -> AsyncIterator[str]:
+    """Serializes rows as newline-delimited JSON, `lines_per_chunk` lines per chunk sent."""
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps(_jsonable(row), ensure_ascii=False))
+        if len(lines) >= lines_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+async def stream_paragraphs(version: str,
+                            include_embedding: bool = False,
+                            include_umap: bool = False,
+                            batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """Every paragraph of a version in order: n_paragraph, text, n_words (and embedding / umap)."""
+    columns = ["n_paragraph", "text", "n_words"]
+    if include_embedding:
+        columns.append("embedding")
+    if include_umap:
+        columns.append("umap")
+    query = f"""
+        SELECT {', '.join(columns)} FROM paragraph
+        WHERE version_name = :v_n
+        ORDER BY n_paragraph
+    """
+    async for row in stream_rows(query, {"v_n": version}, batch_size=batch_size):
+        yield row
+
+
+async def stream_paragraph_words_freq(version: str,
+                                      batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """(n_paragraph, n_words) of every paragraph of a version, in order."""
+    query = """
+        SELECT n_paragraph, n_words FROM paragraph
+        WHERE version_name = :v_n
+        ORDER BY n_paragraph
+    """
+    async for row in stream_rows(query, {"v_n": version}, batch_size=batch_size):
+        yield row
@@ -0,0 +1,71 @@
+# dissection_table.database.token_arrays.py
+
+import unicodedata
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Stored little-endian whatever the machine, so a version's bytea reads the same everywhere.
+TOKEN_DTYPE = np.dtype('<i4')
+OFFSET_DTYPE = np.dtype('<i4')
+
+
+def clean_line(string: str = None) -> str:
+    apostrophes = {"'", "’", "`"}
+
+    cleaned_chars = []
+    for char in string:
+        if unicodedata.category(char).startswith('L') or char in apostrophes:
+            cleaned_chars.append(char)
+
+    cleaned_string = "".join(cleaned_chars)
+
+    cleaned_string = cleaned_string.lower()
+
+    return cleaned_string
+
+
+def paragraph_words(raw_text: str) -> List[List[str]]:
+    """
+    The cleaned words of every paragraph of a version: the non-empty lines
+    of raw_text (the paragraphs get_version stores), split on spaces and
+    cleaned like raw_words. Tokens left empty by cleaning (punctuation,
+    numbers) are dropped.
+    """
+    paragraphs = [x for x in raw_text.split('\n') if len(x)>0]
+    cleaned = []
+    for paragraph in paragraphs:
+        words = (clean_line(x) for x in paragraph.split(' ') if len(x)>0)
+        cleaned.append([word for word in words if word])
+    return cleaned
+
+
+def encode_tokens(raw_text: str, vocabulary: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    A version's text as word ids: the position of every word in
+    `vocabulary` (its word_frequency rows in rank order, so id == rank).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (tokens, offsets). tokens is the int32
+        id of every word in reading order; paragraph n is
+        tokens[offsets[n]:offsets[n + 1]] (offsets has n_paragraphs + 1 entries).
+    """
+    word_to_id = {word: ind for ind, word in enumerate(vocabulary)}
+    paragraphs = paragraph_words(raw_text)
+    offsets = np.zeros(len(paragraphs) + 1, dtype=OFFSET_DTYPE)
+    np.cumsum([len(words) for words in paragraphs], out=offsets[1:])
+    tokens = np.fromiter((word_to_id[word] for words in paragraphs for word in words),
+                         dtype=TOKEN_DTYPE, count=int(offsets[-1]))
+    return tokens, offsets
+
+
+def pack(array: np.ndarray, dtype: np.dtype = TOKEN_DTYPE) -> bytes:
+    """The bytea stored for a token or offset array."""
+    return np.ascontiguousarray(array, dtype=dtype).tobytes()
+
+
+def unpack(data: Optional[bytes], dtype: np.dtype = TOKEN_DTYPE) -> Optional[np.ndarray]:
+    """A read-only array over stored bytes, without copying them (None stays None)."""
+    if data is None:
+        return None
+    return np.frombuffer(data, dtype=dtype)
@@ -0,0 +1,90 @@
+# dissection_table.database.vector_codec.py
+
+import struct
+import numpy as np
+import pgvector.sqlalchemy as pgvector_sqlalchemy
+
+# Our own codec rather than pgvector.asyncpg.register_vector: that one decodes
+# to pgvector.Vector objects, while every reader here (fetch_vector_matrix,
+# as_vector, NumpyVector) wants plain float32 arrays, and the encoder also
+# takes lists and the '[1,2,3]' text form. Speed is not the reason: decoding
+# 5,000 768-dim vectors takes ~26 ms here against ~31 ms for
+# Vector.from_binary(...).to_numpy().
+#
+# pgvector's binary wire format: uint16 dim, uint16 unused (0), then dim
+# big-endian float32.
+_HEADER = struct.Struct('>HH')
+
+
+def encode_vector(value) -> bytes:
+    """
+    Encodes a vector in pgvector's binary format. Accepts NumPy arrays,
+    lists of floats, pgvector.Vector objects and the '[1,2,3]' text form.
+    """
+    if isinstance(value, str):
+        value = value.strip()[1:-1].split(',')
+    elif hasattr(value, 'to_numpy'):
+        value = value.to_numpy()
+    array = np.asarray(value, dtype='>f4')
+    if array.ndim != 1:
+        raise ValueError(f"Expected a 1-d vector, got shape {array.shape}.")
+    return _HEADER.pack(array.shape[0], 0) + array.tobytes()
+
+
+def decode_vector(data: bytes) -> np.ndarray:
+    """Decodes pgvector's binary format into a native float32 NumPy array."""
+    dim, _ = _HEADER.unpack_from(data)
+    return np.frombuffer(data, dtype='>f4', count=dim, offset=_HEADER.size).astype(np.float32)
+
+
+async def register_vector_codec(conn, schema: str = 'public'):
+    """Makes an asyncpg connection send and receive `vector` in binary."""
+    await conn.set_type_codec('vector',
+                              schema=schema,
+                              encoder=encode_vector,
+                              decoder=decode_vector,
+                              format='binary')
+
+
+def install_vector_codec(engine):
+    """
+    Registers the binary `vector` codec on every asyncpg connection the
+    engine opens, so vectors come back as float32 NumPy arrays instead of
+    '[...]' strings.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _register_on_connect(dbapi_connection, connection_record):
+        dbapi_connection.run_async(register_vector_codec)
+
+    return engine
+
+
+def as_vector(value) -> np.ndarray:
+    """
+    A stored vector as a float32 array, whatever form the driver returned
+    (NumPy with the binary codec, list, or the '[...]' text form without it).
+    """
+    if isinstance(value, np.ndarray):
+        return value
+    if isinstance(value, (list, tuple)):
+        return np.asarray(value, dtype=np.float32)
+    return np.array(str(value).strip()[1:-1].split(','), dtype=np.float32)
+
+
+class NumpyVector(pgvector_sqlalchemy.Vector):
+    """
+    pgvector's SQLAlchemy type, letting NumPy arrays decoded by the binary
+    codec through untouched instead of parsing them as text.
+    """
+    cache_ok = True
+
+    def result_processor(self, dialect, coltype):
+        parse_text = super().result_processor(dialect, coltype)
+
+        def process(value):
+            if value is None or isinstance(value, np.ndarray):
+                return value
+            return parse_text(value)
+        return process
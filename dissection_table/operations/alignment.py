@@ -0,0 +1,221 @@
+# dissection_table.operations.alignment.py
+
+import math
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dissection_table.database.models import ParagraphAlignment
+from dissection_table.database.bulk_load import copy_rows
+from dissection_table.database.ask_db import get_all_embeddings, open_request
+from dissection_table.operations.similarity import prepare_matrix
+
+DIAGONAL, VERTICAL, HORIZONTAL = 0, 1, 2
+DEFAULT_MERGE_PENALTY = 0.05
+
+ALIGNMENT_COLUMNS = ("source_version_name", "target_version_name", "n_span",
+                     "source_start", "source_end", "target_start", "target_end", "score")
+# Transaction-scoped lock on one (source, target) pair, namespaced so it
+# can't collide with other advisory locks (see migrations.MIGRATION_LOCK_KEY).
+PAIR_LOCK_QUERY = "SELECT pg_advisory_xact_lock(hashtext('paragraph_alignment'), hashtext(:source || '->' || :target))"
+
+
+def band_offsets(n_source: int, n_target: int, band: int) -> Tuple[np.ndarray, int]:
+    """
+    First target column of every source row's band and the band width.
+
+    The band follows the scaled diagonal (row i is centred on column
+    i * (n_target - 1) / (n_source - 1)), so versions with different paragraph
+    counts still align end to end.
+    """
+    width = min(2 * band + 1, n_target)
+    centers = np.rint(np.arange(n_source) * (n_target - 1) / max(n_source - 1, 1)).astype(np.int64)
+    return np.clip(centers - band, 0, n_target - width), width
+
+
+def _shifted(row: np.ndarray, shift: int) -> np.ndarray:
+    """row[k + shift] for every k, inf where that falls outside the row."""
+    out = np.full_like(row, np.inf)
+    if shift >= 0:
+        out[:row.shape[0] - shift] = row[shift:]
+    else:
+        out[-shift:] = row[:shift]
+    return out
+
+
+def align_matrices(source: np.ndarray,
+                   target: np.ndarray,
+                   band: Optional[int] = None,
+                   merge_penalty: float = DEFAULT_MERGE_PENALTY) -> List[Dict[str, Any]]:
+    """
+    Monotonic alignment of two versions' paragraph embeddings.
+
+    Dynamic time warping restricted to a band around the diagonal: the cost of
+    matching two paragraphs is their cosine distance, a diagonal step starts a
+    new span and a vertical (horizontal) step merges one more source (target)
+    paragraph into the current span, for `merge_penalty` extra. Only the band
+    is scored and only one move per cell is kept, so time and memory are
+    O(n_source * band) instead of O(n_source * n_target).
+
+    Args:
+        source (np.ndarray): (n_source, dim) embeddings, in paragraph order.
+        target (np.ndarray): (n_target, dim) embeddings, in paragraph order.
+        band (Optional[int]): Columns allowed on each side of the diagonal
+                              (default: 5% of the longer version, at least 16).
+        merge_penalty (float): Cost added to every 1:n / n:1 step.
+
+    Returns:
+        List[Dict[str, Any]]: Spans in order, each with source_start, source_end,
+                              target_start, target_end (inclusive) and score
+                              (mean cosine similarity of its matched pairs).
+    """
+    source = prepare_matrix(source, "cosine")
+    target = prepare_matrix(target, "cosine")
+    n_source, n_target = source.shape[0], target.shape[0]
+    if n_source == 0 or n_target == 0:
+        return []
+    if band is None:
+        band = max(16, math.ceil(0.05 * max(n_source, n_target)))
+    # Consecutive bands must overlap for a path to exist.
+    band = max(band, math.ceil(n_target / n_source) + 1)
+    lo, width = band_offsets(n_source, n_target, band)
+
+    moves = np.empty((n_source, width), dtype=np.int8)
+    previous = None
+    for i in range(n_source):
+        cost = 1.0 - target[lo[i]:lo[i] + width] @ source[i]
+        if previous is None:
+            entry = np.full(width, np.inf, dtype=np.float32)
+            entry[0] = cost[0]
+            moves[i] = DIAGONAL
+        else:
+            shift = int(lo[i] - lo[i - 1])
+            diagonal = _shifted(previous, shift - 1)
+            vertical = _shifted(previous, shift) + merge_penalty
+            moves[i] = np.where(diagonal <= vertical, DIAGONAL, VERTICAL)
+            entry = cost + np.minimum(diagonal, vertical)
+        # Horizontal steps inside the row, D[k] = min(entry[k], D[k-1] + cost[k] + penalty),
+        # as a prefix minimum instead of a Python loop over the band.
+        steps = np.cumsum(cost + merge_penalty)
+        candidates = entry - steps
+        best = np.minimum.accumulate(candidates)
+        moves[i][candidates > best] = HORIZONTAL
+        previous = steps + best
+
+    if not np.isfinite(previous[n_target - 1 - lo[-1]]):
+        raise ValueError("No alignment path inside the band; use a wider band.")
+
+    path = []
+    i, j = n_source - 1, n_target - 1
+    while True:
+        move = moves[i][j - lo[i]]
+        path.append((i, j, move))
+        if i == 0 and j == 0:
+            break
+        if move == DIAGONAL:
+            i, j = i - 1, j - 1
+        elif move == VERTICAL:
+            i -= 1
+        else:
+            j -= 1
+    path.reverse()
+
+    rows = np.array([cell[0] for cell in path])
+    columns = np.array([cell[1] for cell in path])
+    similarities = np.einsum('ij,ij->i', source[rows], target[columns])
+
+    spans = []
+    for (i, j, move), similarity in zip(path, similarities.tolist()):
+        if move == DIAGONAL or not spans:
+            spans.append({'source_start': i, 'source_end': i,
+                          'target_start': j, 'target_end': j,
+                          'score': similarity, 'pairs': 1})
+        else:
+            span = spans[-1]
+            span['source_end'], span['target_end'] = i, j
+            span['score'] += similarity
+            span['pairs'] += 1
+    for span in spans:
+        span['score'] /= span.pop('pairs')
+    return spans
+
+
+async def compute_alignment(session: AsyncSession,
+                            source_version: str,
+                            target_version: str,
+                            band: Optional[int] = None,
+                            merge_penalty: float = DEFAULT_MERGE_PENALTY) -> List[Dict[str, Any]]:
+    """
+    Aligns two stored versions on their 768-dim paragraph embeddings and
+    replaces whatever alignment was stored for the pair.
+
+    The replacement holds an advisory lock on the pair, so two requests
+    aligning it at once write one after the other instead of both inserting
+    into paragraph_alignment_pair_key.
+    """
+    source = await get_all_embeddings(session, source_version)
+    target = await get_all_embeddings(session, target_version)
+    for version, matrix in ((source_version, source), (target_version, target)):
+        if isinstance(matrix, str):
+            raise ValueError(f"This version: {version} doesn't exist or has no embeddings.")
+
+    spans = await asyncio.to_thread(align_matrices, source, target, band, merge_penalty)
+    rows = ((source_version, target_version, n_span,
+             span['source_start'], span['source_end'],
+             span['target_start'], span['target_end'], span['score'])
+            for n_span, span in enumerate(spans))
+    async with session.begin():
+        await session.execute(text(PAIR_LOCK_QUERY), {'source': source_version, 'target': target_version})
+        await session.execute(delete(ParagraphAlignment).where(
+            ParagraphAlignment.source_version_name == source_version,
+            ParagraphAlignment.target_version_name == target_version))
+        await copy_rows(session, ParagraphAlignment, rows, columns=ALIGNMENT_COLUMNS)
+    print(f"aligned {source_version} -> {target_version}: {len(spans)} spans")
+    return spans
+
+
+async def get_alignment(session: AsyncSession,
+                        source_version: str,
+                        target_version: str,
+                        with_text: bool = False,
+                        recompute: bool = False,
+                        band: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    The aligned paragraph spans between two versions, computed and stored on
+    first request.
+
+    Args:
+        with_text (bool): Add the joined text of each side of every span.
+        recompute (bool): Align again even if the pair is stored.
+        band (Optional[int]): Band for a new alignment (see align_matrices).
+    """
+    spans = []
+    if not recompute:
+        result = await session.execute(
+            select(ParagraphAlignment)
+            .where(ParagraphAlignment.source_version_name == source_version,
+                   ParagraphAlignment.target_version_name == target_version)
+            .order_by(ParagraphAlignment.n_span))
+        spans = [{'source_start': row.source_start, 'source_end': row.source_end,
+                  'target_start': row.target_start, 'target_end': row.target_end,
+                  'score': row.score} for row in result.scalars()]
+        await session.commit()
+    if not spans:
+        spans = await compute_alignment(session, source_version, target_version, band=band)
+
+    if with_text:
+        texts = {}
+        for version in (source_version, target_version):
+            data = await open_request(session,
+                                      "SELECT n_paragraph, text FROM paragraph WHERE version_name = :v_n",
+                                      params={"v_n": version})
+            texts[version] = dict(data)
+        for span in spans:
+            span['source_text'] = '\n'.join(texts[source_version][n]
+                                            for n in range(span['source_start'], span['source_end'] + 1))
+            span['target_text'] = '\n'.join(texts[target_version][n]
+                                            for n in range(span['target_start'], span['target_end'] + 1))
+    return spans
@@ -0,0 +1,121 @@
+# dissection_table.operations.concordance.py
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dissection_table.database.ask_db import open_request
+from dissection_table.database.inverted_index import decode_postings
+from dissection_table.database.token_arrays import clean_line
+from dissection_table.operations.corpus_registry import corpus_registry
+
+DEFAULT_WIDTH = 5
+MAX_WIDTH = 50
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+async def get_postings(session: AsyncSession, word: str, versions: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    The word_posting rows of a cleaned word, one per version it occurs in,
+    ordered by version name.
+
+    Returns:
+        List[Dict[str, Any]]: {version_name, n_postings, postings (encoded)}.
+    """
+    version_filter = "AND version_name = ANY(:versions)" if versions else ""
+    params = {"word": word, "versions": list(versions)} if versions else {"word": word}
+    return await open_request(session,
+                              f"""
+                              SELECT version_name, n_postings, postings FROM word_posting
+                              WHERE word = :word {version_filter}
+                              ORDER BY version_name
+                              """,
+                              params=params,
+                              fetch_as_dict=True)
+
+
+async def get_contexts(version: str, positions: np.ndarray, width: int) -> List[Dict[str, Any]]:
+    """
+    Keyword-in-context lines for token positions of a version: up to `width`
+    words on each side, without crossing the paragraph the word is in.
+    Tokens and vocabulary come from the shared corpus (corpus_registry).
+    """
+    corpus = await corpus_registry.get(version, load=('tokens', 'paragraph_offsets'))
+    vocabulary = await corpus.vocabulary()
+    tokens, offsets = corpus.tokens, corpus.paragraph_offsets
+    # Last paragraph starting at or before each position: the one holding it,
+    # even when empty paragraphs share its start offset.
+    paragraphs = np.searchsorted(offsets, positions, side='right') - 1
+    starts = np.maximum(positions - width, offsets[paragraphs])
+    ends = np.minimum(positions + width + 1, offsets[paragraphs + 1])
+    lines = []
+    for position, n_paragraph, start, end in zip(positions.tolist(), paragraphs.tolist(),
+                                                 starts.tolist(), ends.tolist()):
+        lines.append({
+            'version_name': version,
+            'n_paragraph': n_paragraph,
+            'position': position - int(offsets[n_paragraph]),
+            'left': vocabulary.decode_text(tokens[start:position]),
+            'word': vocabulary.words[tokens[position]],
+            'right': vocabulary.decode_text(tokens[position + 1:end]),
+        })
+    return lines
+
+
+async def kwic(session: AsyncSession,
+               term: str,
+               versions: Optional[List[str]] = None,
+               width: int = DEFAULT_WIDTH,
+               offset: int = 0,
+               limit: int = DEFAULT_LIMIT) -> Dict[str, Any]:
+    """
+    Concordance of a word across versions, from the inverted index.
+
+    Hits are ordered by version name, then by position in the text. Only
+    the postings of the versions the requested page falls in are decoded.
+
+    Args:
+        session (AsyncSession): The database session.
+        term (str): The word, normalized with clean_line like the stored tokens.
+        versions (List[str]): Versions to search, all of them if None.
+        width (int): Words of context on each side (at most MAX_WIDTH).
+        offset (int): Hits to skip.
+        limit (int): Hits per page (at most MAX_LIMIT).
+
+    Returns:
+        Dict[str, Any]: {'term', 'total', 'per_version': {version: hits},
+                         'offset', 'next_offset' (None on the last page),
+                         'hits': [{version_name, n_paragraph, position, left, word, right}, ...]}
+    """
+    word = clean_line(term)
+    if not word:
+        raise ValueError(f"'{term}' has no letters to search for.")
+    width = max(0, min(int(width), MAX_WIDTH))
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    offset = max(0, int(offset))
+
+    postings = await get_postings(session, word, versions)
+    total = sum(row['n_postings'] for row in postings)
+    hits = []
+    skip = offset
+    for row in postings:
+        if len(hits) == limit:
+            break
+        if skip >= row['n_postings']:
+            skip -= row['n_postings']
+            continue
+        positions = decode_postings(row['postings'])[skip:skip + limit - len(hits)]
+        skip = 0
+        hits.extend(await get_contexts(row['version_name'], positions, width))
+
+    next_offset = offset + len(hits)
+    return {
+        'term': word,
+        'total': total,
+        'per_version': {row['version_name']: row['n_postings'] for row in postings},
+        'offset': offset,
+        'next_offset': next_offset if next_offset < total else None,
+        'hits': hits,
+    }
@@ -0,0 +1,111 @@
+# dissection_table.operations.corpus_registry.py
+
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from constants import CORPUS_CACHE_BYTES
+from dissection_table.database.engine import AsyncDBSession
+from dissection_table.operations.sources import get_version_header
+from dissection_table.operations.version_corpus import Corpus
+
+
+class CorpusRegistry:
+    """
+    Process-wide Corpus objects, one per version, shared by every caller.
+
+    Each Corpus memoizes what it loads (see Corpus), so repeated analysis
+    calls are served from RAM. When the memory held by all of them goes over
+    `max_bytes`, the least recently used corpora are dropped. Ingestion
+    calls `invalidate` for the versions it replaces.
+    """
+
+    def __init__(self, max_bytes: int = CORPUS_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._corpora: "OrderedDict[str, Corpus]" = OrderedDict()
+        self._creating: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, version: str) -> bool:
+        return version in self._corpora
+
+    def __len__(self) -> int:
+        return len(self._corpora)
+
+    def nbytes(self) -> int:
+        return sum(corpus.nbytes() for corpus in self._corpora.values())
+
+    async def get(self, version: str, load: Iterable[str] = ()) -> Corpus:
+        """
+        The shared Corpus of `version`, built from its header on first use.
+
+        Args:
+            version (str): Version name.
+            load (Iterable[str]): Heavy fields to have loaded (see Corpus.load).
+        """
+        corpus = self._corpora.get(version)
+        if corpus is None:
+            lock = self._creating.setdefault(version, asyncio.Lock())
+            try:
+                async with lock:
+                    corpus = self._corpora.get(version)
+                    if corpus is None:
+                        self.misses += 1
+                        async with AsyncDBSession() as session:
+                            version_data = await get_version_header(session, version)
+                        if not version_data:
+                            raise ValueError(f"Version '{version}' not found in the database.")
+                        corpus = Corpus(session=None, version=version, version_data=version_data, registry=self)
+                        self._corpora[version] = corpus
+                    else:
+                        self.hits += 1
+            finally:
+                # Also on errors (unknown version, database down), or the lock outlives the request.
+                if self._creating.get(version) is lock:
+                    del self._creating[version]
+        else:
+            self.hits += 1
+        self._corpora.move_to_end(version)
+        if load:
+            await corpus.load(*load)
+        return corpus
+
+    def resize(self, corpus: Corpus):
+        """Called by a Corpus after it memoized something: evicts others if over budget."""
+        if self._corpora.get(corpus.version) is corpus:
+            self._corpora.move_to_end(corpus.version)
+            self._evict(keep=corpus.version)
+
+    def _evict(self, keep: str):
+        total = self.nbytes()
+        for version in list(self._corpora):
+            if total <= self.max_bytes:
+                break
+            if version == keep:
+                continue
+            evicted = self._corpora.pop(version)
+            total -= evicted.nbytes()
+            self.evictions += 1
+            print(f"corpus registry: evicted {version} ({evicted.nbytes() / 2**20:.1f} MiB)")
+
+    def invalidate(self, version: Optional[str] = None):
+        """Drops one version (or every version) so its next `get` reads the database again."""
+        if version is None:
+            self._corpora.clear()
+        else:
+            self._corpora.pop(version, None)
+
+    def report(self) -> str:
+        return (f"corpus registry: {len(self)} corpora, {self.nbytes() / 2**20:.1f}"
+                f"/{self.max_bytes / 2**20:.0f} MiB, {self.hits} hits, {self.misses} misses, "
+                f"{self.evictions} evictions")
+
+
+corpus_registry = CorpusRegistry()
+
+
+async def get_corpus(version: str, load: Iterable[str] = ()) -> Corpus:
+    """The shared Corpus of `version` from the process-wide registry."""
+    return await corpus_registry.get(version, load=load)
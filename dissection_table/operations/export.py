@@ -0,0 +1,88 @@
+# dissection_table.operations.export.py
+
+import io
+from typing import List, Tuple
+
+import numpy as np
+
+from dissection_table.operations.corpus_registry import corpus_registry
+
+# Vector column -> Corpus method that returns its (n_paragraphs, dim) matrix.
+VECTOR_COLUMNS = {'embedding': 'all_embeddings', 'umap': 'all_umap'}
+EXPORT_FORMATS = {
+    'npy': ('application/octet-stream', 'npy'),
+    'arrow': ('application/vnd.apache.arrow.file', 'arrow'),
+}
+
+
+async def get_export_matrices(versions: List[str], column: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The stacked vector matrices of `versions`, with the version and paragraph
+    number of every row. Read through the corpus registry, so repeated
+    exports come from memory.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (version_names, n_paragraphs, matrix).
+    """
+    if column not in VECTOR_COLUMNS:
+        raise KeyError(f"Unknown vector column: {column}. Use one of {list(VECTOR_COLUMNS)}.")
+    names, ids, matrices = [], [], []
+    for version in versions:
+        corpus = await corpus_registry.get(version)
+        matrix = await getattr(corpus, VECTOR_COLUMNS[column])()
+        if isinstance(matrix, str):
+            raise ValueError(matrix)
+        names.append(np.full(matrix.shape[0], version))
+        # Matrix rows are ordered by n_paragraph, numbered 0..n-1 at ingestion.
+        ids.append(np.arange(matrix.shape[0], dtype=np.int32))
+        matrices.append(matrix)
+    return np.concatenate(names), np.concatenate(ids), np.concatenate(matrices).astype(np.float32, copy=False)
+
+
+def to_npy(version_names: np.ndarray, n_paragraphs: np.ndarray, matrix: np.ndarray, column: str) -> bytes:
+    """
+    One .npy holding a structured array with fields version_name,
+    n_paragraph and `column` (a float32 vector per row), so ids and vectors
+    travel together and `np.load(path, mmap_mode='r')` maps the file as is.
+    """
+    width = max((len(name) for name in version_names), default=1)
+    dtype = np.dtype([('version_name', f'U{width}'),
+                      ('n_paragraph', '<i4'),
+                      (column, '<f4', (matrix.shape[1],))])
+    records = np.empty(matrix.shape[0], dtype=dtype)
+    records['version_name'] = version_names
+    records['n_paragraph'] = n_paragraphs
+    records[column] = matrix
+    buffer = io.BytesIO()
+    np.save(buffer, records, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def to_arrow(version_names: np.ndarray, n_paragraphs: np.ndarray, matrix: np.ndarray, column: str) -> bytes:
+    """
+    An Arrow IPC file with columns version_name (dictionary encoded),
+    n_paragraph and `column` (fixed-size list of float32), readable
+    zero-copy with `pyarrow.ipc.open_file(pyarrow.memory_map(path))`.
+    """
+    import pyarrow as pa
+
+    vectors = pa.FixedSizeListArray.from_arrays(pa.array(np.ascontiguousarray(matrix).ravel(), type=pa.float32()),
+                                                matrix.shape[1])
+    table = pa.table({
+        'version_name': pa.array(version_names.tolist()).dictionary_encode(),
+        'n_paragraph': pa.array(n_paragraphs, type=pa.int32()),
+        column: vectors,
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+async def export_vectors(versions: List[str], column: str = 'embedding', format: str = 'npy') -> bytes:
+    """The `column` vectors of `versions` as .npy or Arrow IPC bytes (see to_npy / to_arrow)."""
+    if format not in EXPORT_FORMATS:
+        raise KeyError(f"Unknown export format: {format}. Use one of {list(EXPORT_FORMATS)}.")
+    version_names, n_paragraphs, matrix = await get_export_matrices(versions, column)
+    writer = to_npy if format == 'npy' else to_arrow
+    return writer(version_names, n_paragraphs, matrix, column)
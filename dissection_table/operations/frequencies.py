@@ -2,8 +2,7 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession # Import AsyncSession for type hinting
 from typing import Dict, Any, List, Union
-import re
-from collections import OrderedDict, Counter
+from collections import OrderedDict
 
 # Assuming open_request is defined in ask_db.py
 from dissection_table.database.ask_db import open_request
@@ -11,7 +10,7 @@ from dissection_table.database.ask_db import open_request
 
 async def get_n_words(session: AsyncSession, version: str) -> Union[int, str]: # ADDED session
     """
-    Retrieves the raw text for a version and calculates the number of words.
+    Retrieves the number of words of a version, counted at ingestion.
 
     Args:
         session (AsyncSession): The database session.
@@ -19,23 +18,20 @@ async def get_n_words(session: AsyncSession, version: str) -> Union[int, str]: #
 
     Returns:
         Union[int, str]: The number of words, or an error message if the version
-                         doesn't exist or has no raw text.
+                         doesn't exist.
     """
     data = await open_request(session, # Pass the session here
                               """
-                              SELECT version.raw_text FROM version
+                              SELECT version.n_words FROM version
                               WHERE version.version_name = :version
                               """,
                               params={"version": version},
                               fetch_as_dict=True)
 
-    if not data or not data[0] or 'raw_text' not in data[0]:
+    if not data or data[0].get('n_words') is None:
         return f"This version: {version} doesn't exist or has no raw text."
 
-    text = data[0]['raw_text']
-    n_words = len(text.split(' ')) # Simple word count by splitting on space
-
-    return n_words
+    return data[0]['n_words']
 
 
 async def get_paragraph_words_freq(session: AsyncSession, version: str) -> Union[Dict[int, int], str]: # ADDED session
@@ -69,9 +65,8 @@ async def get_paragraph_words_freq(session: AsyncSession, version: str) -> Union
 
 async def get_word_freq_dict(session: AsyncSession, version_name: str) -> Union[OrderedDict, str]: # ADDED session
     """
-    Retrieves the raw text for a given version, cleans its words,
-    calculates word frequencies, and returns an OrderedDict
-    sorted by frequency in descending order.
+    Retrieves the word frequencies of a version, precomputed at ingestion
+    in word_frequency, as an OrderedDict sorted by frequency in descending order.
 
     Args:
         session (AsyncSession): The database session.
@@ -82,33 +77,93 @@ async def get_word_freq_dict(session: AsyncSession, version_name: str) -> Union[
                                  values are their frequencies (int), sorted by frequency
                                  in descending order, or an error message.
     """
-
     query = """
-        SELECT version.raw_words FROM version
-        WHERE version.version_name = :v_n;
+        SELECT word, count FROM word_frequency
+        WHERE version_name = :v_n
+        ORDER BY rank;
     """
-
-    # open_request is expected to return a list of tuples, e.g., [('full raw text string',)]
     data = await open_request(session, query, params={"v_n": version_name}) # Pass the session here
 
-    if not data or not data[0] or not data[0][0]:
+    if not data:
+        return f"This version: {version_name} doesn't exist or has no raw text data."
+
+    return OrderedDict((word, count) for word, count in data)
+
+
+async def get_top_words(session: AsyncSession, version_name: str,
+                        k: int = 100, offset: int = 0) -> Union[List[Dict[str, Any]], str]:
+    """
+    The `k` most frequent words of a version after skipping `offset`, read
+    off the (version_name, rank) index.
+
+    Args:
+        session (AsyncSession): The database session.
+        version_name (str): The name of the version.
+        k (int): How many words to return.
+        offset (int): Rank of the first word returned.
+
+    Returns:
+        Union[List[Dict[str, Any]], str]: {word, count, rank} in rank order, or an error message.
+    """
+    data = await open_request(session,
+                              """
+                              SELECT word, count, rank FROM word_frequency
+                              WHERE version_name = :v_n AND rank >= :offset
+                              ORDER BY rank
+                              LIMIT :k
+                              """,
+                              params={"v_n": version_name, "offset": offset, "k": k},
+                              fetch_as_dict=True)
+    if not data and offset == 0:
         return f"This version: {version_name} doesn't exist or has no raw text data."
+    return data
 
-    raw_text_string = data[0][0] # Get the full raw text string from the query result
 
-    # Basic word cleaning: replace '#' with space and split
-    words_from_text = raw_text_string.replace('#', ' ').split(' ')
-    processed_words = [word for word in words_from_text if word] # Filter out empty strings
+async def get_words_by_prefix(session: AsyncSession, version_name: str,
+                              prefix: str, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    Words of a version starting with `prefix`, most frequent first.
 
-    if not processed_words:
-        return f"No valid words found for version: {version_name} after cleaning."
+    word is stored with the "C" collation, so the prefix becomes a byte range
+    on the (version_name, word) primary key instead of a LIKE over every row.
 
-    word_counts = Counter(processed_words)
+    Args:
+        session (AsyncSession): The database session.
+        version_name (str): The name of the version.
+        prefix (str): Start of the words, compared against the cleaned (lowercase) words.
+        limit (int): How many words to return.
 
-    # Sort the items by frequency in descending order
-    sorted_word_counts = sorted(word_counts.items(), key=lambda item: item[1], reverse=True)
+    Returns:
+        List[Dict[str, Any]]: {word, count, rank} of the matching words, in rank order.
+    """
+    return await open_request(session,
+                              """
+                              SELECT word, count, rank FROM word_frequency
+                              WHERE version_name = :v_n AND word >= :start AND word < :stop
+                              ORDER BY rank
+                              LIMIT :limit
+                              """,
+                              params={"v_n": version_name,
+                                      "start": prefix,
+                                      "stop": prefix + chr(0x10FFFF),
+                                      "limit": limit},
+                              fetch_as_dict=True)
 
-    # Create an OrderedDict from the sorted list of (word, count) tuples
-    word_freq_dict = OrderedDict(sorted_word_counts)
 
-    return word_freq_dict
+async def get_word_frequency(session: AsyncSession, version_name: str, word: str) -> Union[Dict[str, Any], str]:
+    """
+    Count and rank of one word in a version.
+
+    Returns:
+        Union[Dict[str, Any], str]: {word, count, rank}, or an error message.
+    """
+    data = await open_request(session,
+                              """
+                              SELECT word, count, rank FROM word_frequency
+                              WHERE version_name = :v_n AND word = :word
+                              """,
+                              params={"v_n": version_name, "word": word},
+                              fetch_as_dict=True)
+    if not data:
+        return f"The word: {word} isn't in version: {version_name}."
+    return data[0]
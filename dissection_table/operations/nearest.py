@@ -0,0 +1,185 @@
+# dissection_table.operations.nearest.py
+
+import time
+import random
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_EF_SEARCH = 40
+
+# Cosine distance (<=>), the operator the HNSW indexes are built for. The
+# query vector is a subquery so the index can order by it directly.
+QUERY_EMBEDDING = "(SELECT embedding FROM paragraph WHERE version_name = :version AND n_paragraph = :n_paragraph)"
+NEAREST_QUERY = f"""
+    SELECT n_paragraph, text, embedding <=> {QUERY_EMBEDDING} AS distance
+    FROM paragraph
+    WHERE version_name = :target_version
+    ORDER BY embedding <=> {QUERY_EMBEDDING}
+    LIMIT :k
+"""
+# Both have to exist: a missing query paragraph makes every distance NULL,
+# a missing target version makes the result empty.
+EXISTS_QUERY = """
+    SELECT EXISTS (SELECT 1 FROM paragraph WHERE version_name = :version AND n_paragraph = :n_paragraph
+                                              AND embedding IS NOT NULL) AS query_found,
+           EXISTS (SELECT 1 FROM version WHERE version_name = :target_version) AS target_found
+"""
+
+_iterative_scan: Optional[bool] = None
+
+
+async def supports_iterative_scan(session: AsyncSession) -> bool:
+    """
+    pgvector >= 0.8 can keep walking the HNSW graph until enough rows pass
+    the WHERE clause. Older versions stop after ef_search candidates, so a
+    filter on one version out of ten can come back with fewer than k rows.
+    """
+    global _iterative_scan
+    if _iterative_scan is None:
+        result = await session.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'"))
+        version = result.scalar() or "0"
+        major_minor = tuple(int(part) for part in version.split(".")[:2] if part.isdigit())
+        _iterative_scan = major_minor >= (0, 8)
+    return _iterative_scan
+
+
+async def nearest_paragraphs(session: AsyncSession,
+                             version: str,
+                             n_paragraph: int,
+                             target_version: str,
+                             k: int = 10,
+                             ef_search: int = DEFAULT_EF_SEARCH,
+                             exact: bool = False,
+                             fallback: bool = True) -> List[Dict[str, Any]]:
+    """
+    The k paragraphs of `target_version` closest to one paragraph, by cosine
+    distance between their full 768-dim embeddings.
+
+    The search goes through the HNSW index on paragraph.embedding; a larger
+    `ef_search` visits more of the graph, trading speed for recall. With
+    `exact=True` index scans are disabled and the answer comes from a
+    sequential scan, which is what recall is measured against.
+
+    The index search can come back short: without iterative scans the
+    version filter runs on at most 1000 candidates, and iterative scans stop
+    at hnsw.max_scan_tuples. When fewer than k rows come back (and
+    `fallback` is set) the search is repeated in exact mode, so the answer
+    is never short of k unless the target version has fewer paragraphs.
+
+    Args:
+        session (AsyncSession): Database session (not inside a transaction).
+        version (str): Version of the query paragraph.
+        n_paragraph (int): Number of the query paragraph.
+        target_version (str): Version to search in.
+        k (int): Number of neighbours.
+        ef_search (int): HNSW candidate list size (pgvector default 40).
+        exact (bool): Skip the index and scan every paragraph.
+        fallback (bool): Redo a short index search in exact mode.
+
+    Returns:
+        List[Dict[str, Any]]: {'n_paragraph', 'text', 'distance'} per neighbour,
+                              closest first.
+
+    Raises:
+        ValueError: If the query paragraph or the target version doesn't exist.
+    """
+    params = {'version': version, 'n_paragraph': n_paragraph, 'target_version': target_version, 'k': k}
+    async with session.begin():
+        found = (await session.execute(text(EXISTS_QUERY), params)).one()
+        if not found.query_found:
+            raise ValueError(f"This paragraph: {n_paragraph} in version: {version} doesn't exist.")
+        if not found.target_found:
+            raise ValueError(f"This version: {target_version} doesn't exist.")
+        if exact:
+            await session.execute(text("SET LOCAL enable_indexscan = off"))
+        else:
+            iterative_scan = await supports_iterative_scan(session)
+            if not iterative_scan:
+                # Without iterative scans the filter is applied to ef_search
+                # candidates: ask for enough of them to fill k after it.
+                n_versions = (await session.execute(
+                    text("SELECT count(*) FROM version"))).scalar() or 1
+                ef_search = max(ef_search, k * n_versions)
+            await session.execute(text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+                                  {'ef_search': str(min(ef_search, 1000))})
+            if iterative_scan:
+                await session.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+        result = await session.execute(text(NEAREST_QUERY), params)
+        # Target paragraphs without an embedding have no distance.
+        rows = [row for row in result.fetchall() if row.distance is not None]
+    if fallback and not exact and len(rows) < k:
+        return await nearest_paragraphs(session, version, n_paragraph, target_version, k=k, exact=True)
+    # relaxed_order can return neighbours slightly out of order.
+    return sorted(({'n_paragraph': row.n_paragraph, 'text': row.text, 'distance': float(row.distance)}
+                   for row in rows),
+                  key=lambda row: row['distance'])
+
+
+async def nearest_recall(session: AsyncSession,
+                         version: str,
+                         target_version: str,
+                         k: int = 10,
+                         ef_search: int = DEFAULT_EF_SEARCH,
+                         sample_size: int = 50,
+                         seed: int = 0) -> Dict[str, Any]:
+    """
+    Recall@k of the HNSW search against exact search, over a random sample
+    of paragraphs of `version` queried in `target_version`.
+
+    Returns:
+        Dict[str, Any]: recall@k, queries run and mean latency (ms) of both searches.
+
+    Raises:
+        ValueError: If either version doesn't exist (see nearest_paragraphs).
+    """
+    result = await session.execute(text("SELECT n_paragraph FROM paragraph WHERE version_name = :version"),
+                                   {'version': version})
+    n_paragraphs = [row[0] for row in result.fetchall()]
+    await session.commit()
+    if not n_paragraphs:
+        raise ValueError(f"No paragraphs for version {version}.")
+    sample = random.Random(seed).sample(n_paragraphs, min(sample_size, len(n_paragraphs)))
+
+    found, expected = 0, 0
+    ann_seconds, exact_seconds = 0.0, 0.0
+    for n_paragraph in sample:
+        start = time.perf_counter()
+        approximate = await nearest_paragraphs(session, version, n_paragraph, target_version,
+                                               k=k, ef_search=ef_search, fallback=False)
+        ann_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        exact = await nearest_paragraphs(session, version, n_paragraph, target_version,
+                                         k=k, exact=True)
+        exact_seconds += time.perf_counter() - start
+        exact_ids = {row['n_paragraph'] for row in exact}
+        found += len(exact_ids & {row['n_paragraph'] for row in approximate})
+        expected += len(exact_ids)
+
+    return {
+        'version': version,
+        'target_version': target_version,
+        'k': k,
+        'ef_search': ef_search,
+        'queries': len(sample),
+        'recall': found / expected if expected else 1.0,
+        'ann_ms': 1000 * ann_seconds / len(sample),
+        'exact_ms': 1000 * exact_seconds / len(sample),
+    }
+
+
+async def nearest_versions(session: AsyncSession, version: str, k: int = 3) -> List[Dict[str, Any]]:
+    """The k versions whose whole-text embedding is closest to `version`'s (HNSW on version.text_embedding)."""
+    result = await session.execute(text("""
+        SELECT version_name, text_embedding <=> (
+            SELECT text_embedding FROM version WHERE version_name = :version
+        ) AS distance
+        FROM version
+        WHERE version_name <> :version
+        ORDER BY text_embedding <=> (SELECT text_embedding FROM version WHERE version_name = :version)
+        LIMIT :k
+    """), {'version': version, 'k': k})
+    rows = result.fetchall()
+    await session.commit()
+    return [{'version_name': row.version_name, 'distance': float(row.distance)} for row in rows]
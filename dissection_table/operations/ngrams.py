@@ -0,0 +1,167 @@
+# dissection_table.operations.ngrams.py
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dissection_table.database.ask_db import open_request
+from dissection_table.operations.corpus_registry import corpus_registry
+
+MAX_N = 5
+# N-grams seen fewer times than this in a version aren't stored: they're
+# most of the 3- to 5-grams and carry no frequency information.
+NGRAM_MIN_COUNT = 2
+DEFAULT_K = 50
+MAX_K = 1000
+
+
+def ngram_windows(tokens: np.ndarray, offsets: np.ndarray, n: int) -> np.ndarray:
+    """
+    Every run of `n` consecutive word ids that stays inside one paragraph,
+    as an (m, n) view over `tokens` (no copy), in reading order.
+    """
+    if len(tokens) < n:
+        return np.empty((0, n), dtype=tokens.dtype)
+    windows = sliding_window_view(tokens, n)
+    # End of the paragraph each token is in; a window is kept if it ends there or before.
+    paragraph_ends = np.repeat(offsets[1:], np.diff(offsets))
+    starts = np.arange(len(windows))
+    return windows[starts + n <= paragraph_ends[:len(windows)]]
+
+
+def count_ngram_positions(offsets: np.ndarray, n: int) -> int:
+    """How many n-grams (stored or not) a version has: windows that fit in each paragraph."""
+    lengths = np.diff(offsets).astype(np.int64)
+    return int(np.maximum(lengths - n + 1, 0).sum())
+
+
+def pack_windows(windows: np.ndarray, bits: int) -> List[np.ndarray]:
+    """
+    Windows as uint64 keys, `bits` bits per word id: one key column when
+    n * bits fits in 64 bits, more (64 // bits ids each) when it doesn't.
+    """
+    per_key = max(1, 64 // bits)
+    columns = []
+    for start in range(0, windows.shape[1], per_key):
+        key = np.zeros(len(windows), dtype=np.uint64)
+        for column in windows[:, start:start + per_key].T:
+            key = (key << np.uint64(bits)) | column.astype(np.uint64)
+        columns.append(key)
+    return columns
+
+
+def count_windows(windows: np.ndarray, vocabulary_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Distinct windows and how often each occurs, by sorting packed keys.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (distinct windows (k, n),
+        counts, index of each one's first occurrence).
+    """
+    if not len(windows):
+        return windows, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    bits = max(1, int(vocabulary_size - 1).bit_length())
+    keys = pack_windows(windows, bits)
+    if len(keys) == 1:
+        _, first, counts = np.unique(keys[0], return_index=True, return_counts=True)
+        return windows[first], counts, first
+    # lexsort is stable: within a group, the first index is the first occurrence.
+    order = np.lexsort(keys[::-1])
+    change = np.zeros(len(order), dtype=bool)
+    change[0] = True
+    for key in keys:
+        sorted_key = key[order]
+        change[1:] |= sorted_key[1:] != sorted_key[:-1]
+    starts = np.flatnonzero(change)
+    counts = np.diff(np.append(starts, len(order)))
+    first = order[starts]
+    return windows[first], counts, first
+
+
+def ngram_rows(version_name: str,
+               tokens: np.ndarray,
+               offsets: np.ndarray,
+               vocabulary: Sequence[str],
+               max_n: int = MAX_N,
+               min_count: int = NGRAM_MIN_COUNT) -> List[Tuple[str, int, str, int, int]]:
+    """
+    The ngram_frequency rows of a version for n = 1..max_n: (version_name,
+    n, ngram, count, rank), ngram being the words joined by spaces. Rank 0
+    is the most frequent n-gram of its n; ties keep the order of first
+    occurrence, like word_frequency. Top-level so it can run in a worker
+    process.
+    """
+    words = np.asarray(vocabulary, dtype=object)
+    rows = []
+    for n in range(1, max_n + 1):
+        distinct, counts, first = count_windows(ngram_windows(tokens, offsets, n), len(words))
+        kept = counts >= min_count
+        distinct, counts, first = distinct[kept], counts[kept], first[kept]
+        order = np.lexsort((first, -counts))
+        ngrams = [' '.join(ngram) for ngram in zip(*(words[column] for column in distinct[order].T))]
+        rows.extend((version_name, n, ngram, count, rank)
+                    for rank, (ngram, count) in enumerate(zip(ngrams, counts[order].tolist())))
+    return rows
+
+
+async def get_top_ngrams(session: AsyncSession, version_name: str, n: int,
+                         k: int = DEFAULT_K, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    The `k` most frequent n-grams of a version after skipping `offset`.
+
+    Returns:
+        List[Dict[str, Any]]: {ngram, count, rank} in rank order.
+    """
+    return await open_request(session,
+                              """
+                              SELECT ngram, count, rank FROM ngram_frequency
+                              WHERE version_name = :v_n AND n = :n AND rank >= :offset
+                              ORDER BY rank
+                              LIMIT :k
+                              """,
+                              params={"v_n": version_name, "n": n, "offset": offset, "k": k},
+                              fetch_as_dict=True)
+
+
+async def compare_ngrams(session: AsyncSession, n: int, versions: List[str],
+                         k: int = DEFAULT_K) -> Dict[str, Any]:
+    """
+    The `k` n-grams most frequent across `versions` (summed counts), with
+    each version's count and its frequency per 10,000 n-grams of that size
+    in the version (stored or not, see count_ngram_positions), so versions
+    of different length compare.
+
+    Returns:
+        Dict[str, Any]: {'n', 'totals': {version: n-grams of size n in it},
+                         'ngrams': [{ngram, total, counts: {version: count}, per_10k: {version: rate}}, ...]}
+    """
+    totals = {}
+    for version in versions:
+        corpus = await corpus_registry.get(version, load=('paragraph_offsets',))
+        totals[version] = count_ngram_positions(corpus.paragraph_offsets, n)
+    rows = await open_request(session,
+                              """
+                              SELECT ngram, sum(count) AS total,
+                                     array_agg(version_name) AS version_names, array_agg(count) AS counts
+                              FROM ngram_frequency
+                              WHERE n = :n AND version_name = ANY(:versions)
+                              GROUP BY ngram
+                              ORDER BY total DESC, ngram
+                              LIMIT :k
+                              """,
+                              params={"n": n, "versions": list(versions), "k": k},
+                              fetch_as_dict=True)
+    ngrams = []
+    for row in rows:
+        stored = dict(zip(row['version_names'], row['counts']))
+        counts = {version: stored.get(version, 0) for version in versions}
+        ngrams.append({
+            'ngram': row['ngram'],
+            'total': int(row['total']),
+            'counts': counts,
+            'per_10k': {version: round(10_000 * counts[version] / totals[version], 3) if totals[version] else 0.0
+                        for version in versions},
+        })
+    return {'n': n, 'totals': totals, 'ngrams': ngrams}
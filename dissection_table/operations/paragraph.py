@@ -1,8 +1,25 @@
 # database.operations.paragraphs.py
 from dissection_table.database.ask_db import *
-async def get_paragraph(version, n_paragraph):
-    paragraph =await  get_n_paragraph(version, n_paragraph)
+from dissection_table.operations.nearest import nearest_paragraphs, nearest_recall, DEFAULT_EF_SEARCH
+async def get_paragraph(session, version, n_paragraph):
+    paragraph =await  get_n_paragraph(session, version, n_paragraph)
     return paragraph
-async def get_paragraph_embedding(version, n_paragraph):
-    paragraph =await  get_n_paragraph_embedding(version, n_paragraph)
+async def get_paragraph_embedding(session, version, n_paragraph):
+    paragraph =await  get_n_paragraph_embedding(session, version, n_paragraph)
     return paragraph
+async def get_nearest_paragraphs(session, version, n_paragraph, target_version, k = 10, ef_search = DEFAULT_EF_SEARCH, exact = False):
+    return await nearest_paragraphs(session, version, int(n_paragraph), target_version,
+                                    k = k, ef_search = ef_search, exact = exact)
+async def get_nearest_recall(session, version, target_version, k = 10, ef_search = DEFAULT_EF_SEARCH, sample_size = 50):
+    return await nearest_recall(session, version, target_version,
+                                k = k, ef_search = ef_search, sample_size = sample_size)
+async def get_paragraphs_batch(session, versions, n_paragraphs = None, start = None, end = None,
+                               after_version = None, after_n = None, limit = 200,
+                               embedding = False, umap = False):
+    after = (after_version, after_n) if after_version is not None and after_n is not None else None
+    page = await get_paragraph_batch(session, versions, n_paragraphs = n_paragraphs, start = start, end = end,
+                                     after = after, limit = limit,
+                                     include_embedding = embedding, include_umap = umap)
+    if page['next'] is not None:
+        page['next'] = {'after_version': page['next'][0], 'after_n': page['next'][1]}
+    return page
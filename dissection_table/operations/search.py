@@ -0,0 +1,116 @@
+# dissection_table.operations.search.py
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dissection_table.database.ask_db import open_request
+from dissection_table.database.models import search_config_sql
+from dissection_table.database.token_arrays import clean_line
+
+# Search mode -> how the query string becomes a tsquery (in each version's language).
+#   websearch: google-like syntax ("quoted phrases", or, -excluded words)
+#   plain:     every word
+#   phrase:    the words next to each other, in order
+#   prefix:    every word as a prefix (comal -> comala, comalas)
+SEARCH_MODES = {
+    'websearch': 'websearch_to_tsquery',
+    'plain': 'plainto_tsquery',
+    'phrase': 'phraseto_tsquery',
+    'prefix': 'to_tsquery',
+}
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+HEADLINE_OPTIONS = "StartSel=<b>, StopSel=</b>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+
+def prefix_query(query: str) -> str:
+    """
+    tsquery text matching every word of `query` as a prefix. Words are
+    cleaned to letters and apostrophes, and each one is written as a quoted
+    lexeme (quotes doubled), so apostrophes (l'homme, d'un) and tsquery
+    operators can't break the syntax.
+    """
+    words = [clean_line(word) for word in query.split()]
+    return ' & '.join("'" + word.replace("'", "''") + "':*" for word in words if word)
+
+
+async def search_paragraphs(session: AsyncSession,
+                            query: str,
+                            versions: Optional[List[str]] = None,
+                            mode: str = 'websearch',
+                            limit: int = DEFAULT_LIMIT,
+                            offset: int = 0) -> Dict[str, Any]:
+    """
+    Full-text search over paragraphs through the GIN index on
+    paragraph.search_vector, ranked by ts_rank_cd.
+
+    The query is parsed once per version with that version's text search
+    configuration (the one its search_vector was built with), so stemming
+    and stop words follow each translation's language. Snippets are only
+    built for the rows of the page.
+
+    Args:
+        session (AsyncSession): The database session.
+        query (str): What to search for.
+        versions (List[str]): Versions to search, all of them if None.
+        mode (str): One of SEARCH_MODES.
+        limit (int): Rows per page (at most MAX_LIMIT).
+        offset (int): Rows to skip.
+
+    Returns:
+        Dict[str, Any]: {'query', 'mode', 'total', 'offset', 'next_offset' (None on the last page),
+                         'hits': [{version_name, n_paragraph, rank, snippet}, ...]}
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}. Use one of {list(SEARCH_MODES)}.")
+    tsquery_text = prefix_query(query) if mode == 'prefix' else query
+    if not tsquery_text.strip():
+        raise ValueError(f"'{query}' has nothing to search for.")
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    offset = max(0, int(offset))
+
+    params = {"q": tsquery_text, "limit": limit, "offset": offset, "headline": HEADLINE_OPTIONS}
+    version_filter = ""
+    if versions:
+        version_filter = "WHERE version_name = ANY(:versions)"
+        params["versions"] = list(versions)
+    rows = await open_request(session,
+                              f"""
+                              WITH queries AS (
+                                  SELECT version_name, config, {SEARCH_MODES[mode]}(config, :q) AS query
+                                  FROM (SELECT version_name, {search_config_sql()} AS config
+                                        FROM version {version_filter}) versions
+                              ),
+                              hits AS (
+                                  SELECT p.version_name, p.n_paragraph, p.text, q.config, q.query,
+                                         ts_rank_cd(p.search_vector, q.query) AS rank,
+                                         count(*) OVER () AS total
+                                  FROM queries q
+                                  JOIN paragraph p ON p.version_name = q.version_name
+                                                  AND p.search_vector @@ q.query
+                                  ORDER BY rank DESC, p.version_name, p.n_paragraph
+                                  LIMIT :limit OFFSET :offset
+                              )
+                              SELECT version_name, n_paragraph, rank, total,
+                                     ts_headline(config, text, query, :headline) AS snippet
+                              FROM hits
+                              ORDER BY rank DESC, version_name, n_paragraph
+                              """,
+                              params=params,
+                              fetch_as_dict=True)
+
+    # count(*) OVER () comes with every row; a page past the end has none to read it from.
+    total = rows[0]['total'] if rows else (0 if offset == 0 else None)
+    next_offset = offset + len(rows)
+    return {
+        'query': query,
+        'mode': mode,
+        'total': total,
+        'offset': offset,
+        'next_offset': next_offset if total is not None and next_offset < total else None,
+        'hits': [{'version_name': row['version_name'],
+                  'n_paragraph': row['n_paragraph'],
+                  'rank': row['rank'],
+                  'snippet': row['snippet']} for row in rows],
+    }
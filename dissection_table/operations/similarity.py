@@ -0,0 +1,161 @@
+# dissection_table.operations.similarity.py
+
+import numpy as np
+from typing import Dict, List, Tuple
+
+METRICS = ("cosine", "dot", "euclidean")
+
+
+def prepare_matrix(matrix: np.ndarray, metric: str = "cosine") -> np.ndarray:
+    """
+    Converts a version's matrix once into the form the scoring product needs:
+    unit rows for cosine, float32 as-is for dot and euclidean.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}. Use one of {METRICS}.")
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if metric == "cosine":
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+    return matrix
+
+
+def _scores(source_block: np.ndarray, target_block: np.ndarray, metric: str) -> np.ndarray:
+    """Higher is more similar, for every (source row, target row) pair of the blocks."""
+    scores = source_block @ target_block.T
+    if metric == "euclidean":
+        # -|a - b|^2 = 2ab - |a|^2 - |b|^2; |a|^2 is constant per row so it doesn't change the ranking.
+        scores = 2 * scores - np.einsum('ij,ij->i', target_block, target_block)[None, :]
+    return scores
+
+
+def _top_k_unsorted(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per row, the k highest scores (in no particular order) and their column indices."""
+    n_columns = scores.shape[1]
+    keep = min(k, n_columns)
+    if keep == n_columns:
+        top = np.broadcast_to(np.arange(n_columns), scores.shape).copy()
+    else:
+        top = np.argpartition(scores, n_columns - keep, axis=1)[:, n_columns - keep:]
+    return np.take_along_axis(scores, top, axis=1), top
+
+
+def top_k_pair(source: np.ndarray,
+               target: np.ndarray,
+               k: int = 3,
+               metric: str = "cosine",
+               source_block: int = 1024,
+               target_block: int = 4096,
+               prepared: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k most similar target rows for every source row.
+
+    Scores are computed with blocked matrix products and the best k kept with
+    argpartition, so memory stays at source_block x target_block scores
+    whatever the size of the two matrices.
+
+    Args:
+        source (np.ndarray): (n_source, dim) matrix.
+        target (np.ndarray): (n_target, dim) matrix.
+        k (int): Neighbours per source row (capped at n_target).
+        metric (str): "cosine", "dot" or "euclidean".
+        source_block (int): Source rows scored at once.
+        target_block (int): Target rows scored at once.
+        prepared (bool): Both matrices already went through prepare_matrix.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (n_source, k) target indices and their
+                                       scores, best first.
+    """
+    if not prepared:
+        source = prepare_matrix(source, metric)
+        target = prepare_matrix(target, metric)
+    n_source, n_target = source.shape[0], target.shape[0]
+    k = min(k, n_target)
+    indices = np.empty((n_source, k), dtype=np.int64)
+    scores = np.empty((n_source, k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+
+    for s_start in range(0, n_source, source_block):
+        block = source[s_start:s_start + source_block]
+        best_scores, best_indices = None, None
+
+        for t_start in range(0, n_target, target_block):
+            block_scores = _scores(block, target[t_start:t_start + target_block], metric)
+            block_top_scores, block_top = _top_k_unsorted(block_scores, k)
+            block_top += t_start
+            if best_scores is None:
+                best_scores, best_indices = block_top_scores, block_top
+            else:
+                # Merge the running best with this block's best: only 2k columns.
+                merged_scores = np.concatenate([best_scores, block_top_scores], axis=1)
+                merged_indices = np.concatenate([best_indices, block_top], axis=1)
+                best_scores, top = _top_k_unsorted(merged_scores, k)
+                best_indices = np.take_along_axis(merged_indices, top, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        indices[s_start:s_start + block.shape[0]] = np.take_along_axis(best_indices, order, axis=1)
+        scores[s_start:s_start + block.shape[0]] = np.take_along_axis(best_scores, order, axis=1)
+    return indices, scores
+
+
+# Prepared matrices of the similarity job, set once per worker process.
+_shard_matrices: Dict[str, np.ndarray] = {}
+
+
+def init_shard_worker(matrices: Dict[str, np.ndarray]):
+    """ProcessPoolExecutor initializer: every worker receives the matrices once, not per shard."""
+    global _shard_matrices
+    _shard_matrices = matrices
+
+
+def similarity_shard(source_name: str,
+                     target_name: str,
+                     k: int = 3,
+                     metric: str = "cosine",
+                     source_block: int = 1024,
+                     target_block: int = 4096) -> Tuple[str, str, np.ndarray]:
+    """
+    One (source, target) shard of the similarity job, run in a worker process
+    set up by init_shard_worker with prepared matrices.
+
+    Returns:
+        Tuple[str, str, np.ndarray]: The pair and its (n_source, k) target
+                                     paragraph numbers, best first.
+    """
+    indices, _ = top_k_pair(_shard_matrices[source_name], _shard_matrices[target_name],
+                            k=k, metric=metric, source_block=source_block,
+                            target_block=target_block, prepared=True)
+    return source_name, target_name, indices
+
+
+def similarity_table(matrices: Dict[str, np.ndarray],
+                     k: int = 3,
+                     metric: str = "cosine",
+                     source_block: int = 1024,
+                     target_block: int = 4096) -> Dict[str, Dict[str, List[int]]]:
+    """
+    Top-k neighbours of every paragraph in every other version.
+
+    Each version's matrix is prepared once; rows are paragraph numbers in
+    order (as returned by Corpus.all_umap / all_embeddings).
+
+    Returns:
+        Dict[str, Dict[str, List[int]]]: {'version#i': {target_version: [n_paragraph, ...]}},
+                                         best first.
+    """
+    prepared = {name: prepare_matrix(matrix, metric) for name, matrix in matrices.items()}
+    results = {f'{name}#{i}': {} for name, matrix in prepared.items() for i in range(matrix.shape[0])}
+
+    for source_name, source_matrix in prepared.items():
+        for target_name, target_matrix in prepared.items():
+            if source_name == target_name:
+                continue
+            indices, _ = top_k_pair(source_matrix, target_matrix, k=k, metric=metric,
+                                    source_block=source_block, target_block=target_block,
+                                    prepared=True)
+            for i, row in enumerate(indices.tolist()):
+                results[f'{source_name}#{i}'][target_name] = row
+    return results
@@ -120,4 +120,43 @@ async def get_complete_version(session: AsyncSession, version_name: str) -> Opti
                               """,
                               params={"version_name": version_name},
                               fetch_as_dict=True)
-    return data[0] if data else None
\ No newline at end of file
+    return data[0] if data else None
+
+# The cheap columns of a version: enough to build a Corpus handle.
+VERSION_HEADER_COLUMNS = ("version_name", "author", "year", "editorial", "ISBN", "n_words", "n_paragraphs")
+
+
+async def get_version_columns(session: AsyncSession,
+                              version_name: str,
+                              columns: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Retrieves only the given columns of a version.
+
+    Args:
+        session (AsyncSession): The database session.
+        version_name (str): The name of the version to retrieve.
+        columns (List[str]): Column names of the version table.
+
+    Returns:
+        Optional[Dict[str, Any]]: {column: value} if the version exists, otherwise None.
+    """
+    unknown = set(columns) - set(Version.__table__.columns.keys())
+    if unknown:
+        raise ValueError(f"Not columns of version: {sorted(unknown)}")
+    select_list = ', '.join(f'"{column}"' for column in columns)
+    data = await open_request(session,
+                              f"""
+                              SELECT {select_list} FROM version
+                              WHERE version.version_name = :version_name
+                              """,
+                              params={"version_name": version_name},
+                              fetch_as_dict=True)
+    return data[0] if data else None
+
+
+async def get_version_header(session: AsyncSession, version_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Retrieves the header of a version (names, counts, bibliographic data),
+    without its text, word lists or embeddings.
+    """
+    return await get_version_columns(session, version_name, list(VERSION_HEADER_COLUMNS))
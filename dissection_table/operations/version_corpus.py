@@ -1,7 +1,12 @@
 # dissection_table.operations.version_corpus.py
 
 from sqlalchemy.ext.asyncio import AsyncSession # Still needed for type hinting in __init__ and create
-from typing import Dict, Any, List, Set, Optional, Union
+from typing import Dict, Any, Awaitable, Callable, Iterable, List, Mapping, Set, Optional, Union
+from types import MappingProxyType
+from contextlib import asynccontextmanager
+from collections import defaultdict
+import sys
+import asyncio
 import numpy as np
 import ast
 import re # Make sure re is imported for string parsing
@@ -9,6 +14,8 @@ import re # Make sure re is imported for string parsing
 # Import your database operations
 from dissection_table.operations.sources import (
     get_complete_version,
+    get_version_header,
+    get_version_columns,
     get_raw_text,
     get_paragraphs,
     get_metadata,
@@ -19,6 +26,9 @@ from dissection_table.operations.frequencies import (
     get_n_words,
     get_paragraph_words_freq
 )
+from dissection_table.database.engine import AsyncDBSession
+from dissection_table.database.token_arrays import unpack, TOKEN_DTYPE, OFFSET_DTYPE
+from dissection_table.operations.vocabulary import Vocabulary
 from dissection_table.database.ask_db import (
     get_all_embeddings,
     get_all_umap_embeddings,
@@ -28,75 +38,289 @@ from dissection_table.database.ask_db import (
 )
 
 
+# Heavy Corpus attributes and the version column each one is loaded from.
+# They're fetched by `load`, or by Corpus.create (see CREATE_FIELDS).
+HEAVY_FIELDS = {
+    'metadata': 'version_data',
+    'text': 'raw_text',
+    'word_set': 'word_set',
+    'raw_words': 'raw_words',
+    'text_embedding': 'text_embedding',
+    'text_umap': 'umap',
+    'tokens': 'tokens',
+    'paragraph_offsets': 'paragraph_offsets',
+}
+
+# What Corpus.create loads unless told otherwise: the attributes a Corpus
+# always had (the notebooks read .metadata, .text, .word_set right away).
+# Code that only needs the header passes load=().
+CREATE_FIELDS = ('metadata', 'text', 'word_set', 'raw_words', 'text_embedding', 'text_umap')
+
+# Heavy fields stored as packed arrays, and their dtype.
+ARRAY_FIELDS = {'tokens': TOKEN_DTYPE, 'paragraph_offsets': OFFSET_DTYPE}
+
+
+def estimate_bytes(value: Any) -> int:
+    """Rough in-memory size of a memoized value (arrays, vocabularies, strings, containers of them)."""
+    if isinstance(value, (np.ndarray, Vocabulary)):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, Mapping):
+        return sys.getsizeof(value) + sum(estimate_bytes(k) + estimate_bytes(v) for k, v in value.items())
+    if isinstance(value, (set, frozenset, list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_bytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def freeze(value: Any) -> Any:
+    """Read-only view of a value shared between callers: versions never change after ingestion."""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+        return value
+    if isinstance(value, dict):
+        return MappingProxyType(value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
 class Corpus:
-    def __init__(self, session: AsyncSession, version: str, version_data: Dict[str, Any]): # ADDED session to __init__
+    """
+    One ingested version. The header is read by `create`; everything else
+    is fetched on first use and kept on the instance (read-only, since a
+    version doesn't change after ingestion).
+
+    Without a session (as built by CorpusRegistry) every fetch opens its own
+    short-lived session, so a shared Corpus outlives the request that
+    created it.
+    """
+    def __init__(self, session: Optional[AsyncSession], version: str, version_data: Dict[str, Any],
+                 registry: Any = None): # ADDED session to __init__
         self.session = session # Store the session as an instance attribute
+        self.registry = registry
         self.version = version
         self.author = version_data.get('author')
         self.year = version_data.get('year')
         self.editorial = version_data.get('editorial')
         self.ISBN = version_data.get('ISBN')
-        self.metadata = version_data.get('version_data')
-        self.text = version_data.get('raw_text')
         self.n_words = version_data.get('n_words')
         self.n_paragraphs = version_data.get('n_paragraphs') # Corrected attribute name
 
-        raw_word_set = version_data.get('word_set')
-        if isinstance(raw_word_set, str):
-            self.word_set = {word for word in raw_word_set.split('#') if len(word)>0}
+        # Heavy fields loaded so far, by attribute name, and memoized method results.
+        self._loaded: Dict[str, Any] = {}
+        self._derived: Dict[str, Any] = {}
+        self._sizes: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._remember(version_data)
+
+    @asynccontextmanager
+    async def _session_scope(self):
+        if self.session is not None:
+            yield self.session
         else:
-            self.word_set = raw_word_set if isinstance(raw_word_set, set) else set()
+            async with AsyncDBSession() as session:
+                yield session
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the loaded fields and memoized results."""
+        return sum(self._sizes.values())
+
+    def _stored(self, key: str, size: int):
+        self._sizes[key] = size
+        if self.registry is not None:
+            self.registry.resize(self)
+
+    async def _memoized(self, key: str, fetch: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        """
+        fetch(session)'s result, computed once per instance. Error messages
+        (the str the database helpers return for a missing version) aren't kept.
+        """
+        if key in self._derived:
+            return self._derived[key]
+        async with self._locks[key]:
+            if key not in self._derived:
+                async with self._session_scope() as session:
+                    value = await fetch(session)
+                if isinstance(value, str):
+                    return value
+                size = estimate_bytes(value)
+                self._derived[key] = freeze(value)
+                self._stored(key, size)
+        return self._derived[key]
+
+    def _remember(self, version_data: Dict[str, Any]):
+        for field, column in HEAVY_FIELDS.items():
+            if column not in version_data:
+                continue
+            value = version_data[column]
+            if field == 'word_set':
+                if isinstance(value, str):
+                    value = {word for word in value.split('#') if len(word)>0}
+                else:
+                    value = value if isinstance(value, set) else set()
+            elif field in ARRAY_FIELDS:
+                value = unpack(value, ARRAY_FIELDS[field])
+            size = estimate_bytes(value)
+            self._loaded[field] = freeze(value)
+            self._stored(field, size)
 
-        self.raw_words = version_data.get('raw_words')
-        self.text_embedding = version_data.get('text_embedding')
-        self.text_umap = version_data.get('text_umap')
+    def _get(self, field: str) -> Any:
+        if field not in self._loaded:
+            raise RuntimeError(f"Corpus.{field} of {self.version} isn't loaded yet: "
+                               f"`await corpus.load('{field}')` or Corpus.create(..., load=('{field}',)).")
+        return self._loaded[field]
 
+    @property
+    def metadata(self) -> str:
+        return self._get('metadata')
+
+    @property
+    def text(self) -> str:
+        return self._get('text')
+
+    @property
+    def word_set(self) -> Set[str]:
+        """The distinct cleaned words, as a frozenset (stored '#'-joined in version.word_set)."""
+        return self._get('word_set')
+
+    @property
+    def raw_words(self) -> str:
+        return self._get('raw_words')
+
+    @property
+    def text_embedding(self) -> np.ndarray:
+        return self._get('text_embedding')
+
+    @property
+    def text_umap(self) -> np.ndarray:
+        return self._get('text_umap')
+
+    @property
+    def tokens(self) -> np.ndarray:
+        """Every word of the version as an int32 id (its word_freq rank), in reading order."""
+        return self._get('tokens')
+
+    @property
+    def paragraph_offsets(self) -> np.ndarray:
+        """Where each paragraph starts in `tokens`, plus the total as a last entry."""
+        return self._get('paragraph_offsets')
+
+    def paragraph_tokens(self, n_paragraph: int) -> np.ndarray:
+        """View of the word ids of one paragraph (needs tokens and paragraph_offsets loaded)."""
+        offsets = self.paragraph_offsets
+        return self.tokens[offsets[n_paragraph]:offsets[n_paragraph + 1]]
 
     @classmethod
-    async def create(cls, session: AsyncSession, version: str):
+    async def create(cls, session: AsyncSession, version: str, load: Iterable[str] = CREATE_FIELDS):
         """
         Factory method to create a Corpus instance, fetching data from the database.
         It passes the session to the Corpus.__init__ method.
+
+        The header (author, year, editorial, ISBN, n_words, n_paragraphs) and
+        the heavy fields in `load` (CREATE_FIELDS by default) are read here,
+        the header first and the fields in one more query. `load=()` reads
+        only the header; other fields are fetched later by `Corpus.load`.
         """
-        version_data = await get_complete_version(session, version)
+        version_data = await get_version_header(session, version)
         if not version_data:
             raise ValueError(f"Version '{version}' not found in the database.")
-        return cls(session=session, version=version, version_data=version_data) # Pass session to __init__
+        corpus = cls(session=session, version=version, version_data=version_data) # Pass session to __init__
+        if load:
+            await corpus.load(*load)
+        return corpus
+
+    async def load(self, *fields: str) -> Any:
+        """
+        Fetches the heavy fields (see HEAVY_FIELDS, all of them if none are
+        given) that aren't loaded yet, in a single query, and keeps them on
+        the instance.
+
+        Returns:
+            Any: The value of the field if one was asked for, otherwise a tuple
+                 of values in `fields` order.
+        """
+        fields = fields or tuple(HEAVY_FIELDS)
+        unknown = [field for field in fields if field not in HEAVY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown Corpus fields: {unknown}. Use any of {list(HEAVY_FIELDS)}.")
+        missing = [field for field in fields if field not in self._loaded]
+        if missing:
+            async with self._session_scope() as session:
+                version_data = await get_version_columns(session, self.version,
+                                                         [HEAVY_FIELDS[field] for field in missing])
+            if not version_data:
+                raise ValueError(f"Version '{self.version}' not found in the database.")
+            self._remember(version_data)
+        values = tuple(self._loaded[field] for field in fields)
+        return values[0] if len(values) == 1 else values
 
-    async def word_freq(self) -> Dict[str, int]: # REMOVED session from arguments
+    async def word_freq(self) -> Mapping[str, int]: # REMOVED session from arguments
         """Retrieves word frequencies for the corpus version."""
-        return await get_word_freq_dict(self.session, self.version) # Use self.session
+        return await self._memoized('word_freq', lambda session: get_word_freq_dict(session, self.version))
+
+    async def vocabulary(self) -> Vocabulary:
+        """The version's words ranked by frequency, built once from word_freq (see Vocabulary)."""
+        async def fetch(session):
+            word_freq = await self.word_freq() # Call internal method without session arg
+            return word_freq if isinstance(word_freq, str) else Vocabulary.from_word_freq(word_freq)
+        return await self._memoized('vocabulary', fetch)
 
-    async def int_to_word(self) -> Dict[int, str]: # REMOVED session from arguments
+    async def int_to_word(self) -> Mapping[int, str]: # REMOVED session from arguments
         """Maps integer IDs to words based on word frequencies."""
-        word_freq = await self.word_freq() # Call internal method without session arg
-        return dict(zip(range(len(word_freq)), word_freq.keys()))
+        async def fetch(session):
+            vocabulary = await self.vocabulary()
+            return vocabulary if isinstance(vocabulary, str) else dict(enumerate(vocabulary.words.tolist()))
+        return await self._memoized('int_to_word', fetch)
 
-    async def word_to_int(self) -> Dict[str, int]: # REMOVED session from arguments
+    async def word_to_int(self) -> Mapping[str, int]: # REMOVED session from arguments
         """Maps words to integer IDs based on word frequencies."""
-        word_freq = await self.word_freq() # Call internal method without session arg
-        return dict(zip(word_freq.keys(), range(len(word_freq))))
+        vocabulary = await self.vocabulary()
+        return vocabulary if isinstance(vocabulary, str) else vocabulary.index
+
+    async def encode(self, words: Union[str, Iterable[str]]) -> np.ndarray:
+        """Word ids of a text (cleaned like raw_words) or of a list of cleaned words, in one call."""
+        vocabulary = await self.vocabulary()
+        if isinstance(vocabulary, str):
+            raise ValueError(vocabulary)
+        return vocabulary.encode_text(words) if isinstance(words, str) else vocabulary.encode(words)
+
+    async def decode(self, ids: Iterable[int]) -> np.ndarray:
+        """The words of an id array, e.g. `await corpus.decode(corpus.paragraph_tokens(3))`."""
+        vocabulary = await self.vocabulary()
+        if isinstance(vocabulary, str):
+            raise ValueError(vocabulary)
+        return vocabulary.decode(ids)
 
-    async def all_paragraphs(self) -> Dict[int, str]: # REMOVED session from arguments
+    async def all_paragraphs(self) -> Mapping[int, str]: # REMOVED session from arguments
         """Retrieves all paragraphs for the corpus version."""
-        return await get_paragraphs(self.session, self.version) # Use self.session
+        return await self._memoized('all_paragraphs', lambda session: get_paragraphs(session, self.version))
 
     async def all_embeddings(self) -> np.ndarray: # REMOVED session from arguments
         """Retrieves all embeddings for the corpus version."""
-        return await get_all_embeddings(self.session, self.version) # Use self.session
+        return await self._memoized('all_embeddings', lambda session: get_all_embeddings(session, self.version))
 
     async def all_umap(self) -> np.ndarray: # REMOVED session from arguments
         """Retrieves all UMAP embeddings for the corpus version."""
-        return await get_all_umap_embeddings(self.session, self.version) # Use self.session
+        return await self._memoized('all_umap', lambda session: get_all_umap_embeddings(session, self.version))
 
     async def n_paragraph(self, n_paragraph: int) -> Union[str, Any]: # REMOVED session from arguments
         """Retrieves text for a specific paragraph number."""
-        return await get_n_paragraph(self.session, self.version, n_paragraph) # Use self.session
+        if 'all_paragraphs' in self._derived and int(n_paragraph) in self._derived['all_paragraphs']:
+            return self._derived['all_paragraphs'][int(n_paragraph)]
+        async with self._session_scope() as session:
+            return await get_n_paragraph(session, self.version, n_paragraph)
 
     async def n_paragraph_embedding(self, n_paragraph: int) -> Union[List[float], str]: # REMOVED session from arguments
         """Retrieves embedding for a specific paragraph number."""
-        return await get_n_paragraph_embedding(self.session, self.version, n_paragraph) # Use self.session
+        if 'all_embeddings' in self._derived and 0 <= int(n_paragraph) < len(self._derived['all_embeddings']):
+            return self._derived['all_embeddings'][int(n_paragraph)].tolist()
+        async with self._session_scope() as session:
+            return await get_n_paragraph_embedding(session, self.version, n_paragraph)
 
     async def n_paragraph_umap(self, n_paragraph: int) -> Union[List[float], str]: # REMOVED session from arguments
         """Retrieves UMAP embedding for a specific paragraph number."""
-        return await get_n_paragraph_umap(self.session, self.version, n_paragraph) # Use self.session
+        if 'all_umap' in self._derived and 0 <= int(n_paragraph) < len(self._derived['all_umap']):
+            return self._derived['all_umap'][int(n_paragraph)].tolist()
+        async with self._session_scope() as session:
+            return await get_n_paragraph_umap(session, self.version, n_paragraph)
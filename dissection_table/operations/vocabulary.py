@@ -0,0 +1,71 @@
+# dissection_table.operations.vocabulary.py
+
+import sys
+from itertools import chain, repeat
+from types import MappingProxyType
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
+
+from dissection_table.database.token_arrays import TOKEN_DTYPE, paragraph_words
+
+# Id given to words the version doesn't contain.
+UNKNOWN_ID = -1
+
+
+class Vocabulary:
+    """
+    The words of one version, ranked by frequency: id n is the n-th most
+    frequent word (the word_frequency rank, the ids stored in
+    version.tokens).
+
+    `words` and `counts` are read-only arrays indexed by id; `index` is the
+    word -> id hash map. encode / decode convert whole token lists in one
+    call: a C-level pass over the hash map one way, array indexing the other.
+    """
+    def __init__(self, words: Sequence[str], counts: Sequence[int]):
+        self.words = np.empty(len(words), dtype=object)
+        self.words[:] = list(words)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self._index = {word: ind for ind, word in enumerate(self.words.tolist())}
+        self.index: Mapping[str, int] = MappingProxyType(self._index)
+        self.words.setflags(write=False)
+        self.counts.setflags(write=False)
+
+    @classmethod
+    def from_word_freq(cls, word_freq: Mapping[str, int]) -> "Vocabulary":
+        """From a {word: count} mapping already sorted by frequency (Corpus.word_freq)."""
+        return cls(list(word_freq.keys()), list(word_freq.values()))
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._index
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held: the arrays, the word objects and the hash map."""
+        return (self.words.nbytes + self.counts.nbytes + sys.getsizeof(self._index)
+                + sum(sys.getsizeof(word) for word in self._index))
+
+    def id_of(self, word: str) -> int:
+        return self._index.get(word, UNKNOWN_ID)
+
+    def encode(self, words: Iterable[str]) -> np.ndarray:
+        """The int32 id of every word (UNKNOWN_ID for words not in the version)."""
+        words = words if isinstance(words, (list, tuple)) else list(words)
+        return np.fromiter(map(self._index.get, words, repeat(UNKNOWN_ID)),
+                           dtype=TOKEN_DTYPE, count=len(words))
+
+    def encode_text(self, text: str) -> np.ndarray:
+        """Ids of the words of a text (a paragraph, a whole novel), cleaned like raw_words."""
+        return self.encode(list(chain.from_iterable(paragraph_words(text))))
+
+    def decode(self, ids: Sequence[int]) -> np.ndarray:
+        """The words of an id array (object array of str), e.g. `decode(corpus.tokens)`."""
+        return self.words[np.asarray(ids, dtype=np.intp)]
+
+    def decode_text(self, ids: Sequence[int]) -> str:
+        """The words of an id array joined by spaces."""
+        return ' '.join(self.decode(ids))
@@ -0,0 +1,19 @@
+# database.routers.alignment.py
+
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from dissection_table.database.engine import get_db_session
+from dissection_table.operations.alignment import get_alignment
+
+router = APIRouter()
+
+@router.get("/alignment/{source_version}/{target_version}")
+async def api_get_alignment(source_version, target_version,
+                            with_text: bool = False, recompute: bool = False, band: Optional[int] = None,
+                            session: AsyncSession = Depends(get_db_session)):
+    try:
+        return await get_alignment(session, source_version, target_version,
+                                   with_text = with_text, recompute = recompute, band = band)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
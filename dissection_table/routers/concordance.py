@@ -0,0 +1,21 @@
+# database.routers.concordance.py
+
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from dissection_table.database.engine import get_db_session
+from dissection_table.operations.concordance import kwic, DEFAULT_WIDTH, DEFAULT_LIMIT, MAX_WIDTH, MAX_LIMIT
+
+router = APIRouter()
+
+@router.get("/concordance/{term}")
+async def api_get_concordance(term: str,
+                              version: Optional[List[str]] = Query(None),
+                              width: int = Query(DEFAULT_WIDTH, ge=0, le=MAX_WIDTH),
+                              offset: int = Query(0, ge=0),
+                              limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                              session: AsyncSession = Depends(get_db_session)):
+    try:
+        return await kwic(session, term, versions = version, width = width, offset = offset, limit = limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,23 @@
+# database.routers.export.py
+
+from typing import List
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+from dissection_table.operations.export import export_vectors, EXPORT_FORMATS
+
+router = APIRouter()
+
+@router.get("/export/{column}")
+async def api_export_vectors(column, version: List[str] = Query(...), format: str = 'npy'):
+    try:
+        payload = await export_vectors(version, column = column, format = format)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Arrow export needs pyarrow installed on the server.")
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"{'_'.join(version)}.{column}.{extension}"
+    return Response(content=payload, media_type=media_type,
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
@@ -1,17 +1,48 @@
 # database.routers.frequencies.py
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
-from dissection_table.operations.frequencies import get_n_words, get_paragraph_words_freq
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from dissection_table.database.engine import get_db_session
+from dissection_table.database.streaming import version_exists, stream_paragraph_words_freq, ndjson
+from dissection_table.operations.frequencies import (get_n_words, get_paragraph_words_freq, get_top_words,
+                                                     get_words_by_prefix, get_word_frequency)
 #from dissection_table.operations.players import get_current_players_with_games_in_db
 #from typing import Dict, Any
 
 router = APIRouter()
 
 @router.get("/{version}/n_words")
-async def api_get_n_words(version):
-    return await get_n_words(version)
+async def api_get_n_words(version, session: AsyncSession = Depends(get_db_session)):
+    return await get_n_words(session, version)
 
 @router.get("/{version}/paragraph_words_freq")
-async def api_get_paragraph_words_freq(version):
-    return await get_paragraph_words_freq(version)
+async def api_get_paragraph_words_freq(version, session: AsyncSession = Depends(get_db_session)):
+    if not await version_exists(session, version):
+        raise HTTPException(status_code=404, detail=f"This version: {version} doesn't exist.")
+    return StreamingResponse(ndjson(stream_paragraph_words_freq(version)), media_type="application/x-ndjson")
+
+@router.get("/{version}/word_freq")
+async def api_get_word_freq(version: str,
+                            k: int = Query(100, ge=1, le=10000),
+                            offset: int = Query(0, ge=0),
+                            prefix: str = None,
+                            session: AsyncSession = Depends(get_db_session)):
+    """Top-k words of a version by frequency, or the most frequent ones starting with `prefix`."""
+    if prefix is not None:
+        words = await get_words_by_prefix(session, version, prefix.lower(), limit=k)
+        # No match is an empty list; an unknown version is a 404 like the top-k path.
+        if not words and not await version_exists(session, version):
+            raise HTTPException(status_code=404, detail=f"This version: {version} doesn't exist.")
+        return words
+    words = await get_top_words(session, version, k=k, offset=offset)
+    if isinstance(words, str):
+        raise HTTPException(status_code=404, detail=words)
+    return words
+
+@router.get("/{version}/word_freq/{word}")
+async def api_get_word_frequency(version: str, word: str, session: AsyncSession = Depends(get_db_session)):
+    frequency = await get_word_frequency(session, version, word.lower())
+    if isinstance(frequency, str):
+        raise HTTPException(status_code=404, detail=frequency)
+    return frequency
@@ -0,0 +1,32 @@
+# database.routers.ngrams.py
+
+from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from dissection_table.database.engine import get_db_session
+from dissection_table.operations.ngrams import get_top_ngrams, compare_ngrams, MAX_N, DEFAULT_K, MAX_K
+
+router = APIRouter()
+
+@router.get("/ngrams/{version}")
+async def api_get_top_ngrams(version: str,
+                             n: int = Query(2, ge=1, le=MAX_N),
+                             k: int = Query(DEFAULT_K, ge=1, le=MAX_K),
+                             offset: int = Query(0, ge=0),
+                             session: AsyncSession = Depends(get_db_session)):
+    ngrams = await get_top_ngrams(session, version, n, k = k, offset = offset)
+    if not ngrams and offset == 0:
+        raise HTTPException(status_code=404, detail=f"No {n}-grams stored for version: {version}.")
+    return ngrams
+
+@router.get("/ngrams/compare/{n}")
+async def api_compare_ngrams(n: int,
+                             version: List[str] = Query(...),
+                             k: int = Query(DEFAULT_K, ge=1, le=MAX_K),
+                             session: AsyncSession = Depends(get_db_session)):
+    if not 1 <= n <= MAX_N:
+        raise HTTPException(status_code=400, detail=f"n must be between 1 and {MAX_N}.")
+    try:
+        return await compare_ngrams(session, n, version, k = k)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
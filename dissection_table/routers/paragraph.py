@@ -1,18 +1,48 @@
 # database.routers.paragraphs.py
 
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.responses import JSONResponse
-from dissection_table.operations.paragraph import get_paragraph,get_paragraph_embedding
+from sqlalchemy.ext.asyncio import AsyncSession
+from dissection_table.database.engine import get_db_session
+from dissection_table.operations.paragraph import get_paragraph,get_paragraph_embedding, get_nearest_paragraphs, get_nearest_recall, get_paragraphs_batch
+from dissection_table.operations.nearest import DEFAULT_EF_SEARCH
 #from dissection_table.operations.players import get_current_players_with_games_in_db
 #from typing import Dict, Any
 
 router = APIRouter()
 
 @router.get("/paragraph/{version}/{n_paragraph}")
-async def api_get_paragraph(version, n_paragraph):
-    return await get_paragraph(version,n_paragraph)
+async def api_get_paragraph(version, n_paragraph, session: AsyncSession = Depends(get_db_session)):
+    return await get_paragraph(session, version,n_paragraph)
 @router.get("/paragraph/{version}/{n_paragraph}/embedding")
-async def api_get_paragraph_embedding(version, n_paragraph):
-    return await get_paragraph_embedding(version,n_paragraph)
-
-get_n_paragraph_embedding(version, n_paragraph)
\ No newline at end of file
+async def api_get_paragraph_embedding(version, n_paragraph, session: AsyncSession = Depends(get_db_session)):
+    return await get_paragraph_embedding(session, version,n_paragraph)
+@router.get("/paragraphs")
+async def api_get_paragraphs_batch(version: List[str] = Query(...),
+                                   n: Optional[List[int]] = Query(None),
+                                   start: Optional[int] = None, end: Optional[int] = None,
+                                   after_version: Optional[str] = None, after_n: Optional[int] = None,
+                                   limit: int = 200, embedding: bool = False, umap: bool = False,
+                                   session: AsyncSession = Depends(get_db_session)):
+    return await get_paragraphs_batch(session, version, n_paragraphs = n, start = start, end = end,
+                                      after_version = after_version, after_n = after_n, limit = limit,
+                                      embedding = embedding, umap = umap)
+@router.get("/paragraph/{version}/{n_paragraph}/nearest/{target_version}")
+async def api_get_nearest_paragraphs(version, n_paragraph: int, target_version,
+                                     k: int = 10, ef_search: int = DEFAULT_EF_SEARCH, exact: bool = False,
+                                     session: AsyncSession = Depends(get_db_session)):
+    try:
+        return await get_nearest_paragraphs(session, version, n_paragraph, target_version,
+                                            k = k, ef_search = ef_search, exact = exact)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+@router.get("/nearest/recall/{version}/{target_version}")
+async def api_get_nearest_recall(version, target_version,
+                                 k: int = 10, ef_search: int = DEFAULT_EF_SEARCH, sample_size: int = 50,
+                                 session: AsyncSession = Depends(get_db_session)):
+    try:
+        return await get_nearest_recall(session, version, target_version,
+                                        k = k, ef_search = ef_search, sample_size = sample_size)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,21 @@
+# database.routers.search.py
+
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from dissection_table.database.engine import get_db_session
+from dissection_table.operations.search import search_paragraphs, DEFAULT_LIMIT, MAX_LIMIT
+
+router = APIRouter()
+
+@router.get("/search")
+async def api_search_paragraphs(q: str,
+                                version: Optional[List[str]] = Query(None),
+                                mode: str = 'websearch',
+                                limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                                offset: int = Query(0, ge=0),
+                                session: AsyncSession = Depends(get_db_session)):
+    try:
+        return await search_paragraphs(session, q, versions = version, mode = mode, limit = limit, offset = offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,7 +1,10 @@
 # database.router.sources.py
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from dissection_table.database.engine import get_db_session
+from dissection_table.database.streaming import version_exists, stream_raw_text, stream_paragraphs, ndjson
 from dissection_table.operations.sources import get_versions_names, get_raw_text, get_metadata
 #from dissection_table.operations.players import get_current_players_with_games_in_db
 #from typing import Dict, Any
@@ -9,11 +12,20 @@ from dissection_table.operations.sources import get_versions_names, get_raw_text
 router = APIRouter()
 
 @router.get("/sources/")
-async def api_get_version_names():
-    return await get_versions_names()
+async def api_get_version_names(session: AsyncSession = Depends(get_db_session)):
+    return await get_versions_names(session)
 @router.get("/sources/raw_text/{version}")
-async def api_get_raw_text(version):
-    return await get_raw_text(version)
+async def api_get_raw_text(version, session: AsyncSession = Depends(get_db_session)):
+    if not await version_exists(session, version):
+        raise HTTPException(status_code=404, detail=f"This version: {version} doesn't exist.")
+    return StreamingResponse(stream_raw_text(version), media_type="text/plain; charset=utf-8")
+@router.get("/sources/paragraphs/{version}")
+async def api_stream_paragraphs(version, embedding: bool = False, umap: bool = False,
+                                session: AsyncSession = Depends(get_db_session)):
+    if not await version_exists(session, version):
+        raise HTTPException(status_code=404, detail=f"This version: {version} doesn't exist.")
+    return StreamingResponse(ndjson(stream_paragraphs(version, include_embedding = embedding, include_umap = umap)),
+                             media_type="application/x-ndjson")
 @router.get("/sources/metadata/{version}")
-async def api_get_metadata(version):
-    return await get_metadata(version) 
+async def api_get_metadata(version, session: AsyncSession = Depends(get_db_session)):
+    return await get_metadata(session, version)
@@ -7,7 +7,7 @@ from constants import CONN_STRING
 from dissection_table.database.engine import init_db
 from dissection_table.database.db_interface import DBInterface
 from dissection_table.database.sources_formatting import feed_database
-from dissection_table.routers import paragraph, sources, frequencies
+from dissection_table.routers import paragraph, sources, frequencies, alignment, export, concordance, search, ngrams
 
 
 @asynccontextmanager
@@ -15,10 +15,10 @@ async def lifespan(app: FastAPI):
     await init_db(CONN_STRING)
     DBInterface.initialize_engine_and_session(CONN_STRING)
     try:
-        await feed_database()
-        print(" DATABASE POPULATED JUST NOW ")
-    except:
-        print('Either Pedro_Paramo_Database is ready:\n   or there was a problem and is not. lol')
+        result = await feed_database()
+        print(f" DATABASE FEED: {result} ")
+    except Exception as e:
+        print(f'There was a problem feeding Pedro_Paramo_Database: {e}')
     print('... DISSECTION TABLE ON ... (allegedly)')
     yield
     print('... Server DISSECTION TABLE DOWN YO!...')
@@ -32,4 +32,9 @@ def read_root():
 app.include_router(paragraph.router)
 app.include_router(sources.router)
 app.include_router(frequencies.router)
+app.include_router(alignment.router)
+app.include_router(export.router)
+app.include_router(concordance.router)
+app.include_router(search.router)
+app.include_router(ngrams.router)
 
@@ -0,0 +1,10 @@
+# tests.conftest.py
+#
+# constants.py builds CONN_STRING from these at import time; the tests
+# never connect, they only need the modules to import.
+
+import os
+
+for name, value in {"USER": "test", "PASSWORD": "test", "HOST": "localhost",
+                    "PORT": "5432", "DATABASE_NAME": "test"}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,19 @@
+# tests.test_search.py
+
+from dissection_table.operations.search import prefix_query
+
+
+def test_prefix_query_quotes_each_word():
+    assert prefix_query("Comala pedro") == "'comala':* & 'pedro':*"
+
+
+def test_prefix_query_doubles_apostrophes():
+    assert prefix_query("l'homme d'un qu'il") == "'l''homme':* & 'd''un':* & 'qu''il':*"
+
+
+def test_prefix_query_drops_operator_characters():
+    assert prefix_query("a&b | !c (d) <-> e:* \\f") == "'ab':* & 'c':* & 'd':* & 'e':* & 'f':*"
+
+
+def test_prefix_query_without_letters_is_empty():
+    assert prefix_query("& | ! 123 —") == ""